@@ -0,0 +1,7 @@
+'''
+kai_scraper: scraping jadwal kereta KAI dari booking.kai.id.
+
+Jalankan lewat CLI: python -m kai_scraper --help
+Modul yang butuh Selenium (browser, driver_manager, sweep) hanya di-import saat
+dipakai, sehingga parsing, ekspor dan perintah stasiun tidak memerlukan Chrome.
+'''
@@ -0,0 +1,396 @@
+'''
+Interaksi Selenium dengan booking.kai.id: inisialisasi Chrome, pengisian form
+pencarian dan pengambilan hasil (HTML penuh, fragmen, atau record terstruktur).
+Selenium baru di-import saat fungsi di modul ini dipanggil.
+'''
+import base64
+import json
+import time
+
+# URL form pencarian KAI. Bisa diganti (lewat argumen booking_url) ke server tiruan lokal, lihat kai_scraper.mock_server
+KAI_BOOKING_URL = "https://booking.kai.id/"
+
+# Common User-Agent string to mimic a real browser
+COMMON_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/98.0.4758.102 Safari/537.36"
+
+# Mode pengambilan HTML hasil dari browser:
+# - "page": seluruh driver.page_source (perilaku lama)
+# - "fragment": hanya outerHTML kontainer hasil (blok div.data-block.list-kereta)
+# - "fragment_gzip": seperti "fragment", tetapi dikompres gzip di dalam halaman
+# - "records": tanpa HTML; jadwal diekstrak di browser dan dikembalikan sebagai
+#   list dict mentah (lihat extract_schedule_records_in_browser)
+CAPTURE_MODES = ("page", "fragment", "fragment_gzip", "records")
+
+# Satu blok jadwal di halaman hasil
+RESULT_BLOCK_SELECTOR = "div.data-block.list-kereta"
+
+# Penanda halaman hasil tanpa kereta (rute/tanggal tidak punya jadwal). Server
+# tiruan (mock_server) memakai penanda yang sama; sesuaikan jika markup KAI berubah.
+EMPTY_RESULTS_SELECTOR = "div.empty-result"
+
+# Cari elemen terkecil yang memuat semua blok jadwal, lalu kembalikan outerHTML-nya
+_RESULTS_FRAGMENT_JS = """
+var blocks = document.querySelectorAll('div.data-block.list-kereta');
+if (!blocks.length) { return null; }
+var container = blocks[0].parentElement;
+while (container && container.querySelectorAll('div.data-block.list-kereta').length < blocks.length) {
+    container = container.parentElement;
+}
+return container ? container.outerHTML : null;
+"""
+
+# Versi async: kompres fragmen dengan CompressionStream lalu kirim sebagai base64
+_RESULTS_FRAGMENT_GZIP_JS = """
+var done = arguments[arguments.length - 1];
+var html = (function() {""" + _RESULTS_FRAGMENT_JS + """})();
+if (!html || typeof CompressionStream === 'undefined') { done(html ? {raw: html} : null); return; }
+var stream = new Blob([html]).stream().pipeThrough(new CompressionStream('gzip'));
+new Response(stream).arrayBuffer().then(function(buffer) {
+    var bytes = new Uint8Array(buffer);
+    var binary = '';
+    for (var i = 0; i < bytes.length; i += 0x8000) {
+        binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+    }
+    done({gzip: btoa(binary)});
+}).catch(function() { done({raw: html}); });
+"""
+
+# Ekstraksi terstruktur langsung di browser. Selektor dan aturan fallback sengaja
+# meniru parse_schedule_html_content (termasuk pencocokan class persis seperti
+# BeautifulSoup untuk class_ yang mengandung spasi) agar hasil kedua jalur identik.
+# Harga dikembalikan mentah; konversinya tetap memakai parse_price di Python.
+_EXTRACT_SCHEDULES_JS = """
+function matchesClass(el, classString) {
+    var value = (el.getAttribute('class') || '').split(/\\s+/).filter(Boolean);
+    if (classString.indexOf(' ') !== -1) { return value.join(' ') === classString; }
+    return value.indexOf(classString) !== -1;
+}
+function findAll(root, tag, classString, recursive) {
+    var candidates = recursive === false ? root.children : root.getElementsByTagName(tag);
+    var found = [];
+    for (var i = 0; i < candidates.length; i++) {
+        var el = candidates[i];
+        if (el.tagName.toLowerCase() !== tag) { continue; }
+        if (classString && !matchesClass(el, classString)) { continue; }
+        found.push(el);
+    }
+    return found;
+}
+function find(root, tag, classString) {
+    var found = findAll(root, tag, classString);
+    return found.length ? found[0] : null;
+}
+function text(el) { return el.textContent.trim(); }
+function textOr(el) { return el ? text(el) : 'Tidak tersedia'; }
+
+var records = [];
+var blocks = findAll(document, 'div', 'data-block list-kereta');
+for (var b = 0; b < blocks.length; b++) {
+    var block = blocks[b];
+    var record = {};
+
+    var nameDiv = find(block, 'div', 'name');
+    if (nameDiv) {
+        var firstText = null;
+        for (var n = 0; n < nameDiv.childNodes.length; n++) {
+            if (nameDiv.childNodes[n].nodeType === Node.TEXT_NODE) { firstText = nameDiv.childNodes[n]; break; }
+        }
+        record.train_name = firstText ? firstText.textContent.trim() : '';
+        var numberSpan = find(nameDiv, 'span');
+        record.train_number = numberSpan ? numberSpan.textContent.replace(/^[() ]+|[() ]+$/g, '') : '';
+    } else {
+        record.train_name = 'Tidak tersedia';
+        record.train_number = 'Tidak tersedia';
+    }
+
+    var colOne = find(block, 'div', 'col-one');
+    record.train_class = 'Tidak tersedia';
+    if (colOne) {
+        var potential = findAll(colOne, 'div', null, false).filter(function(d) { return d !== nameDiv && text(d); });
+        if (potential.length) {
+            record.train_class = text(potential[0]);
+        } else {
+            var allDivs = findAll(colOne, 'div');
+            if (allDivs.length > 1 && allDivs[allDivs.length - 1] !== nameDiv) {
+                record.train_class = text(allDivs[allDivs.length - 1]);
+            }
+        }
+    }
+
+    record.departure_station = textOr(find(block, 'div', 'station station-start'));
+    record.departure_time = textOr(find(block, 'div', 'times time-start'));
+    record.departure_date = textOr(find(block, 'div', 'station date-start'));
+    record.duration = textOr(find(block, 'div', 'long-time'));
+
+    var arrival = find(block, 'div', 'card-arrival');
+    if (arrival) {
+        var stationEnds = findAll(arrival, 'div', 'station station-end');
+        record.arrival_station = stationEnds.length > 0 ? text(stationEnds[0]) : 'Tidak tersedia';
+        record.arrival_date = stationEnds.length > 1 ? text(stationEnds[1]) : 'Tidak tersedia';
+        record.arrival_time = textOr(find(arrival, 'div', 'times time-end'));
+    } else {
+        record.arrival_station = 'Tidak tersedia';
+        record.arrival_date = 'Tidak tersedia';
+        record.arrival_time = 'Tidak tersedia';
+    }
+
+    var priceDiv = find(block, 'div', 'price');
+    record.price = priceDiv ? priceDiv.textContent : null;
+    record.availability = textOr(find(block, 'small', 'sisa-kursi'));
+    records.push(record);
+}
+return records;
+"""
+
+def setup_driver(webdriver_executable_path, headless=False, page_load_strategy=None, extra_arguments=None):
+    '''
+    Inisialisasi Selenium WebDriver.
+
+    page_load_strategy "none" membuat driver.get/click tidak menunggu halaman
+    selesai dimuat; dipakai mode multi-tab agar tab lain bisa bekerja selama
+    satu tab menunggu (lihat multitab.py). extra_arguments ditambahkan ke
+    argumen Chrome, misalnya --user-data-dir untuk profil persisten.
+    '''
+    from selenium import webdriver
+
+    try:
+        # Coba untuk Chrome terlebih dahulu sebagai contoh umum
+        options = webdriver.ChromeOptions()
+        options.add_argument(f"user-agent={COMMON_USER_AGENT}")  # Set User-Agent
+        options.add_argument("--start-maximized")  # Maksimalkan jendela
+        options.add_argument('--disable-blink-features=AutomationControlled') # Mencoba menyembunyikan status automasi
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+
+        if headless:
+            options.add_argument("--headless")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--window-size=1920,1080")
+        if page_load_strategy:
+            options.page_load_strategy = page_load_strategy
+        for argument in extra_arguments or []:
+            options.add_argument(argument)
+        
+        # Jika webdriver_executable_path adalah None atau string kosong, Selenium akan mencoba mencarinya di PATH
+        if webdriver_executable_path and webdriver_executable_path.strip():
+            driver = webdriver.Chrome(executable_path=webdriver_executable_path, options=options)
+        else:
+            print("Path WebDriver tidak disediakan, mencoba mencari di PATH sistem...")
+            driver = webdriver.Chrome(options=options) # Selenium 4+ bisa tanpa executable_path jika di PATH
+        print("ChromeDriver berhasil diinisialisasi.")
+        return driver
+    except Exception as e:
+        print(f"Error saat inisialisasi ChromeDriver: {e}")
+        print("Pastikan ChromeDriver sudah terinstal dan path-nya benar atau ada di PATH sistem.")
+        print("Anda juga bisa mencoba menggunakan WebDriver lain seperti geckodriver untuk Firefox.")
+        return None
+
+def attach_driver(webdriver_executable_path, debugger_address, page_load_strategy=None):
+    '''
+    WebDriver baru yang menempel ke Chrome yang sudah berjalan dengan
+    --remote-debugging-port (misalnya milik browser_daemon). Hanya chromedriver
+    yang dijalankan; Chrome, profil dan cache-nya tetap milik pemilik asal.
+    Opsi seperti user-agent tidak bisa diubah di sini karena ditentukan saat
+    Chrome dijalankan.
+    '''
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    options = webdriver.ChromeOptions()
+    options.debugger_address = debugger_address
+    if page_load_strategy:
+        options.page_load_strategy = page_load_strategy
+    if webdriver_executable_path and webdriver_executable_path.strip():
+        return webdriver.Chrome(service=Service(webdriver_executable_path), options=options)
+    return webdriver.Chrome(options=options)
+
+def capture_results_html(driver, capture_mode="page"):
+    '''
+    Mengambil HTML hasil pencarian dari browser sesuai capture_mode.
+
+    Returns:
+        tuple: (payload, jumlah_byte_yang_ditransfer). Payload berupa str, atau
+        bytes gzip untuk mode "fragment_gzip". Jika fragmen tidak ditemukan,
+        fallback ke driver.page_source.
+    '''
+    if capture_mode not in CAPTURE_MODES:
+        raise ValueError(f"capture_mode tidak dikenal: {capture_mode!r} (pilihan: {', '.join(CAPTURE_MODES)})")
+    if capture_mode == "records":
+        raise ValueError("capture_mode 'records' tidak menghasilkan HTML, gunakan extract_schedule_records_in_browser().")
+
+    if capture_mode == "fragment":
+        fragment = driver.execute_script(_RESULTS_FRAGMENT_JS)
+        if fragment:
+            return fragment, len(fragment.encode('utf-8'))
+    elif capture_mode == "fragment_gzip":
+        result = driver.execute_async_script(_RESULTS_FRAGMENT_GZIP_JS)
+        if result and result.get('gzip'):
+            return base64.b64decode(result['gzip']), len(result['gzip'])
+        if result and result.get('raw'):
+            return result['raw'], len(result['raw'].encode('utf-8'))
+
+    if capture_mode != "page":
+        print("    Fragmen hasil tidak ditemukan, fallback ke page_source penuh.")
+    page_html = driver.page_source
+    return page_html, len(page_html.encode('utf-8'))
+
+def extract_schedule_records_in_browser(driver):
+    '''
+    Menjalankan satu skrip di halaman hasil untuk mengekstrak jadwal tanpa
+    mengirim HTML. Mengembalikan list dict mentah (harga belum dikonversi).
+    '''
+    return driver.execute_script(_EXTRACT_SCHEDULES_JS) or []
+
+def results_or_empty(driver):
+    '''
+    Kondisi tunggu halaman hasil: "results" jika blok jadwal sudah ada,
+    "empty" jika penanda halaman tanpa kereta ada, False selama belum
+    keduanya (dipakai seperti expected_conditions).
+    '''
+    from selenium.webdriver.common.by import By
+    if driver.find_elements(By.CSS_SELECTOR, RESULT_BLOCK_SELECTOR):
+        return "results"
+    if driver.find_elements(By.CSS_SELECTOR, EMPTY_RESULTS_SELECTOR):
+        return "empty"
+    return False
+
+def search_steps(driver, origin_name, dest_name, date_str_for_kai_input, capture_mode="page", booking_url=None):
+    '''
+    Langkah-langkah satu pencarian (buka form, isi, cari, ambil hasil) sebagai
+    generator, supaya bisa dijalankan secara blocking (run_steps_blocking)
+    maupun diselingi dengan tab lain oleh scheduler async (lihat multitab.py).
+
+    Generator me-yield:
+        float/int      : jeda dalam detik
+        callable(d)    : kondisi expected_conditions yang harus ditunggu; elemen
+                         hasilnya dikirim kembali lewat send()
+    dan mengembalikan (page_html, actual_url_loaded) lewat StopIteration.
+    Jika KAI menampilkan halaman tanpa kereta, page_html kosong ("" atau []
+    untuk mode "records") tanpa menunggu timeout.
+    '''
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support import expected_conditions as EC
+
+    kai_booking_url = booking_url or KAI_BOOKING_URL
+    print(f"  Navigasi ke: {kai_booking_url}")
+    driver.get(kai_booking_url)
+
+    # Isi Stasiun Asal
+    print(f"    Mengisi Stasiun Asal: {origin_name}")
+    origin_input = yield EC.presence_of_element_located((By.ID, "origination-flexdatalist"))
+    origin_input.clear()
+    origin_input.send_keys(origin_name)
+    yield 1 # Beri waktu flexdatalist untuk memproses/menampilkan suggestion
+    origin_input.send_keys(Keys.ARROW_DOWN) # Coba pilih suggestion pertama
+    yield 0.5
+    origin_input.send_keys(Keys.ENTER)
+    yield 0.5
+
+    # Isi Stasiun Tujuan
+    print(f"    Mengisi Stasiun Tujuan: {dest_name}")
+    destination_input = yield EC.presence_of_element_located((By.ID, "destination-flexdatalist"))
+    destination_input.clear()
+    destination_input.send_keys(dest_name)
+    yield 1
+    destination_input.send_keys(Keys.ARROW_DOWN)
+    yield 0.5
+    destination_input.send_keys(Keys.ENTER)
+    yield 0.5
+
+    # Isi Tanggal Keberangkatan
+    # Format untuk input tanggal KAI tampaknya DD-Month-YYYY (e.g., 01-May-2025)
+    print(f"    Mengisi Tanggal Keberangkatan: {date_str_for_kai_input}")
+    date_input = yield EC.presence_of_element_located((By.ID, "departure_dateh"))
+    # Mencoba mengatur value via JavaScript karena datepicker bisa kompleks
+    driver.execute_script(f"arguments[0].value = '{date_str_for_kai_input}';", date_input)
+    # Mungkin perlu trigger change event jika ada listener
+    driver.execute_script("$(arguments[0]).trigger('change');", date_input)
+    yield 0.5
+
+    # Penumpang (Asumsi default 1 dewasa, 0 bayi sudah cukup dan tidak diubah)
+    # Jika perlu diubah, cari elemen #dewasa, #infant dan tombol +/- nya.
+
+    # Klik tombol Cari Tiket
+    print("    Mengklik tombol Cari & Pesan Tiket...")
+    search_button = yield EC.element_to_be_clickable((By.ID, "submit"))
+    search_button.click()
+
+    # Tunggu halaman hasil dimuat: salah satu blok data, atau penanda tanpa kereta
+    print("    Menunggu hasil pencarian...")
+    outcome = yield results_or_empty
+    if outcome == "empty":
+        print("    Tidak ada kereta untuk rute dan tanggal ini.")
+        return ([] if capture_mode == "records" else ""), driver.current_url
+    print("    Halaman hasil terdeteksi.")
+    yield 3 # Beri waktu ekstra untuk semua elemen JS dimuat jika ada
+
+    capture_started = time.perf_counter()
+    if capture_mode == "records":
+        page_html = extract_schedule_records_in_browser(driver)
+        transfer_bytes = len(json.dumps(page_html).encode('utf-8'))
+    else:
+        page_html, transfer_bytes = capture_results_html(driver, capture_mode)
+    print(f"    HTML hasil diambil (mode {capture_mode}): {transfer_bytes} byte dalam {time.perf_counter() - capture_started:.3f} detik.")
+    return page_html, driver.current_url
+
+def run_steps_blocking(driver, steps, timeout=20):
+    '''Menjalankan generator search_steps secara berurutan dengan time.sleep dan WebDriverWait.'''
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    wait = WebDriverWait(driver, timeout)
+    value = None
+    while True:
+        try:
+            step = steps.send(value)
+        except StopIteration as finished:
+            return finished.value
+        if isinstance(step, (int, float)):
+            time.sleep(step)
+            value = None
+        else:
+            value = wait.until(step)
+
+def scrape_kai_with_selenium(driver, origin_name, dest_name, date_str_for_kai_input, adult_passengers, infant_passengers, capture_mode="page", raise_errors=False, booking_url=None):
+    '''
+    Menggunakan Selenium untuk mengisi form, mencari, dan mengambil HTML hasil.
+
+    capture_mode menentukan seberapa banyak HTML yang dikirim dari browser
+    (lihat CAPTURE_MODES dan capture_results_html). Dengan mode "records",
+    nilai pertama yang dikembalikan adalah list record, bukan HTML; gunakan
+    parse_captured_payload untuk memprosesnya.
+
+    Secara default error dicetak lalu (None, None) dikembalikan. Dengan
+    raise_errors=True exception dilempar ulang setelah dicetak sehingga pemanggil
+    (misalnya RetryQueue) bisa mengklasifikasi dan mencoba ulang query tersebut.
+
+    booking_url mengganti KAI_BOOKING_URL, misalnya untuk server tiruan lokal.
+    '''
+    from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
+
+    page_html = None
+    actual_url_loaded = None
+
+    try:
+        page_html, actual_url_loaded = run_steps_blocking(driver, search_steps(
+            driver, origin_name, dest_name, date_str_for_kai_input,
+            capture_mode=capture_mode, booking_url=booking_url
+        ))
+    except TimeoutException:
+        print("    Error: Timeout saat menunggu elemen di halaman KAI.")
+        if raise_errors:
+            raise
+    except NoSuchElementException:
+        print("    Error: Salah satu elemen form tidak ditemukan di halaman KAI.")
+        if raise_errors:
+            raise
+    except ElementNotInteractableException as e:
+        print(f"    Error: Elemen tidak dapat diinteraksi: {e}")        
+        if raise_errors:
+            raise
+    except Exception as e:
+        print(f"    Error tidak terduga saat interaksi Selenium: {e}")
+        if raise_errors:
+            raise
+    
+    return page_html, actual_url_loaded
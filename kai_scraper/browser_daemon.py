@@ -0,0 +1,497 @@
+'''
+Daemon browser hangat: proses lokal yang menjaga beberapa Chrome tetap hidup
+dengan profil persisten (cache dan cookie booking.kai.id sudah terisi) dan
+halaman pencarian yang sudah dimuat, supaya run pendek (satu rute, satu hari)
+tidak membayar start Chrome dan pemuatan dingin pertama setiap kali.
+
+    python -m kai_scraper daemon [--pool-size 2] [--headless]
+    python -m kai_scraper sample --daemon ...
+
+Setiap Chrome dijalankan dengan --remote-debugging-port. Run scraper
+meminjam satu Chrome lewat API HTTP lokal lalu menempelkan chromedriver-nya
+sendiri ke port tersebut (browser.attach_driver); hanya chromedriver yang
+dijalankan di sisi klien.
+
+    POST /lease?wait=30&pid=1234
+        200 {"lease_id", "browser_id", "debugger_address"}
+        503 {"status": "busy"}   tidak ada Chrome yang siap dalam `wait` detik
+    POST /release?lease_id=...&recycle=memori
+        200 {"status": "released"}  Chrome dibersihkan (tab ekstra ditutup,
+            kembali ke halaman pencarian) atau di-restart jika recycle diisi
+    GET /health
+        200 status setiap Chrome di pool
+
+Thread pemeliharaan menjalankan health check berkala pada Chrome yang
+menganggur, me-restart yang mati atau melewati batas memori, menutup Chrome
+yang menganggur lebih lama dari idle_timeout (menyisakan min_warm), dan
+mengambil kembali pinjaman milik proses klien yang sudah berhenti.
+'''
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.request import Request, urlopen
+
+from selenium.common.exceptions import WebDriverException
+
+from .browser import attach_driver, setup_driver
+from .driver_manager import LocalDriverSource, driver_rss_mb
+
+# Port API default; bukan 8765 yang dipakai server tiruan KAI (mock_server)
+DEFAULT_DAEMON_PORT = 8766
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class WarmBrowser:
+    '''
+    Satu Chrome di pool. Status: "stopped", "starting", "idle", "leased",
+    "resetting". Driver milik daemon hanya dipakai saat Chrome tidak dipinjam.
+    '''
+
+    def __init__(self, browser_id, profile_dir):
+        self.browser_id = browser_id
+        self.profile_dir = profile_dir
+        self.state = "stopped"
+        self.driver = None
+        self.port = None
+        self.lease_id = None
+        self.lease_pid = None
+        self.leased_at = None
+        self.last_used = time.monotonic()
+        self.leases = 0
+        self.restarts = 0
+        self.rss_mb = None
+
+    @property
+    def debugger_address(self):
+        return f"127.0.0.1:{self.port}"
+
+    def describe(self):
+        return {
+            'browser_id': self.browser_id,
+            'state': self.state,
+            'debugger_address': self.debugger_address if self.port else None,
+            'leases': self.leases,
+            'restarts': self.restarts,
+            'idle_seconds': round(time.monotonic() - self.last_used, 1) if self.state == "idle" else None,
+            'rss_mb': round(self.rss_mb, 1) if self.rss_mb is not None else None,
+        }
+
+class BrowserPool:
+    '''
+    Args:
+        webdriver_path (str): Diteruskan ke setup_driver.
+        headless (bool): Diteruskan ke setup_driver.
+        size (int): Jumlah maksimum Chrome di pool.
+        min_warm (int): Jumlah Chrome yang tetap hangat walaupun menganggur.
+        profile_root (str): Direktori induk profil Chrome persisten (satu per slot).
+        warm_url (str): Halaman yang dimuat saat Chrome disiapkan/dibersihkan.
+        idle_timeout (float): Chrome yang menganggur lebih lama dari ini ditutup.
+        health_check_interval (float): Jeda antar putaran pemeliharaan (detik).
+        max_leases_per_browser (int): Restart Chrome setelah sekian pinjaman (None = tanpa batas).
+        max_rss_mb (float): Restart Chrome menganggur yang memorinya melewati batas ini.
+    '''
+
+    def __init__(self, webdriver_path, headless=False, size=2, min_warm=1, profile_root="chrome_profiles",
+                 warm_url="https://booking.kai.id/", idle_timeout=900, health_check_interval=30,
+                 max_leases_per_browser=50, max_rss_mb=1500):
+        self.webdriver_path = webdriver_path
+        self.headless = headless
+        self.min_warm = max(0, min(int(min_warm), int(size)))
+        self.profile_root = os.path.abspath(profile_root)
+        self.warm_url = warm_url
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.max_leases_per_browser = max_leases_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.browsers = [WarmBrowser(i + 1, os.path.join(self.profile_root, f"chrome_{i + 1}")) for i in range(max(1, int(size)))]
+        self.stats = {'leases': 0, 'busy': 0, 'releases': 0, 'reclaimed': 0, 'health_failures': 0, 'idle_stops': 0}
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._maintenance_thread = None
+
+    def _set_state(self, browser, state):
+        with self._condition:
+            browser.state = state
+            self._condition.notify_all()
+
+    def _start_browser(self, browser):
+        '''Menjalankan Chrome untuk satu slot dan memuat warm_url. Dipanggil saat slot berstatus "starting".'''
+        os.makedirs(browser.profile_dir, exist_ok=True)
+        port = _free_port()
+        started = time.perf_counter()
+        driver = setup_driver(self.webdriver_path, headless=self.headless, extra_arguments=[
+            f"--remote-debugging-port={port}", f"--user-data-dir={browser.profile_dir}",
+        ])
+        if driver is None:
+            print(f"  [daemon] Chrome #{browser.browser_id} gagal dijalankan.")
+            self._set_state(browser, "stopped")
+            return False
+        browser.driver, browser.port = driver, port
+        try:
+            driver.get(self.warm_url)
+        except WebDriverException as e:
+            print(f"  [daemon] Chrome #{browser.browser_id} gagal memuat {self.warm_url}: {e.msg}")
+        browser.last_used = time.monotonic()
+        self._set_state(browser, "idle")
+        print(f"  [daemon] Chrome #{browser.browser_id} siap di {browser.debugger_address} "
+              f"dalam {time.perf_counter() - started:.1f} detik.")
+        return True
+
+    def _stop_browser(self, browser):
+        if browser.driver is not None:
+            try:
+                browser.driver.quit()
+            except WebDriverException as e:
+                print(f"  [daemon] Error saat menutup Chrome #{browser.browser_id}: {e.msg}")
+        browser.driver = None
+        browser.port = None
+        browser.rss_mb = None
+
+    def _restart_browser(self, browser, reason):
+        print(f"  [daemon] Restart Chrome #{browser.browser_id} ({reason}) setelah {browser.leases} pinjaman.")
+        self._stop_browser(browser)
+        browser.restarts += 1
+        browser.leases = 0
+        self._start_browser(browser)
+
+    def _reset_browser(self, browser, recycle=None):
+        '''Setelah dikembalikan: tutup tab ekstra dan kembali ke warm_url, atau restart.'''
+        if not recycle and self.max_leases_per_browser and browser.leases >= self.max_leases_per_browser:
+            recycle = "jumlah_pinjaman"
+        if not recycle:
+            try:
+                handles = browser.driver.window_handles
+                for handle in handles[1:]:
+                    browser.driver.switch_to.window(handle)
+                    browser.driver.close()
+                browser.driver.switch_to.window(handles[0])
+                browser.driver.get(self.warm_url)
+            except (WebDriverException, IndexError):
+                recycle = "reset_gagal"
+        if recycle:
+            self._restart_browser(browser, recycle)
+            return
+        browser.last_used = time.monotonic()
+        self._set_state(browser, "idle")
+
+    def _in_background(self, target, *args):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+    def start(self):
+        '''Menyiapkan min_warm Chrome lalu menjalankan thread pemeliharaan.'''
+        for browser in self.browsers[:max(1, self.min_warm)]:
+            browser.state = "starting"
+            self._start_browser(browser)
+        self._maintenance_thread = threading.Thread(target=self._maintenance_loop, name="browser-daemon-maintenance", daemon=True)
+        self._maintenance_thread.start()
+        return self
+
+    def lease(self, wait=30, pid=None):
+        '''
+        Meminjam Chrome yang siap. Jika tidak ada yang menganggur, slot yang
+        berhenti dijalankan di latar belakang. None jika tetap tidak ada Chrome
+        siap setelah `wait` detik.
+        '''
+        deadline = time.monotonic() + wait
+        start_requested = False
+        with self._condition:
+            while True:
+                idle = [browser for browser in self.browsers if browser.state == "idle"]
+                if idle:
+                    # Chrome yang paling baru dipakai punya cache paling segar
+                    browser = max(idle, key=lambda b: b.last_used)
+                    browser.state = "leased"
+                    browser.lease_id = uuid.uuid4().hex
+                    browser.lease_pid = pid
+                    browser.leased_at = time.monotonic()
+                    browser.leases += 1
+                    self.stats['leases'] += 1
+                    return {'lease_id': browser.lease_id, 'browser_id': browser.browser_id,
+                            'debugger_address': browser.debugger_address}
+                # Satu percobaan start per permintaan, agar Chrome yang gagal start tidak dicoba terus-menerus
+                if not start_requested and not any(browser.state == "starting" for browser in self.browsers):
+                    stopped = [browser for browser in self.browsers if browser.state == "stopped"]
+                    if stopped:
+                        start_requested = True
+                        stopped[0].state = "starting"
+                        self._in_background(self._start_browser, stopped[0])
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['busy'] += 1
+                    return None
+                self._condition.wait(remaining)
+
+    def release(self, lease_id, recycle=None):
+        '''Mengembalikan pinjaman; pembersihan berjalan di latar belakang. False jika lease_id tidak dikenal.'''
+        with self._condition:
+            matches = [browser for browser in self.browsers if browser.state == "leased" and browser.lease_id == lease_id]
+            if not matches:
+                return False
+            browser = matches[0]
+            browser.state = "resetting"
+            browser.lease_id = browser.lease_pid = None
+            self.stats['releases'] += 1
+        self._in_background(self._reset_browser, browser, recycle)
+        return True
+
+    def _health_check(self, browser):
+        '''Health check ringan dengan driver milik daemon; juga mengukur memori Chrome.'''
+        try:
+            browser.driver.execute_script("return 1;")
+        except WebDriverException:
+            return "crash"
+        browser.rss_mb = driver_rss_mb(browser.driver)
+        if self.max_rss_mb and browser.rss_mb is not None and browser.rss_mb >= self.max_rss_mb:
+            return "memori"
+        return None
+
+    def _maintenance_loop(self):
+        while not self._stopping.wait(self.health_check_interval):
+            self.maintain()
+
+    def maintain(self):
+        '''Satu putaran pemeliharaan: ambil kembali pinjaman yatim, health check, idle timeout.'''
+        with self._condition:
+            orphaned = [browser for browser in self.browsers
+                        if browser.state == "leased" and browser.lease_pid and not _process_alive(browser.lease_pid)]
+        for browser in orphaned:
+            print(f"  [daemon] Proses {browser.lease_pid} berhenti tanpa mengembalikan Chrome #{browser.browser_id}; diambil kembali.")
+            self.stats['reclaimed'] += 1
+            self.release(browser.lease_id)
+
+        with self._condition:
+            idle = [browser for browser in self.browsers if browser.state == "idle"]
+            for browser in idle:
+                browser.state = "resetting" # Jangan dipinjamkan selama diperiksa
+        warm_count = len(idle)
+        for browser in sorted(idle, key=lambda b: b.last_used):
+            problem = self._health_check(browser)
+            if problem:
+                self.stats['health_failures'] += 1
+                self._restart_browser(browser, problem)
+            elif self.idle_timeout and time.monotonic() - browser.last_used > self.idle_timeout and warm_count > self.min_warm:
+                print(f"  [daemon] Chrome #{browser.browser_id} menganggur {self.idle_timeout:.0f} detik; ditutup.")
+                self.stats['idle_stops'] += 1
+                warm_count -= 1
+                self._stop_browser(browser)
+                self._set_state(browser, "stopped")
+            else:
+                self._set_state(browser, "idle")
+
+    def health(self):
+        with self._condition:
+            browsers = [browser.describe() for browser in self.browsers]
+        return dict(self.stats, status='ok', browsers=browsers)
+
+    def close(self):
+        self._stopping.set()
+        for browser in self.browsers:
+            self._stop_browser(browser)
+            browser.state = "stopped"
+
+class BrowserDaemon:
+    '''Server HTTP lokal di atas BrowserPool, dijalankan di thread latar belakang.'''
+
+    def __init__(self, pool, host="127.0.0.1", port=DEFAULT_DAEMON_PORT):
+        self.pool = pool
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _make_handler(self):
+        pool = self.pool
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, data):
+                body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if urlparse(self.path).path == "/health":
+                    self._send(200, pool.health())
+                else:
+                    self._send(404, {'status': 'not_found'})
+
+            def do_POST(self):
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                try:
+                    if parsed.path == "/lease":
+                        lease = pool.lease(wait=float(query.get('wait', 30)), pid=int(query['pid']) if 'pid' in query else None)
+                        if lease:
+                            self._send(200, lease)
+                        else:
+                            self._send(503, {'status': 'busy'})
+                    elif parsed.path == "/release":
+                        released = pool.release(query['lease_id'], recycle=query.get('recycle') or None)
+                        self._send(200 if released else 404, {'status': 'released' if released else 'unknown_lease'})
+                    else:
+                        self._send(404, {'status': 'not_found'})
+                except (KeyError, ValueError):
+                    self._send(400, {'status': 'bad_request'})
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="browser-daemon", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+class DaemonClient:
+    '''Klien API daemon. Error koneksi dilempar sebagai OSError (URLError).'''
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_DAEMON_PORT):
+        self.base_url = f"http://{host}:{port}"
+
+    def _request(self, method, path, params=None, timeout=5):
+        url = f"{self.base_url}{path}" + (f"?{urlencode(params)}" if params else "")
+        try:
+            with urlopen(Request(url, method=method), timeout=timeout) as response:
+                return response.status, json.load(response)
+        except URLError as e:
+            # HTTPError (503, 404) tetap membawa body JSON
+            if hasattr(e, 'code'):
+                return e.code, json.load(e)
+            raise
+
+    def lease(self, wait=30):
+        status, data = self._request("POST", "/lease", {'wait': wait, 'pid': os.getpid()}, timeout=wait + 5)
+        return data if status == 200 else None
+
+    def release(self, lease_id, recycle=None):
+        params = {'lease_id': lease_id}
+        if recycle:
+            params['recycle'] = recycle
+        return self._request("POST", "/release", params)[0] == 200
+
+    def health(self):
+        return self._request("GET", "/health")[1]
+
+class DaemonDriverSource:
+    '''
+    Sumber driver (lihat driver_manager.LocalDriverSource) yang meminjam Chrome
+    dari daemon. Jika daemon tidak bisa dihubungi dan fallback_to_local aktif,
+    Chrome dijalankan sendiri seperti biasa.
+
+    Memori Chrome dipantau oleh daemon (max_rss_mb), jadi rss_mb() di sisi
+    klien tidak mengukur apa pun.
+    '''
+
+    def __init__(self, client, webdriver_path, headless=False, lease_wait=30, fallback_to_local=True):
+        self.client = client
+        self.webdriver_path = webdriver_path
+        self.lease_wait = lease_wait
+        self.local_source = LocalDriverSource(webdriver_path, headless) if fallback_to_local else None
+        self._leases = {}
+
+    @classmethod
+    def from_config(cls, config):
+        daemon_config = config['browser_daemon']
+        return cls(DaemonClient(daemon_config['host'], daemon_config['port']), config['webdriver_path'],
+                   headless=config['headless'], lease_wait=daemon_config['lease_wait'],
+                   fallback_to_local=daemon_config['fallback_to_local'])
+
+    def _fallback(self, reason, page_load_strategy):
+        if self.local_source is None:
+            raise WebDriverException(f"Tidak bisa meminjam Chrome dari daemon: {reason}")
+        print(f"PERINGATAN: Tidak bisa meminjam Chrome dari daemon ({reason}); menjalankan Chrome sendiri.")
+        return self.local_source.create(page_load_strategy)
+
+    def create(self, page_load_strategy=None):
+        started = time.perf_counter()
+        try:
+            lease = self.client.lease(wait=self.lease_wait)
+        except (OSError, ValueError) as e:
+            return self._fallback(e, page_load_strategy)
+        if lease is None:
+            return self._fallback(f"semua Chrome sedang dipinjam selama {self.lease_wait} detik", page_load_strategy)
+        try:
+            driver = attach_driver(self.webdriver_path, lease['debugger_address'], page_load_strategy=page_load_strategy)
+        except WebDriverException:
+            self.client.release(lease['lease_id'], recycle="attach_gagal")
+            raise
+        self._leases[id(driver)] = lease['lease_id']
+        print(f"Meminjam Chrome #{lease['browser_id']} dari daemon ({lease['debugger_address']}) "
+              f"dalam {time.perf_counter() - started:.2f} detik.")
+        return driver
+
+    def dispose(self, driver, reason=None):
+        lease_id = self._leases.pop(id(driver), None)
+        if lease_id is None:
+            # Driver dari fallback lokal
+            driver.quit()
+            return
+        try:
+            # Pada sesi yang menempel lewat debuggerAddress, quit() hanya melepas chromedriver; Chrome tetap hidup
+            driver.quit()
+        except WebDriverException as e:
+            reason = reason or "quit_gagal"
+            print(f"  [daemon] Error saat melepas driver: {e.msg}")
+        try:
+            self.client.release(lease_id, recycle=reason)
+        except OSError as e:
+            print(f"  [daemon] Gagal mengembalikan Chrome ke daemon ({e}); daemon akan mengambilnya kembali.")
+
+    def rss_mb(self, driver):
+        if id(driver) in self._leases:
+            return None
+        return driver_rss_mb(driver)
+
+def run_browser_daemon(config):
+    '''Menjalankan pool Chrome hangat dan API-nya sampai Ctrl+C.'''
+    daemon_config = config['browser_daemon']
+    pool = BrowserPool(
+        config['webdriver_path'], headless=config['headless'],
+        size=daemon_config['pool_size'], min_warm=daemon_config['min_warm'],
+        profile_root=daemon_config['profile_dir'], warm_url=config['booking_url'],
+        idle_timeout=daemon_config['idle_timeout'], health_check_interval=daemon_config['health_check_interval'],
+        max_leases_per_browser=daemon_config['max_leases_per_browser'], max_rss_mb=config['driver']['max_rss_mb'],
+    )
+    daemon = BrowserDaemon(pool, host=daemon_config['host'], port=daemon_config['port'])
+    print(f"Menyiapkan {max(1, pool.min_warm)} dari {len(pool.browsers)} Chrome (profil di '{pool.profile_root}')...")
+    pool.start()
+    print(f"Daemon browser berjalan di {daemon.url} (Ctrl+C untuk berhenti)")
+    try:
+        daemon.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nDaemon dihentikan.")
+    finally:
+        daemon.httpd.server_close()
+        pool.close()
+        print(f"Statistik daemon: {json.dumps(pool.stats)}")
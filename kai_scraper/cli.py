@@ -0,0 +1,249 @@
+'''
+CLI tunggal kai_scraper:
+
+    python -m kai_scraper sweep   [--config kai_scraper.json] [-o hasil.csv]
+    python -m kai_scraper sample  [--config kai_scraper.json] [-o hasil.csv]
+    python -m kai_scraper stations [-o stasiun.txt]
+    python -m kai_scraper reparse arsip_halaman/ [halaman.html ...] -o hasil.csv|.parquet|.sqlite [--append]
+    python -m kai_scraper export jadwal_*.csv -o jadwal.parquet
+    python -m kai_scraper serve   [--port 8080] [jadwal_*.csv ...]
+    python -m kai_scraper daemon  [--pool-size 2] [--status]
+    python -m kai_scraper route-stats [--seed-from jadwal_*.csv]
+    python -m kai_scraper route jadwal_*.csv --from SBI --to GMR --after "2025-06-02 18:00" [--cheapest]
+
+Setiap subperintah meng-import modulnya sendiri saat dijalankan, sehingga
+perintah tanpa browser (stations, reparse, export) tidak memuat Selenium dan
+bisa berjalan di mesin tanpa Chrome.
+'''
+import argparse
+import json
+import sys
+
+from .browser import CAPTURE_MODES
+from .config import load_config
+
+def _apply_browser_overrides(config, args):
+    if args.headless:
+        config['headless'] = True
+    if args.capture_mode:
+        config['capture_mode'] = args.capture_mode
+    if args.booking_url:
+        config['booking_url'] = args.booking_url
+    if args.tabs:
+        config['multitab']['enabled'] = args.tabs > 1
+        config['multitab']['tabs'] = args.tabs
+    if args.profile:
+        config['profiling']['mode'] = args.profile
+    if args.profile_every:
+        config['profiling']['every_n_queries'] = args.profile_every
+    if args.archive:
+        config['archive']['enabled'] = True
+        config['archive']['dir'] = args.archive
+    if args.daemon:
+        config['browser_daemon']['enabled'] = True
+
+def cmd_sweep(args, config):
+    from .sweep import run_sweep
+    _apply_browser_overrides(config, args)
+    run_sweep(config, output_path=args.output)
+
+def cmd_sample(args, config):
+    from .sweep import run_sample
+    _apply_browser_overrides(config, args)
+    if args.target:
+        config['sample']['target_sample_count'] = args.target
+    if args.exploration is not None:
+        config['planner']['exploration_share'] = args.exploration
+    if args.no_planner:
+        config['planner']['enabled'] = False
+    run_sample(config, output_path=args.output)
+
+def cmd_stations(args, config):
+    from .stations import save_stations_to_file, scrape_stations_from_url
+    url = args.url or config['stations']['url']
+    output_path = args.output or config['stations']['output']
+    print(f"Memulai scraping data stasiun dari Wikipedia...\nURL: {url}")
+    stations = scrape_stations_from_url(url)
+    if stations:
+        save_stations_to_file(stations, output_path)
+    else:
+        print("\nTidak ada data stasiun yang berhasil diekstrak.")
+
+def cmd_reparse(args, config):
+    from .reparse import run_reparse
+    reparse_config = config['reparse']
+    run_reparse(args.pages, args.output, workers=args.workers or reparse_config['workers'],
+                pages_per_task=reparse_config['pages_per_task'], append=args.append)
+
+def cmd_export(args, config):
+    from .schedule_loader import export_schedules, load_schedule_csvs
+    schedules = load_schedule_csvs(args.csv_files, deduplicate=not args.keep_duplicates)
+    export_schedules(schedules, args.output)
+
+def cmd_daemon(args, config):
+    daemon_config = config['browser_daemon']
+    if args.port:
+        daemon_config['port'] = args.port
+    if args.status:
+        from .browser_daemon import DaemonClient
+        try:
+            print(json.dumps(DaemonClient(daemon_config['host'], daemon_config['port']).health(), indent=2))
+        except OSError as e:
+            print(f"Daemon browser tidak bisa dihubungi di {daemon_config['host']}:{daemon_config['port']}: {e}")
+            return 1
+        return
+    from .browser_daemon import run_browser_daemon
+    if args.headless:
+        config['headless'] = True
+    if args.booking_url:
+        config['booking_url'] = args.booking_url
+    if args.pool_size:
+        daemon_config['pool_size'] = args.pool_size
+    run_browser_daemon(config)
+
+def cmd_route_stats(args, config):
+    from .planner import RouteStats
+    stats_file = config['planner']['stats_file']
+    route_stats = RouteStats.load(stats_file)
+    if args.seed_from:
+        from .schedule_loader import load_schedule_csvs
+        queries = route_stats.seed_from_schedules(load_schedule_csvs(args.seed_from))
+        route_stats.save(stats_file)
+        print(f"{queries} query rute-tanggal dari CSV ditambahkan ke '{stats_file}'.")
+    if not route_stats.routes:
+        print(f"Belum ada statistik rute di '{stats_file}'.")
+        return
+    route_stats.print_summary(limit=args.limit, overhead_seconds=config['sample']['delay_between_searches'])
+
+def cmd_route(args, config):
+    import time
+    from .connections import ConnectionIndex, format_journey
+    index = ConnectionIndex.from_csvs(args.csv_files)
+    for section in ('sweep', 'sample'):
+        index.add_station_codes(config[section]['origin_stations'] + config[section]['destination_stations'])
+    print(f"Indeks koneksi: {len(index)} koneksi, {len(index.stations)} stasiun.")
+
+    search = index.cheapest if args.cheapest else index.earliest_arrival
+    started = time.perf_counter()
+    journey = search(args.origin, args.destination, args.after, arrive_by=args.arrive_by,
+                     min_transfer_minutes=args.min_transfer, available_only=not args.include_sold_out)
+    print(f"Pencarian selesai dalam {(time.perf_counter() - started) * 1000:.2f} ms.")
+    print(format_journey(journey))
+
+def cmd_serve(args, config):
+    from .query_service import run_query_service
+    service_config = config['query_service']
+    if args.host:
+        service_config['host'] = args.host
+    if args.port:
+        service_config['port'] = args.port
+    if args.scrape_on_miss:
+        service_config['scrape_on_miss'] = True
+    run_query_service(config, csv_paths=args.csv_files or None)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="kai_scraper", description="Scraper jadwal kereta KAI.")
+    parser.add_argument("--config", help="File konfigurasi JSON (default: kai_scraper.json jika ada).")
+    # --config juga diterima setelah nama subperintah (misal `sweep --config x.json`)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_browser_options(subparser):
+        subparser.add_argument("-o", "--output", help="File CSV keluaran (default dari konfigurasi).")
+        subparser.add_argument("--headless", action="store_true", help="Jalankan Chrome tanpa UI.")
+        subparser.add_argument("--capture-mode", choices=CAPTURE_MODES,
+                               help="Cara mengambil hasil dari browser.")
+        subparser.add_argument("--booking-url", help="URL form pencarian (misal server tiruan lokal).")
+        subparser.add_argument("--tabs", type=int, metavar="N",
+                               help="Jalankan N tab bergantian dalam satu Chrome (mode multi-tab).")
+        subparser.add_argument("--profile", choices=["off", "run", "query"],
+                               help="Profiling cProfile + tracemalloc untuk seluruh run atau per query.")
+        subparser.add_argument("--profile-every", type=int, metavar="N",
+                               help="Pada --profile query, profilkan setiap query ke-N.")
+        subparser.add_argument("--archive", metavar="DIR",
+                               help="Arsipkan halaman hasil mentah ke DIR untuk parsing ulang nanti.")
+        subparser.add_argument("--daemon", action="store_true",
+                               help="Pinjam Chrome yang sudah hangat dari daemon browser (python -m kai_scraper daemon).")
+
+    sweep = subparsers.add_parser("sweep", parents=[common], help="Scraping semua kombinasi asal x tujuan x tanggal.")
+    add_browser_options(sweep)
+    sweep.set_defaults(handler=cmd_sweep)
+
+    sample = subparsers.add_parser("sample", parents=[common], help="Random sampling rute sampai target sampel tercapai.")
+    add_browser_options(sample)
+    sample.add_argument("--target", type=int, help="Target jumlah sampel (default dari konfigurasi).")
+    sample.add_argument("--exploration", type=float, help="Porsi rute baru yang disisipkan perencana (0..1).")
+    sample.add_argument("--no-planner", action="store_true", help="Urutan rute acak murni tanpa statistik rute.")
+    sample.set_defaults(handler=cmd_sample)
+
+    stations = subparsers.add_parser("stations", parents=[common], help="Ambil daftar stasiun dari Wikipedia.")
+    stations.add_argument("--url", help="URL halaman Wikipedia.")
+    stations.add_argument("-o", "--output", help="File keluaran (default: stasiun.txt).")
+    stations.set_defaults(handler=cmd_stations)
+
+    reparse = subparsers.add_parser("reparse", parents=[common], help="Parsing ulang halaman hasil yang tersimpan tanpa browser.")
+    reparse.add_argument("pages", nargs="+", help="File .html, .html.gz atau .json halaman hasil, pola glob, atau direktori arsip.")
+    reparse.add_argument("-o", "--output", required=True, help="File keluaran (.csv, .parquet, .sqlite/.db).")
+    reparse.add_argument("--workers", type=int, help="Jumlah proses parser (default: jumlah core CPU).")
+    reparse.add_argument("--append", action="store_true", help="Tambahkan ke tabel SQLite yang ada (default: tabel diganti).")
+    reparse.set_defaults(handler=cmd_reparse)
+
+    export = subparsers.add_parser("export", parents=[common], help="Muat CSV hasil scraping menjadi data bertipe dan ekspor.")
+    export.add_argument("csv_files", nargs="+", help="File CSV atau pola glob.")
+    export.add_argument("-o", "--output", required=True, help="File keluaran (.csv, .parquet, .feather, .json).")
+    export.add_argument("--keep-duplicates", action="store_true", help="Jangan buang jadwal duplikat antar file.")
+    export.set_defaults(handler=cmd_export)
+
+    serve = subparsers.add_parser("serve", parents=[common], help="Layanan query HTTP lokal di atas CSV jadwal.")
+    serve.add_argument("csv_files", nargs="*", help="File CSV atau pola glob (default dari konfigurasi).")
+    serve.add_argument("--host", help="Alamat bind (default 127.0.0.1).")
+    serve.add_argument("--port", type=int, help="Port HTTP (default 8080).")
+    serve.add_argument("--scrape-on-miss", action="store_true", help="Jadwalkan scrape latar belakang untuk rute yang belum ada.")
+    serve.set_defaults(handler=cmd_serve)
+
+    daemon = subparsers.add_parser("daemon", parents=[common], help="Daemon yang menjaga pool Chrome hangat untuk run scraper.")
+    daemon.add_argument("--pool-size", type=int, help="Jumlah maksimum Chrome di pool (default 2).")
+    daemon.add_argument("--port", type=int, help="Port API lokal (default 8766).")
+    daemon.add_argument("--headless", action="store_true", help="Jalankan Chrome tanpa UI.")
+    daemon.add_argument("--booking-url", help="Halaman yang dimuat untuk menghangatkan Chrome.")
+    daemon.add_argument("--status", action="store_true", help="Tampilkan status daemon yang sedang berjalan.")
+    daemon.set_defaults(handler=cmd_daemon)
+
+    route_stats = subparsers.add_parser("route-stats", parents=[common], help="Tampilkan statistik hasil per rute untuk perencana.")
+    route_stats.add_argument("--seed-from", nargs="+", metavar="CSV", help="Isi statistik awal dari CSV hasil scraping lama.")
+    route_stats.add_argument("--limit", type=int, default=20, help="Jumlah rute yang ditampilkan.")
+    route_stats.set_defaults(handler=cmd_route_stats)
+
+    route = subparsers.add_parser("route", parents=[common], help="Cari perjalanan tercepat/termurah (boleh transit) dari CSV jadwal.")
+    route.add_argument("csv_files", nargs="+", help="File CSV atau pola glob.")
+    route.add_argument("--from", dest="origin", required=True, help="Kode atau nama stasiun asal.")
+    route.add_argument("--to", dest="destination", required=True, help="Kode atau nama stasiun tujuan.")
+    route.add_argument("--after", required=True, help="Berangkat paling awal, misal \"2025-06-02 18:00\".")
+    route.add_argument("--arrive-by", help="Tiba paling lambat, misal \"2025-06-03 10:00\".")
+    route.add_argument("--min-transfer", type=int, help="Waktu transit minimum dalam menit (default 30).")
+    route.add_argument("--cheapest", action="store_true", help="Cari total harga termurah alih-alih tiba tercepat.")
+    route.add_argument("--include-sold-out", action="store_true", help="Ikut sertakan kelas yang kursinya habis.")
+    route.set_defaults(handler=cmd_route)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        print(f"Error saat memuat konfigurasi: {e}")
+        return 1
+    try:
+        return args.handler(args, config) or 0
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    except ImportError as e:
+        # Dependensi opsional (pyarrow, psutil, ...) yang dibutuhkan perintah ini belum terpasang
+        print(f"Error: modul yang dibutuhkan belum terpasang ({e}).")
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+'''
+Konfigurasi kai_scraper. Nilai default di bawah menggantikan blok
+"KONFIGURASI" yang dulu ditulis langsung di __main__ setiap skrip; file JSON
+yang diberikan lewat --config cukup berisi key yang ingin diubah.
+'''
+import copy
+import json
+import os
+
+# File konfigurasi yang dipakai otomatis jika ada di direktori kerja
+DEFAULT_CONFIG_FILENAME = "kai_scraper.json"
+
+DEFAULT_CONFIG = {
+    # Path ke chromedriver; kosong = cari di PATH sistem
+    "webdriver_path": "",
+    "headless": False,
+    # Ganti ke URL server tiruan (python -m kai_scraper.mock_server) untuk uji offline
+    "booking_url": "https://booking.kai.id/",
+    # "page", "fragment", "fragment_gzip" atau "records" (lihat browser.CAPTURE_MODES)
+    "capture_mode": "fragment_gzip",
+    "adult_passengers": 1,
+    "infant_passengers": 0,
+    "delay_between_searches": 5,
+    "parse_pool": {
+        "enabled": True,
+        "workers": None, # None = jumlah core CPU
+        "queue_size": 8,
+    },
+    "retry": {
+        "breaker_cooldown": 60,
+    },
+    "driver": {
+        "max_queries_per_driver": 150,
+        "max_rss_mb": 1500,
+        "max_consecutive_failures": 3,
+    },
+    "browser_daemon": {
+        # Pinjam Chrome yang sudah hangat dari daemon (python -m kai_scraper daemon), lihat browser_daemon.py
+        "enabled": False,
+        "host": "127.0.0.1",
+        # 8765 dipakai server tiruan KAI (mock_server), 8080 oleh layanan query
+        "port": 8766,
+        "pool_size": 2,
+        # Jumlah Chrome yang tetap hangat walaupun menganggur lebih lama dari idle_timeout
+        "min_warm": 1,
+        "idle_timeout": 900,
+        "health_check_interval": 30,
+        "max_leases_per_browser": 50,
+        # Direktori profil Chrome persisten (cache dan cookie dipakai ulang antar run)
+        "profile_dir": "chrome_profiles",
+        "lease_wait": 30,
+        # Jika daemon tidak berjalan, jalankan Chrome sendiri seperti biasa
+        "fallback_to_local": True,
+    },
+    "archive": {
+        # Simpan setiap halaman hasil mentah + konteks query agar bisa di-parse ulang (reparse)
+        "enabled": False,
+        "dir": "arsip_halaman",
+    },
+    "reparse": {
+        "workers": None, # None = jumlah core CPU
+        "pages_per_task": 32,
+    },
+    "planner": {
+        # Statistik per rute (baris/query, sukses, latensi) dari run sebelumnya, lihat planner.py
+        "enabled": True,
+        "stats_file": "route_stats.json",
+        # Peluang menyisipkan rute yang belum pernah dicoba di setiap posisi antrian
+        "exploration_share": 0.2,
+    },
+    "multitab": {
+        # Satu Chrome dengan beberapa tab bergantian alih-alih satu query per browser
+        "enabled": False,
+        "tabs": 4,
+        # "tab" (berbagi cookie) atau "context" (browser context terisolasi via CDP)
+        "isolation": "tab",
+    },
+    "profiling": {
+        # "off", "run" (seluruh run) atau "query" (setiap query ke-N), lihat profiling.py
+        "mode": "off",
+        "every_n_queries": 10,
+        "top_functions": 40,
+        "top_allocations": 25,
+        # None = "<nama output>_profiles/" di sebelah file CSV
+        "output_dir": None,
+    },
+    "sweep": {
+        "origin_stations": [
+            ["SURABAYA PASAR TURI", "SBI"],
+            ["SURABAYA", "SBI"],
+        ],
+        "destination_stations": [
+            ["PASARSENEN", "PSE"],
+            ["GAMBIR", "GMR"],
+            ["JAKARTA KOTA", "JAKK"],
+            ["JATINEGARA", "JNG"],
+        ],
+        "start_date": "2025-06-03",
+        "num_days": 1,
+        "output": "git_test.csv",
+    },
+    "sample": {
+        "origin_stations": [
+            ["SURABAYA PASAR TURI", "SBI"],
+            ["SURABAYA GUBENG", "SGU"],
+            ["SURABAYA", "SBI"],
+            ["YOGYAKARTA", "YK"],
+            ["SOLO BALAPAN", "SLO"],
+            ["SEMARANG PONCOL", "SMC"],
+            ["BANDUNG", "BD"],
+            ["CIREBON", "CN"],
+            ["PURWOKERTO", "PWT"],
+            ["MALANG", "ML"],
+            ["BLITAR", "BL"],
+            ["KEDIRI", "KD"],
+            ["MADIUN", "MDN"],
+            ["NGAWI", "NGW"],
+        ],
+        "destination_stations": [
+            ["PASARSENEN", "PSE"],
+            ["GAMBIR", "GMR"],
+            ["JAKARTA KOTA", "JAKK"],
+            ["JATINEGARA", "JNG"],
+            ["YOGYAKARTA", "YK"],
+            ["SOLO BALAPAN", "SLO"],
+            ["SEMARANG PONCOL", "SMC"],
+            ["BANDUNG", "BD"],
+            ["CIREBON", "CN"],
+            ["PURWOKERTO", "PWT"],
+            ["SURABAYA PASAR TURI", "SBI"],
+            ["SURABAYA GUBENG", "SGU"],
+            ["MALANG", "ML"],
+            ["BLITAR", "BL"],
+            ["KEDIRI", "KD"],
+            ["MADIUN", "MDN"],
+        ],
+        # Jadwal tidak berubah antar hari, jadi cukup satu tanggal
+        "target_date": "2025-06-03",
+        "target_sample_count": 1000,
+        "delay_between_searches": 3,
+        "output": "jadwal_kereta_random_1000.csv",
+    },
+    "query_service": {
+        "host": "127.0.0.1",
+        "port": 8080,
+        "csv_files": ["jadwal_kereta_*.csv"],
+        "cache_size": 1024,
+        # Cache miss menjadwalkan scrape latar belakang (butuh Chrome) alih-alih 404
+        "scrape_on_miss": False,
+        # Chrome scrape latar belakang ditutup setelah sekian detik tanpa cache miss
+        "scraper_idle_timeout": 600,
+    },
+    "stations": {
+        "url": "https://id.wikipedia.org/wiki/Daftar_stasiun_kereta_api_di_Indonesia",
+        "output": "stasiun.txt",
+    },
+}
+
+def _deep_merge(base, overrides):
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+def load_config(path=None):
+    '''
+    Memuat konfigurasi: DEFAULT_CONFIG yang ditimpa isi file JSON.
+
+    Jika path tidak diberikan, kai_scraper.json di direktori kerja dipakai
+    bila ada. Path yang diberikan tetapi tidak ada akan memunculkan error.
+    '''
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path is None:
+        if not os.path.exists(DEFAULT_CONFIG_FILENAME):
+            return config
+        path = DEFAULT_CONFIG_FILENAME
+    with open(path, encoding='utf-8') as f:
+        overrides = json.load(f)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"File konfigurasi '{path}' harus berisi objek JSON.")
+    print(f"Konfigurasi dimuat dari '{path}'.")
+    return _deep_merge(config, overrides)
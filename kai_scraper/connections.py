@@ -0,0 +1,477 @@
+'''
+Indeks koneksi untuk pencarian perjalanan multi-kaki (dengan transit) di atas
+jadwal hasil scraping.
+
+Setiap baris jadwal menjadi satu "koneksi": naik di departure_station pada
+departure_datetime, turun di arrival_station pada arrival_datetime. Koneksi
+disimpan dalam array yang terurut menurut waktu berangkat sehingga pencarian
+bisa memakai Connection Scan Algorithm (CSA): cukup satu kali pemindaian linear
+mulai dari waktu berangkat paling awal, tanpa struktur graf.
+
+    index = ConnectionIndex.from_csvs("jadwal_kereta_*.csv")
+    index.earliest_arrival("SBI", "GMR", "2025-06-02 18:00", arrive_by="2025-06-03 10:00")
+    index.cheapest("SBI", "GMR", "2025-06-02 18:00", arrive_by="2025-06-03 10:00")
+
+Waktu disimpan sebagai menit sejak epoch (int) agar pemindaian tidak
+membuat objek datetime. Stasiun bisa dicari dengan nama persis seperti di
+halaman KAI ("SURABAYA PASAR TURI") atau kode ("SBI").
+'''
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from .schedule_loader import load_schedule_csvs, schedules_from_rows
+
+# Waktu pindah kereta minimum di stasiun transit
+DEFAULT_MIN_TRANSFER_MINUTES = 30
+
+# Batas pemindaian jika arrive_by tidak diberikan
+DEFAULT_SEARCH_HORIZON_MINUTES = 48 * 60
+
+# Satu koneksi dianggap sama jika kereta, kelas, rute dan waktu berangkatnya sama;
+# baris yang lebih baru menggantikan yang lama (harga/kursi terbaru)
+CONNECTION_KEY_COLUMNS = ['train_number', 'train_class', 'departure_station', 'arrival_station', 'departure_minute']
+
+# Urutan pemindaian: waktu berangkat, lalu waktu tiba, lalu harga (kosong paling akhir)
+SORT_COLUMNS = ['departure_minute', 'arrival_minute', 'price']
+
+_INF = float('inf')
+
+def to_epoch_minutes(value):
+    '''datetime / pandas.Timestamp / string "YYYY-MM-DD HH:MM" -> menit sejak epoch.'''
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_localize(None)
+    return int(timestamp.value // 60_000_000_000)
+
+def from_epoch_minutes(minutes):
+    return pd.Timestamp(int(minutes) * 60_000_000_000).to_pydatetime()
+
+def _datetime_column_minutes(series):
+    return series.to_numpy(dtype='datetime64[m]').astype(np.int64)
+
+def schedules_to_connections(schedules):
+    '''
+    DataFrame bertipe dari schedule_loader -> DataFrame koneksi. Baris tanpa
+    waktu berangkat, atau yang tiba tidak setelah berangkat, dibuang.
+    '''
+    schedules = schedules[schedules['departure_datetime'].notna()]
+    arrival = schedules['arrival_datetime']
+    if 'duration_minutes' in schedules.columns:
+        # Tanggal tiba kadang kosong; hitung dari durasi jika ada
+        estimated = schedules['departure_datetime'] + pd.to_timedelta(schedules['duration_minutes'].astype('float64'), unit='m')
+        arrival = arrival.fillna(estimated)
+    schedules = schedules[arrival.notna()]
+    arrival = arrival[arrival.notna()]
+
+    connections = pd.DataFrame({
+        'departure_station': schedules['departure_station'].astype('string').str.strip().to_numpy(),
+        'arrival_station': schedules['arrival_station'].astype('string').str.strip().to_numpy(),
+        'departure_minute': _datetime_column_minutes(schedules['departure_datetime']),
+        'arrival_minute': _datetime_column_minutes(arrival),
+        'train_name': schedules['train_name'].astype('string').to_numpy(),
+        'train_number': schedules['train_number'].astype('string').to_numpy(),
+        'train_class': schedules['train_class'].astype('string').to_numpy(),
+        'price': schedules['price'].astype('Int64').to_numpy(dtype='float64', na_value=np.nan),
+        'seats_left': schedules['seats_left'].astype('Int32').to_numpy(dtype='float64', na_value=np.nan),
+        'is_available': schedules['is_available'].astype('boolean').fillna(True).to_numpy(dtype=bool),
+    })
+    return connections[connections['arrival_minute'] > connections['departure_minute']]
+
+def _sort_keys(connections):
+    '''Kunci SORT_COLUMNS sebagai structured array (urut leksikografis) untuk np.searchsorted.'''
+    keys = np.empty(len(connections), dtype=[('departure', 'i8'), ('arrival', 'i8'), ('price', 'f8')])
+    keys['departure'] = connections['departure_minute'].to_numpy()
+    keys['arrival'] = connections['arrival_minute'].to_numpy()
+    keys['price'] = np.nan_to_num(connections['price'].to_numpy(dtype='float64'), nan=np.inf)
+    return keys
+
+def station_codes_from_schedules(schedules):
+    '''
+    Peta kode -> {nama stasiun} dari kolom hidden_query_*: kode query hanya
+    dipakai jika nama stasiun di baris sama dengan nama stasiun query.
+    '''
+    codes = {}
+    for side, station_column in (('origin', 'departure_station'), ('destination', 'arrival_station')):
+        code_column, name_column = f'hidden_query_{side}_code', f'hidden_query_{side}_name'
+        if code_column not in schedules.columns or name_column not in schedules.columns:
+            continue
+        pairs = schedules[[station_column, code_column, name_column]].astype('string').drop_duplicates()
+        for station, code, name in pairs.itertuples(index=False):
+            if pd.notna(code) and pd.notna(station) and station.strip() == str(name).strip():
+                codes.setdefault(code.strip(), set()).add(station.strip())
+    return codes
+
+class ConnectionIndex:
+    '''
+    Array koneksi terurut (waktu berangkat, waktu tiba, harga) ditambah indeks
+    keberangkatan per stasiun.
+
+    Args:
+        min_transfer_minutes (int): Waktu pindah minimum default untuk query.
+    '''
+
+    def __init__(self, min_transfer_minutes=DEFAULT_MIN_TRANSFER_MINUTES):
+        self.min_transfer_minutes = min_transfer_minutes
+        self.station_codes = {}
+        self._connections = pd.DataFrame()
+        self._station_ids = {}
+        self._station_names = []
+        self._build_arrays()
+
+    @classmethod
+    def from_schedules(cls, schedules, **kwargs):
+        index = cls(**kwargs)
+        index.add_schedules(schedules)
+        return index
+
+    @classmethod
+    def from_csvs(cls, paths, **kwargs):
+        return cls.from_schedules(load_schedule_csvs(paths), **kwargs)
+
+    def __len__(self):
+        return len(self._departure)
+
+    @property
+    def stations(self):
+        return list(self._station_names)
+
+    def add_station_codes(self, station_pairs):
+        '''Menambah alias kode dari pasangan [nama, kode], misal daftar stasiun di konfigurasi.'''
+        for name, code in station_pairs:
+            self.station_codes.setdefault(code.strip(), set()).add(name.strip())
+
+    def add_schedules(self, schedules):
+        '''
+        Menambah baris jadwal baru (DataFrame bertipe dari schedule_loader).
+        Hanya koneksi baru yang diurutkan; posisinya di array lama dicari dengan
+        np.searchsorted lalu disisipkan, dan koneksi lama dengan kunci yang sama
+        (CONNECTION_KEY_COLUMNS) diganti. Hasilnya sama dengan mengurutkan ulang
+        seluruh koneksi, tetapi biayanya O(N + M log M), bukan O(N log N).
+
+        Returns:
+            int: Jumlah koneksi setelah penggabungan.
+        '''
+        if schedules is None or len(schedules) == 0:
+            return len(self)
+        for code, names in station_codes_from_schedules(schedules).items():
+            self.station_codes.setdefault(code, set()).update(names)
+
+        new_connections = schedules_to_connections(schedules).drop_duplicates(subset=CONNECTION_KEY_COLUMNS, keep='last')
+        if len(new_connections) == 0:
+            return len(self)
+        # Untuk waktu berangkat yang sama, koneksi yang tiba lebih awal lalu yang
+        # lebih murah dipindai lebih dulu
+        new_connections = new_connections.sort_values(
+            SORT_COLUMNS, kind='stable', na_position='last'
+        ).reset_index(drop=True)
+        # Id stasiun disimpan sebagai kolom agar hanya baris baru yang perlu dipetakan
+        for name in pd.unique(pd.concat([new_connections['departure_station'], new_connections['arrival_station']])):
+            if name not in self._station_ids:
+                self._station_ids[name] = len(self._station_names)
+                self._station_names.append(name)
+        new_connections['from_id'] = new_connections['departure_station'].map(self._station_ids).astype(np.int64)
+        new_connections['to_id'] = new_connections['arrival_station'].map(self._station_ids).astype(np.int64)
+        self._connections = self._merge_sorted(new_connections)
+        self._build_arrays()
+        return len(self)
+
+    def _merge_sorted(self, new_connections):
+        '''Sisipkan koneksi baru yang sudah terurut ke self._connections (juga terurut).'''
+        existing = self._connections
+        if len(existing) == 0:
+            return new_connections
+        replaced = self._replaced_positions(new_connections)
+        if len(replaced):
+            existing = existing.drop(index=replaced).reset_index(drop=True)
+
+        # side='right': pada kunci urutan yang sama, koneksi lama tetap di depan
+        # seperti pada sort stabil atas gabungan lama + baru
+        insert_at = np.searchsorted(_sort_keys(existing), _sort_keys(new_connections), side='right')
+        new_positions = insert_at + np.arange(len(new_connections))
+        total = len(existing) + len(new_connections)
+        order = np.empty(total, dtype=np.intp)
+        is_new = np.zeros(total, dtype=bool)
+        is_new[new_positions] = True
+        order[new_positions] = len(existing) + np.arange(len(new_connections))
+        order[~is_new] = np.arange(len(existing))
+        return pd.concat([existing, new_connections], ignore_index=True).take(order).reset_index(drop=True)
+
+    def _replaced_positions(self, new_connections):
+        '''Posisi koneksi lama yang kuncinya muncul lagi di koneksi baru.'''
+        existing = self._connections
+        candidates = existing[np.isin(existing['departure_minute'].to_numpy(), new_connections['departure_minute'].to_numpy())]
+        if len(candidates) == 0:
+            return []
+        matches = candidates[CONNECTION_KEY_COLUMNS].reset_index().merge(
+            new_connections[CONNECTION_KEY_COLUMNS], on=CONNECTION_KEY_COLUMNS)
+        return matches['index'].unique()
+
+    def add_rows(self, rows):
+        '''Menambah baris mentah hasil parser (list dict) langsung setelah scraping.'''
+        if not rows:
+            return len(self)
+        return self.add_schedules(schedules_from_rows(rows))
+
+    def _build_arrays(self):
+        connections = self._connections
+        # List Python biasa: akses per elemen di loop pemindaian jauh lebih cepat
+        # daripada indexing array numpy. Konversinya tetap vectorized agar
+        # add_schedules tidak menjalankan loop Python sepanjang seluruh indeks.
+        if len(connections):
+            departure = connections['departure_minute'].to_numpy()
+            from_ids = connections['from_id'].to_numpy()
+            prices = connections['price'].to_numpy()
+            missing_price = np.isnan(prices)
+            price_objects = np.where(missing_price, 0, prices).astype(np.int64).astype(object)
+            price_objects[missing_price] = None
+            self._departure = departure.tolist()
+            self._arrival = connections['arrival_minute'].tolist()
+            self._from = from_ids.tolist()
+            self._to = connections['to_id'].tolist()
+            self._price = price_objects.tolist()
+            self._available = connections['is_available'].tolist()
+            # Indeks keberangkatan per stasiun: posisi koneksi (terurut waktu berangkat)
+            by_station = pd.Series(from_ids).groupby(from_ids, sort=False).indices
+        else:
+            self._departure, self._arrival, self._from, self._to, self._price, self._available = [], [], [], [], [], []
+            departure, by_station = np.empty(0, dtype=np.int64), {}
+
+        self._departures_by_station = {int(station_id): positions.tolist() for station_id, positions in by_station.items()}
+        self._departure_times_by_station = {
+            int(station_id): departure[positions].tolist() for station_id, positions in by_station.items()
+        }
+
+    def resolve_station(self, station):
+        '''Nama stasiun atau kode -> set id stasiun. ValueError jika tidak dikenal.'''
+        key = station.strip()
+        if key in self._station_ids:
+            return {self._station_ids[key]}
+        upper = key.upper()
+        ids = {self._station_ids[name] for name in self.station_codes.get(upper, ()) if name in self._station_ids}
+        if not ids and upper in self._station_ids:
+            ids = {self._station_ids[upper]}
+        if not ids:
+            raise ValueError(f"Stasiun '{station}' tidak ada di indeks koneksi.")
+        return ids
+
+    def _leg(self, position):
+        row = self._connections.iloc[position]
+        return {
+            'train_name': row['train_name'],
+            'train_number': row['train_number'],
+            'train_class': row['train_class'],
+            'departure_station': row['departure_station'],
+            'arrival_station': row['arrival_station'],
+            'departure_datetime': from_epoch_minutes(row['departure_minute']),
+            'arrival_datetime': from_epoch_minutes(row['arrival_minute']),
+            'price': self._price[position],
+            'seats_left': None if np.isnan(row['seats_left']) else int(row['seats_left']),
+        }
+
+    def _journey(self, positions):
+        legs = [self._leg(position) for position in positions]
+        prices = [leg['price'] for leg in legs]
+        departure_minute, arrival_minute = self._departure[positions[0]], self._arrival[positions[-1]]
+        return {
+            'departure_datetime': legs[0]['departure_datetime'],
+            'arrival_datetime': legs[-1]['arrival_datetime'],
+            'duration_minutes': arrival_minute - departure_minute,
+            'total_price': None if None in prices else sum(prices),
+            'transfers': len(legs) - 1,
+            'legs': legs,
+        }
+
+    def _scan_bounds(self, depart_after, arrive_by):
+        start_minute = to_epoch_minutes(depart_after)
+        end_minute = to_epoch_minutes(arrive_by) if arrive_by is not None else start_minute + DEFAULT_SEARCH_HORIZON_MINUTES
+        return start_minute, end_minute, bisect_left(self._departure, start_minute), bisect_right(self._departure, end_minute)
+
+    def earliest_arrival(self, origin, destination, depart_after, arrive_by=None,
+                         min_transfer_minutes=None, available_only=True):
+        '''
+        Perjalanan yang paling cepat tiba di tujuan (boleh transit), berangkat
+        tidak sebelum depart_after dan tiba paling lambat arrive_by. Seperti
+        cheapest, koneksi yang kursinya habis dilewati kecuali
+        available_only=False.
+
+        Returns:
+            dict | None: {'departure_datetime', 'arrival_datetime',
+            'duration_minutes', 'total_price', 'transfers', 'legs': [...]}
+        '''
+        sources, targets = self.resolve_station(origin), self.resolve_station(destination)
+        transfer = self.min_transfer_minutes if min_transfer_minutes is None else min_transfer_minutes
+        start_minute, end_minute, first, last = self._scan_bounds(depart_after, arrive_by)
+
+        departure, arrival, from_ids, to_ids, available = self._departure, self._arrival, self._from, self._to, self._available
+        # ready[s]: waktu paling awal bisa naik kereta di s (tiba + waktu transit)
+        ready = {station_id: start_minute for station_id in sources}
+        best_arrival = {}
+        arrived_by = {}
+        best_target = _INF
+        for position in range(first, last):
+            departure_minute = departure[position]
+            if departure_minute >= best_target:
+                break
+            if ready.get(from_ids[position], _INF) > departure_minute:
+                continue
+            if available_only and not available[position]:
+                continue
+            station_id, arrival_minute = to_ids[position], arrival[position]
+            if arrival_minute > end_minute or arrival_minute >= best_arrival.get(station_id, _INF):
+                continue
+            best_arrival[station_id] = arrival_minute
+            arrived_by[station_id] = position
+            if station_id in targets:
+                best_target = min(best_target, arrival_minute)
+            elif station_id not in sources:
+                ready[station_id] = arrival_minute + transfer
+
+        reached = [station_id for station_id in targets if best_arrival.get(station_id) == best_target]
+        if not reached:
+            return None
+        positions = []
+        station_id = reached[0]
+        while station_id not in sources:
+            position = arrived_by[station_id]
+            positions.append(position)
+            station_id = from_ids[position]
+        return self._journey(positions[::-1])
+
+    def cheapest(self, origin, destination, depart_after, arrive_by=None,
+                 min_transfer_minutes=None, available_only=True):
+        '''
+        Perjalanan dengan total harga termurah yang tiba paling lambat arrive_by;
+        jika harganya sama, yang tiba paling awal. Koneksi tanpa harga dilewati.
+
+        Setiap stasiun menyimpan himpunan label Pareto (waktu siap naik, total
+        harga), sehingga rute murah yang lebih lambat tidak dibuang oleh rute
+        cepat yang mahal. Koneksi yang kursinya habis dilewati kecuali
+        available_only=False.
+        '''
+        sources, targets = self.resolve_station(origin), self.resolve_station(destination)
+        transfer = self.min_transfer_minutes if min_transfer_minutes is None else min_transfer_minutes
+        start_minute, end_minute, first, last = self._scan_bounds(depart_after, arrive_by)
+
+        departure, arrival, from_ids, to_ids = self._departure, self._arrival, self._from, self._to
+        prices, available = self._price, self._available
+        # label: (waktu siap, total harga, posisi koneksi, indeks label induk)
+        labels = []
+        labels_at = {}
+        for station_id in sources:
+            labels.append((start_minute, 0, None, None))
+            labels_at[station_id] = [len(labels) - 1]
+        best_target = None # (harga, waktu tiba, indeks label)
+
+        for position in range(first, last):
+            price = prices[position]
+            if price is None or (available_only and not available[position]):
+                continue
+            station_labels = labels_at.get(from_ids[position])
+            if not station_labels:
+                continue
+            departure_minute = departure[position]
+            boarding = None
+            for label_id in station_labels:
+                ready_minute, cost = labels[label_id][0], labels[label_id][1]
+                if ready_minute <= departure_minute and (boarding is None or cost < labels[boarding][1]):
+                    boarding = label_id
+            if boarding is None:
+                continue
+
+            station_id, arrival_minute = to_ids[position], arrival[position]
+            cost = labels[boarding][1] + price
+            if arrival_minute > end_minute or (best_target is not None and cost > best_target[0]):
+                continue
+            if station_id in targets:
+                if best_target is None or (cost, arrival_minute) < best_target[:2]:
+                    labels.append((arrival_minute, cost, position, boarding))
+                    best_target = (cost, arrival_minute, len(labels) - 1)
+                continue
+            if station_id in sources:
+                continue
+
+            ready_minute = arrival_minute + transfer
+            existing = labels_at.setdefault(station_id, [])
+            if any(labels[label_id][0] <= ready_minute and labels[label_id][1] <= cost for label_id in existing):
+                continue
+            existing[:] = [label_id for label_id in existing
+                           if not (ready_minute <= labels[label_id][0] and cost <= labels[label_id][1])]
+            labels.append((ready_minute, cost, position, boarding))
+            existing.append(len(labels) - 1)
+
+        if best_target is None:
+            return None
+        positions = []
+        label_id = best_target[2]
+        while labels[label_id][2] is not None:
+            positions.append(labels[label_id][2])
+            label_id = labels[label_id][3]
+        return self._journey(positions[::-1])
+
+    def departures(self, station, after, before=None, available_only=False):
+        '''Semua keberangkatan langsung dari sebuah stasiun dalam rentang waktu.'''
+        start_minute = to_epoch_minutes(after)
+        end_minute = to_epoch_minutes(before) if before is not None else start_minute + 24 * 60
+        legs = []
+        for station_id in self.resolve_station(station):
+            times = self._departure_times_by_station.get(station_id, [])
+            positions = self._departures_by_station.get(station_id, [])
+            for i in range(bisect_left(times, start_minute), bisect_right(times, end_minute)):
+                position = positions[i]
+                if available_only and not self._available[position]:
+                    continue
+                legs.append(self._leg(position))
+        return sorted(legs, key=lambda leg: leg['departure_datetime'])
+
+def format_journey(journey):
+    '''Ringkasan perjalanan yang mudah dibaca untuk output CLI.'''
+    if journey is None:
+        return "Tidak ada perjalanan yang memenuhi syarat."
+    total_price = f"Rp {journey['total_price']:,}".replace(',', '.') if journey['total_price'] is not None else "harga tidak diketahui"
+    hours, minutes = divmod(journey['duration_minutes'], 60)
+    lines = [f"{journey['departure_datetime']:%Y-%m-%d %H:%M} -> {journey['arrival_datetime']:%Y-%m-%d %H:%M} "
+             f"({hours}j {minutes}m, {journey['transfers']} transit, {total_price})"]
+    for leg in journey['legs']:
+        leg_price = f"Rp {leg['price']:,}".replace(',', '.') if leg['price'] is not None else "-"
+        lines.append(f"  {leg['departure_datetime']:%d/%m %H:%M} {leg['departure_station']} -> "
+                     f"{leg['arrival_datetime']:%d/%m %H:%M} {leg['arrival_station']}  "
+                     f"{leg['train_name']} {leg['train_number']} {leg['train_class']} ({leg_price})")
+    return "\n".join(lines)
+
+if __name__ == '__main__':
+    import random
+    import sys
+    import time
+
+    # Benchmark: bangun indeks sekali dari N koneksi acak, lalu tambahkan jadwal
+    # per halaman (20 baris) seperti saat scraping berjalan.
+    total_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = random.Random(1)
+    station_names = [f"STASIUN {i}" for i in range(60)]
+    base = pd.Timestamp('2025-06-01')
+    departures = base + pd.to_timedelta([rng.randrange(60 * 24 * 30) for _ in range(total_rows)], unit='m')
+    schedules = pd.DataFrame({
+        'train_name': 'KERETA',
+        'train_number': [str(rng.randrange(500)) for _ in range(total_rows)],
+        'train_class': [rng.choice(['Ekonomi', 'Bisnis', 'Eksekutif']) for _ in range(total_rows)],
+        'departure_station': [rng.choice(station_names) for _ in range(total_rows)],
+        'arrival_station': [rng.choice(station_names) for _ in range(total_rows)],
+        'departure_datetime': departures,
+        'arrival_datetime': departures + pd.to_timedelta([rng.randrange(60, 900) for _ in range(total_rows)], unit='m'),
+        'price': pd.array([rng.randrange(50, 900) * 1000 for _ in range(total_rows)], dtype='Int64'),
+        'seats_left': pd.array([rng.randrange(50) for _ in range(total_rows)], dtype='Int32'),
+        'is_available': pd.array([True] * total_rows, dtype='boolean'),
+    })
+    page_size, pages = 20, 50
+
+    started = time.perf_counter()
+    index = ConnectionIndex.from_schedules(schedules.iloc[:-page_size * pages])
+    print(f"Bangun awal {len(index)} koneksi: {time.perf_counter() - started:.3f} detik.")
+    started = time.perf_counter()
+    for page in range(pages, 0, -1):
+        index.add_schedules(schedules.iloc[-page_size * page:len(schedules) - page_size * (page - 1)])
+    elapsed = time.perf_counter() - started
+    print(f"{pages} kali add_schedules ({page_size} baris): {elapsed / pages * 1000:.1f} ms per halaman, "
+          f"{len(index)} koneksi.")
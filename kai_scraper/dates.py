@@ -0,0 +1,32 @@
+'''
+Format tanggal untuk input form KAI (DD-NamaBulan-YYYY, misal 02-Juni-2025).
+'''
+import locale
+
+BULAN_INDONESIA = {
+    1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
+    7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
+}
+
+INDONESIAN_LOCALES = ['id_ID.UTF-8', 'id_ID', 'Indonesian_Indonesia.1252']
+
+def setup_indonesian_locale():
+    '''Mencoba mengatur LC_TIME ke Bahasa Indonesia. True jika berhasil.'''
+    for loc in INDONESIAN_LOCALES:
+        try:
+            locale.setlocale(locale.LC_TIME, loc)
+            print(f"Locale '{loc}' berhasil diatur untuk format tanggal (nama bulan akan dalam Bahasa Indonesia).")
+            return True
+        except locale.Error:
+            print(f"Gagal mengatur locale '{loc}'. Mencoba alternatif...")
+    print("PERINGATAN: Tidak ada locale Bahasa Indonesia yang berhasil diatur. Akan digunakan pemetaan bulan manual.")
+    return False
+
+def format_kai_date(date_obj, use_locale=False):
+    '''Format tanggal untuk form KAI; fallback ke pemetaan bulan manual jika locale gagal.'''
+    if use_locale:
+        try:
+            return date_obj.strftime("%d-%B-%Y")
+        except Exception as e:
+            print(f"  Error saat format tanggal dengan locale: {e}. Menggunakan fallback manual.")
+    return f"{date_obj.day:02d}-{BULAN_INDONESIA[date_obj.month]}-{date_obj.year}"
@@ -0,0 +1,227 @@
+'''
+Pengelola siklus hidup WebDriver untuk sweep panjang: memantau memori (RSS)
+Chrome, jumlah query dan kegagalan beruntun, lalu mendaur ulang driver secara
+proaktif atau mengganti sesi yang crash di tengah jalan.
+
+Driver dibuat dan dibuang lewat "driver source": LocalDriverSource menjalankan
+Chrome sendiri (setup_driver), browser_daemon.DaemonDriverSource meminjam
+Chrome yang sudah hangat dari daemon.
+'''
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from .browser import setup_driver
+
+try:
+    import psutil
+except ImportError: # psutil opsional; tanpa psutil dipakai pembacaan /proc (Linux)
+    psutil = None
+
+def _proc_children_map():
+    '''Peta ppid -> [pid] dari /proc, dipakai jika psutil tidak tersedia.'''
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='utf-8') as f:
+                # Field ke-4 adalah ppid; nama proses (field 2) bisa mengandung spasi
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+def _proc_rss_bytes(pid):
+    try:
+        with open(f'/proc/{pid}/status', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+def process_tree_rss_mb(root_pid):
+    '''Total RSS (MB) sebuah proses beserta seluruh turunannya, atau None jika tidak bisa diukur.'''
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / (1024 * 1024)
+
+    if not os.path.isdir('/proc'):
+        return None
+    children = _proc_children_map()
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += _proc_rss_bytes(pid)
+        stack.extend(children.get(pid, []))
+    return total / (1024 * 1024)
+
+def driver_rss_mb(driver):
+    '''RSS chromedriver + semua proses Chrome turunannya.'''
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None)
+    if process is None:
+        return None
+    return process_tree_rss_mb(process.pid)
+
+class LocalDriverSource:
+    '''Setiap driver adalah Chrome baru dari setup_driver; dibuang dengan quit().'''
+
+    def __init__(self, webdriver_path, headless=False):
+        self.webdriver_path = webdriver_path
+        self.headless = headless
+
+    def create(self, page_load_strategy=None):
+        return setup_driver(self.webdriver_path, headless=self.headless, page_load_strategy=page_load_strategy)
+
+    def dispose(self, driver, reason=None):
+        '''reason diisi jika driver dibuang karena bermasalah (crash, memori, ...).'''
+        driver.quit()
+
+    def rss_mb(self, driver):
+        return driver_rss_mb(driver)
+
+class DriverManager:
+    '''
+    Menyediakan WebDriver yang sehat untuk setiap query.
+
+    Args:
+        webdriver_path (str): Diteruskan ke setup_driver.
+        headless (bool): Diteruskan ke setup_driver.
+        max_queries_per_driver (int): Daur ulang setelah sekian query (None = tanpa batas).
+        max_rss_mb (float): Daur ulang jika RSS Chrome melewati batas ini (None = tanpa batas).
+        max_consecutive_failures (int): Daur ulang setelah sekian query gagal beruntun.
+        rss_sample_every (int): Ukur RSS setiap N query (pengukuran butuh beberapa ms).
+        driver_source: Sumber driver (default LocalDriverSource dengan
+            webdriver_path dan headless di atas).
+    '''
+
+    def __init__(self, webdriver_path, headless=False, max_queries_per_driver=150, max_rss_mb=1500,
+                 max_consecutive_failures=3, rss_sample_every=5, driver_source=None):
+        self.webdriver_path = webdriver_path
+        self.headless = headless
+        self.driver_source = driver_source or LocalDriverSource(webdriver_path, headless)
+        self.max_queries_per_driver = max_queries_per_driver
+        self.max_rss_mb = max_rss_mb
+        self.max_consecutive_failures = max_consecutive_failures
+        self.rss_sample_every = rss_sample_every
+        self.driver = None
+        self.driver_started_at = None
+        self.queries_on_driver = 0
+        self.consecutive_failures = 0
+        self.total_queries = 0
+        self.restarts = {}
+        # Setiap sampel: (total_query, nomor_driver, rss_mb)
+        self.rss_samples = []
+        self.driver_generation = 0
+
+    def get_driver(self):
+        '''Kembalikan driver aktif, buat baru jika belum ada.'''
+        if self.driver is None:
+            self.driver = self.driver_source.create()
+            if self.driver is None:
+                raise WebDriverException("Gagal membuat WebDriver baru.")
+            self.driver_generation += 1
+            self.driver_started_at = time.monotonic()
+            self.queries_on_driver = 0
+            self.consecutive_failures = 0
+        return self.driver
+
+    def is_healthy(self):
+        '''Health check ringan: sesi masih merespons perintah sederhana.'''
+        if self.driver is None:
+            return False
+        try:
+            self.driver.execute_script("return 1;")
+            return True
+        except WebDriverException:
+            return False
+
+    def recycle(self, reason):
+        '''Tutup driver aktif (jika ada); driver baru dibuat saat get_driver berikutnya.'''
+        self.restarts[reason] = self.restarts.get(reason, 0) + 1
+        if self.driver is not None:
+            print(f"  [driver-manager] Mendaur ulang WebDriver #{self.driver_generation} ({reason}) "
+                  f"setelah {self.queries_on_driver} query.")
+            try:
+                self.driver_source.dispose(self.driver, reason)
+            except Exception as e:
+                print(f"  [driver-manager] Error saat menutup WebDriver lama: {e}")
+        self.driver = None
+
+    def run_query(self, query_fn):
+        '''
+        Menjalankan query_fn(driver) dengan driver yang sehat. Exception dari
+        query_fn dilempar ulang setelah status driver diperbarui, sehingga
+        RetryQueue tetap bisa menjadwalkan ulang query tersebut.
+        '''
+        driver = self.get_driver()
+        try:
+            result = query_fn(driver)
+        except Exception:
+            self._after_query(success=False)
+            raise
+        self._after_query(success=True)
+        return result
+
+    def _after_query(self, success):
+        self.queries_on_driver += 1
+        self.total_queries += 1
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+        if not success and not self.is_healthy():
+            self.recycle("crash")
+            return
+
+        rss_mb = None
+        if self.rss_sample_every and self.total_queries % self.rss_sample_every == 0:
+            rss_mb = self.driver_source.rss_mb(self.driver)
+            if rss_mb is not None:
+                self.rss_samples.append((self.total_queries, self.driver_generation, rss_mb))
+
+        if self.max_consecutive_failures and self.consecutive_failures >= self.max_consecutive_failures:
+            self.recycle("kegagalan_beruntun")
+        elif self.max_rss_mb and rss_mb is not None and rss_mb >= self.max_rss_mb:
+            self.recycle("memori")
+        elif self.max_queries_per_driver and self.queries_on_driver >= self.max_queries_per_driver:
+            self.recycle("jumlah_query")
+
+    def quit(self):
+        if self.driver is not None:
+            print("Menutup WebDriver...")
+            self.driver_source.dispose(self.driver)
+            self.driver = None
+            print("WebDriver berhasil ditutup.")
+
+    def print_report(self):
+        '''Ringkasan restart dan tren memori per driver.'''
+        total_restarts = sum(self.restarts.values())
+        detail = ", ".join(f"{reason}={count}" for reason, count in sorted(self.restarts.items()))
+        print(f"Driver: {self.driver_generation} instance, {total_restarts} restart" + (f" ({detail})" if detail else ""))
+        if not self.rss_samples:
+            print("Tren memori Chrome: tidak ada sampel (pasang psutil atau jalankan di Linux).")
+            return
+        generations = {}
+        for query_index, generation, rss_mb in self.rss_samples:
+            generations.setdefault(generation, []).append((query_index, rss_mb))
+        for generation, samples in sorted(generations.items()):
+            first_query, first_rss = samples[0]
+            last_query, last_rss = samples[-1]
+            peak = max(rss for _, rss in samples)
+            growth = (last_rss - first_rss) / (last_query - first_query) if last_query > first_query else 0.0
+            print(f"  Driver #{generation}: RSS {first_rss:.0f} -> {last_rss:.0f} MB (puncak {peak:.0f} MB), "
+                  f"pertumbuhan {growth:+.1f} MB/query")
@@ -0,0 +1,118 @@
+'''
+Script untuk membandingkan dua jalur ekstraksi jadwal KAI pada halaman hasil
+yang sudah direkam (file .html):
+
+1. page_source + parse_schedule_html_content (BeautifulSoup di Python)
+2. extract_schedule_records_in_browser + parse_schedule_records (skrip di browser)
+
+Setiap halaman dibuka di Chrome lokal (file://), kedua jalur dijalankan, lalu
+hasilnya dibandingkan field per field dan latensinya diukur.
+
+Kesetaraan kedua jalur juga dicek tanpa browser oleh tests/test_extraction_parity.py
+memakai fixture yang di-commit. Untuk membuat ulang fixture record setelah
+skrip ekstraksi di browser diubah:
+
+    python -m kai_scraper.extraction_check --write-fixture tests/fixtures/results_page.html
+'''
+import glob
+import json
+import os
+import sys
+import time
+
+from .browser import extract_schedule_records_in_browser, setup_driver
+from .parsing import SCHEDULE_FIELDS, parse_schedule_html_content, parse_schedule_records
+
+def compare_rows(python_rows, browser_rows):
+    '''Mengembalikan list perbedaan (index, field, nilai_python, nilai_browser).'''
+    differences = []
+    if len(python_rows) != len(browser_rows):
+        differences.append((None, 'jumlah_baris', len(python_rows), len(browser_rows)))
+    for index, (python_row, browser_row) in enumerate(zip(python_rows, browser_rows)):
+        for field in SCHEDULE_FIELDS:
+            if python_row.get(field) != browser_row.get(field):
+                differences.append((index, field, python_row.get(field), browser_row.get(field)))
+    return differences
+
+def check_recorded_page(driver, html_path):
+    '''Menjalankan kedua jalur ekstraksi pada satu halaman rekaman.'''
+    query_context = {'recorded_page': os.path.basename(html_path)}
+    driver.get("file://" + os.path.abspath(html_path))
+
+    started = time.perf_counter()
+    page_html = driver.page_source
+    python_rows = parse_schedule_html_content(page_html, html_path, query_context)
+    python_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    raw_records = extract_schedule_records_in_browser(driver)
+    browser_rows = parse_schedule_records(raw_records, html_path, query_context)
+    browser_seconds = time.perf_counter() - started
+
+    return {
+        'page': html_path,
+        'rows': len(python_rows),
+        'differences': compare_rows(python_rows, browser_rows),
+        'python_seconds': python_seconds,
+        'browser_seconds': browser_seconds,
+    }
+
+def write_records_fixture(driver, html_path):
+    '''Menyimpan keluaran extract_schedule_records_in_browser ke "<halaman>.records.json".'''
+    driver.get("file://" + os.path.abspath(html_path))
+    records = extract_schedule_records_in_browser(driver)
+    json_path = os.path.splitext(html_path)[0] + ".records.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False, indent=1)
+    print(f"{len(records)} record ditulis ke '{json_path}'.")
+    return json_path
+
+if __name__ == '__main__':
+    # --- KONFIGURASI ---
+    WEBDRIVER_PATH = ""
+    RUN_HEADLESS = True
+    recorded_pages_dir = "recorded_pages" # Dipakai jika tidak ada file yang diberikan lewat argumen
+    # --- AKHIR KONFIGURASI ---
+
+    write_fixture = "--write-fixture" in sys.argv[1:]
+    html_paths = [arg for arg in sys.argv[1:] if arg != "--write-fixture"] or sorted(glob.glob(os.path.join(recorded_pages_dir, "*.html")))
+    if not html_paths:
+        print(f"Tidak ada halaman rekaman. Berikan file .html sebagai argumen atau isi folder '{recorded_pages_dir}'.")
+        sys.exit(1)
+
+    driver = setup_driver(WEBDRIVER_PATH, headless=RUN_HEADLESS)
+    if not driver:
+        print("Gagal setup WebDriver. Program berhenti.")
+        sys.exit(1)
+
+    if write_fixture:
+        try:
+            for html_path in html_paths:
+                write_records_fixture(driver, html_path)
+        finally:
+            driver.quit()
+        sys.exit(0)
+
+    results = []
+    try:
+        for html_path in html_paths:
+            print(f"\nMemeriksa: {html_path}")
+            results.append(check_recorded_page(driver, html_path))
+    finally:
+        driver.quit()
+
+    total_python = sum(r['python_seconds'] for r in results)
+    total_browser = sum(r['browser_seconds'] for r in results)
+    mismatched_pages = [r for r in results if r['differences']]
+
+    print("\n=== HASIL PERBANDINGAN ===")
+    for r in results:
+        status = "SAMA" if not r['differences'] else f"BERBEDA ({len(r['differences'])} field)"
+        print(f"{r['page']}: {r['rows']} baris, {status}, python={r['python_seconds']*1000:.1f} ms, browser={r['browser_seconds']*1000:.1f} ms")
+        for index, field, python_value, browser_value in r['differences'][:10]:
+            print(f"    baris {index} '{field}': python={python_value!r} browser={browser_value!r}")
+
+    print(f"\nTotal halaman: {len(results)}, berbeda: {len(mismatched_pages)}")
+    print(f"Rata-rata page_source + BeautifulSoup: {total_python / len(results) * 1000:.1f} ms/halaman")
+    print(f"Rata-rata ekstraksi di browser: {total_browser / len(results) * 1000:.1f} ms/halaman")
+    sys.exit(1 if mismatched_pages else 0)
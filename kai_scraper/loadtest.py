@@ -0,0 +1,166 @@
+'''
+Harness uji beban end-to-end terhadap server tiruan KAI (kai_scraper.mock_server).
+
+Menjalankan pipeline yang sama dengan sweep (sweep.run_queries: DriverManager
++ RetryQueue + ParseStage, atau mode multi-tab) pada beberapa tingkat
+konkurensi (jumlah tab dalam satu Chrome) dan melaporkan baris per detik,
+latensi query p50/p99, retry serta pemakaian memori.
+'''
+import copy
+import math
+import os
+import threading
+import time
+
+from .config import DEFAULT_CONFIG
+from .driver_manager import process_tree_rss_mb
+from .mock_server import MockBookingConfig, MockBookingServer
+
+def percentile(values, pct):
+    '''Persentil metode nearest-rank; 0.0 untuk list kosong.'''
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class MemorySampler:
+    '''Mencatat puncak RSS proses ini beserta semua turunannya (chromedriver + Chrome).'''
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="memory-sampler", daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            rss_mb = process_tree_rss_mb(os.getpid())
+            if rss_mb is not None:
+                self.peak_mb = max(self.peak_mb, rss_mb)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+def build_work_items(routes, dates, total_queries):
+    '''
+    Ulangi kombinasi rute x tanggal sampai jumlah query yang diminta, dalam
+    format work item sweep.run_queries. routes berisi (nama asal, kode asal,
+    nama tujuan, kode tujuan); dates berisi (YYYY-MM-DD, tanggal form KAI).
+    '''
+    combinations = [(route, date) for route in routes for date in dates]
+    work_items = []
+    for i in range(total_queries):
+        (origin_name, origin_code, dest_name, dest_code), (date_calendar, date_input) = combinations[i % len(combinations)]
+        work_items.append({
+            'query_origin_name': origin_name,
+            'query_origin_code': origin_code,
+            'query_destination_name': dest_name,
+            'query_destination_code': dest_code,
+            'query_date_calendar': date_calendar,
+            'query_date_input_format': date_input,
+        })
+    return work_items
+
+def load_test_config(booking_url, tabs=1, capture_mode="page", webdriver_path="", headless=True, parse_pool=True):
+    '''Konfigurasi run_queries untuk uji beban: default paket, diarahkan ke server tiruan.'''
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config.update(webdriver_path=webdriver_path, headless=headless, booking_url=booking_url,
+                  capture_mode=capture_mode, delay_between_searches=0)
+    config['parse_pool']['enabled'] = parse_pool
+    config['multitab']['enabled'] = tabs > 1
+    config['multitab']['tabs'] = tabs
+    config['browser_daemon']['enabled'] = False
+    config['archive']['enabled'] = False
+    return config
+
+def run_load_level(booking_url, work_items, tabs=1, capture_mode="page", webdriver_path="", headless=True, parse_pool=True):
+    '''
+    Menjalankan work_items lewat pipeline yang sama dengan sweep
+    (sweep.run_queries: DriverManager + RetryQueue atau multi-tab, ParseStage),
+    dengan `tabs` tab dalam satu Chrome (1 = mode biasa). Latensi per query
+    diambil dari callback on_attempt, termasuk percobaan yang di-retry.
+    '''
+    from .sweep import run_queries
+
+    config = load_test_config(booking_url, tabs=tabs, capture_mode=capture_mode, webdriver_path=webdriver_path,
+                              headless=headless, parse_pool=parse_pool)
+    latencies = []
+    attempts = {'failed': 0}
+
+    def record_attempt(query_context, success, seconds):
+        if success:
+            latencies.append(seconds)
+        else:
+            attempts['failed'] += 1
+
+    with MemorySampler() as memory:
+        run_started = time.perf_counter()
+        rows, failed_items = run_queries(work_items, config, delay_between_searches=0, on_attempt=record_attempt)
+        wall_seconds = time.perf_counter() - run_started
+
+    return {
+        'concurrency': f"{tabs} tab" if tabs > 1 else "1 browser",
+        'in_flight': tabs,
+        'queries': len(work_items),
+        'succeeded': len(latencies),
+        'failed': len(failed_items),
+        'failed_attempts': attempts['failed'],
+        'rows': len(rows),
+        'wall_seconds': wall_seconds,
+        'rows_per_second': len(rows) / wall_seconds if wall_seconds else 0.0,
+        'queries_per_second': len(latencies) / wall_seconds if wall_seconds else 0.0,
+        'p50_seconds': percentile(latencies, 50),
+        'p99_seconds': percentile(latencies, 99),
+        'peak_memory_mb': memory.peak_mb,
+    }
+
+def print_report(reports):
+    print("\n=== HASIL UJI BEBAN ===")
+    print(f"{'konkurensi':>10} {'query':>6} {'gagal':>6} {'retry':>6} {'baris':>7} {'baris/s':>8} {'query/s':>8} {'p50 (s)':>8} {'p99 (s)':>8} {'memori (MB)':>12} {'MB/query':>9} {'wall (s)':>9}")
+    for r in reports:
+        print(f"{r['concurrency']:>10} {r['queries']:>6} {r['failed']:>6} {r['failed_attempts']:>6} {r['rows']:>7} {r['rows_per_second']:>8.2f} "
+              f"{r['queries_per_second']:>8.2f} {r['p50_seconds']:>8.2f} {r['p99_seconds']:>8.2f} "
+              f"{r['peak_memory_mb']:>12.0f} {r['peak_memory_mb'] / r['in_flight']:>9.0f} {r['wall_seconds']:>9.1f}")
+
+if __name__ == '__main__':
+    # --- KONFIGURASI UJI BEBAN ---
+    WEBDRIVER_PATH = ""
+    RUN_HEADLESS = True
+    tab_levels = [1, 2, 4] # 1 = pipeline sweep biasa; N > 1 = mode multi-tab dengan N tab
+    queries_per_level = 20
+    CAPTURE_MODE = "page" # Bandingkan dengan "fragment", "fragment_gzip" atau "records"
+    mock_config = MockBookingConfig(
+        latency_ms=300,
+        latency_jitter_ms=100,
+        error_rate=0.02,
+        # Halaman kosong selesai jauh lebih cepat dan tidak menghasilkan baris;
+        # biarkan 0 agar p50/p99 dan baris/detik hanya mengukur halaman berisi jadwal
+        empty_rate=0.0,
+        padding_kb=200,
+        recorded_pages_dir=None # Isi dengan folder *.html hasil rekaman untuk memakai halaman asli
+    )
+    routes = [
+        ("SURABAYA PASAR TURI", "SBI", "PASARSENEN", "PSE"),
+        ("SURABAYA PASAR TURI", "SBI", "GAMBIR", "GMR"),
+        ("SURABAYA", "SBI", "JATINEGARA", "JNG"),
+    ]
+    dates = [("2025-06-03", "03-Juni-2025"), ("2025-06-04", "04-Juni-2025")]
+    # --- AKHIR KONFIGURASI ---
+
+    work_items = build_work_items(routes, dates, queries_per_level)
+    reports = []
+    with MockBookingServer(mock_config) as server:
+        print(f"Server tiruan berjalan di {server.url}")
+        for tabs in tab_levels:
+            print(f"\nMenjalankan {len(work_items)} query dengan {tabs} tab (mode {CAPTURE_MODE})...")
+            reports.append(run_load_level(server.url, work_items, tabs=tabs, capture_mode=CAPTURE_MODE,
+                                          webdriver_path=WEBDRIVER_PATH, headless=RUN_HEADLESS))
+        print(f"\nStatistik server: {server.stats}")
+    print_report(reports)
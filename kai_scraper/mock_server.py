@@ -0,0 +1,283 @@
+'''
+Server tiruan lokal untuk booking.kai.id.
+
+Menyajikan form pencarian dengan elemen yang sama seperti yang dipakai
+scrape_kai_with_selenium (origination-flexdatalist, destination-flexdatalist,
+departure_dateh, #submit) serta halaman hasil, baik hasil rekaman (file .html)
+maupun sintetis. Latensi, tingkat error dan ukuran halaman bisa diatur agar
+perubahan throughput bisa diukur offline dan berulang.
+'''
+import glob
+import hashlib
+import html
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+BULAN_INDONESIA = {
+    1: "Januari", 2: "Februari", 3: "Maret", 4: "April", 5: "Mei", 6: "Juni",
+    7: "Juli", 8: "Agustus", 9: "September", 10: "Oktober", 11: "November", 12: "Desember"
+}
+
+SYNTHETIC_TRAINS = [
+    ("ARGO BROMO ANGGREK", "Eksekutif (AA)"),
+    ("BLAMBANGAN EKSPRES", "Eksekutif (AD)"),
+    ("BLAMBANGAN EKSPRES", "Ekonomi (CD)"),
+    ("KERTAJAYA", "Ekonomi (CA)"),
+    ("DHARMAWANGSA EKSPRES", "Ekonomi (CB)"),
+    ("GUMARANG", "Bisnis (BA)"),
+    ("JAYAKARTA", "Ekonomi (CE)"),
+    ("SEMBRANI", "Eksekutif (AB)"),
+]
+
+# Form pencarian minimal. Tidak memakai elemen <form> supaya ENTER pada input
+# stasiun (dipakai untuk memilih suggestion flexdatalist) tidak men-submit halaman.
+# `$(...).trigger('change')` dipanggil oleh scraper, jadi disediakan shim jQuery kecil.
+BOOKING_FORM_HTML = """<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>KAI Booking (tiruan)</title></head>
+<body>
+<div class="booking-form">
+  <input type="text" id="origination-flexdatalist" name="origination" autocomplete="off">
+  <input type="text" id="destination-flexdatalist" name="destination" autocomplete="off">
+  <input type="text" id="departure_dateh" name="tanggal">
+  <input type="number" id="dewasa" value="1">
+  <input type="number" id="infant" value="0">
+  <button type="button" id="submit">Cari &amp; Pesan Tiket</button>
+</div>
+<script>
+window.$ = function(el) {
+  return { trigger: function(eventName) { el.dispatchEvent(new Event(eventName)); } };
+};
+document.getElementById('submit').addEventListener('click', function() {
+  var params = new URLSearchParams({
+    origination: document.getElementById('origination-flexdatalist').value,
+    destination: document.getElementById('destination-flexdatalist').value,
+    tanggal: document.getElementById('departure_dateh').value,
+    adult: document.getElementById('dewasa').value,
+    infant: document.getElementById('infant').value
+  });
+  window.location.href = '/search?' + params.toString();
+});
+</script>
+</body>
+</html>
+"""
+
+class MockBookingConfig:
+    '''
+    Parameter perilaku server tiruan.
+
+    Args:
+        latency_ms (float): Latensi rata-rata halaman hasil.
+        latency_jitter_ms (float): Variasi acak (+/-) latensi.
+        error_rate (float): Peluang halaman hasil membalas HTTP 503.
+        empty_rate (float): Peluang halaman hasil tanpa jadwal.
+        min_trains / max_trains (int): Rentang jumlah blok jadwal per halaman sintetis.
+        padding_kb (int): Markup tambahan (header, script, modal tiruan) agar ukuran
+            halaman mendekati halaman asli.
+        recorded_pages_dir (str): Folder halaman hasil rekaman (*.html). Jika diisi,
+            halaman dipilih secara deterministik per query dari folder ini.
+        seed (int): Seed RNG agar hasil uji bisa diulang.
+    '''
+
+    def __init__(self, latency_ms=300, latency_jitter_ms=100, error_rate=0.0, empty_rate=0.0,
+                 min_trains=3, max_trains=12, padding_kb=200, recorded_pages_dir=None, seed=42):
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.empty_rate = empty_rate
+        self.min_trains = min_trains
+        self.max_trains = max_trains
+        self.padding_kb = padding_kb
+        self.recorded_pages_dir = recorded_pages_dir
+        self.seed = seed
+
+def _schedule_block(train_name, train_number, train_class, origin, destination, departure_minutes, duration_minutes, date_label, arrival_date_label, price, seats):
+    departure = f"{departure_minutes // 60 % 24:02d}:{departure_minutes % 60:02d}"
+    arrival_minutes = departure_minutes + duration_minutes
+    arrival = f"{arrival_minutes // 60 % 24:02d}:{arrival_minutes % 60:02d}"
+    availability = "Tersedia" if seats > 50 else f"Tersisa {seats} kursi"
+    price_label = "Rp " + f"{price:,}".replace(",", ".") + ",-"
+    return f"""
+<div class="data-block list-kereta">
+  <div class="col-one">
+    <div class="name">{html.escape(train_name)} <span>({train_number})</span></div>
+    <div>{html.escape(train_class)}</div>
+  </div>
+  <div class="card-departure">
+    <div class="station station-start">{html.escape(origin)}</div>
+    <div class="times time-start">{departure}</div>
+    <div class="station date-start">{date_label}</div>
+  </div>
+  <div class="long-time">{duration_minutes // 60}j {duration_minutes % 60}m</div>
+  <div class="card-arrival">
+    <div class="station station-end">{html.escape(destination)}</div>
+    <div class="station station-end">{arrival_date_label}</div>
+    <div class="times time-end">{arrival}</div>
+  </div>
+  <div class="price">{price_label}</div>
+  <small class="sisa-kursi">{availability}</small>
+</div>"""
+
+def _date_labels(tanggal, days_after):
+    '''"03-Juni-2025" -> ("3 Juni 2025", label tanggal tiba).'''
+    try:
+        day, month_name, year = tanggal.split('-')
+        day, year = int(day), int(year)
+        month = next(m for m, name in BULAN_INDONESIA.items() if name.lower() == month_name.lower())
+    except (ValueError, StopIteration):
+        return tanggal, tanggal
+    # Cukup akurat untuk data tiruan: tidak menangani pergantian bulan
+    return f"{day} {BULAN_INDONESIA[month]} {year}", f"{day + days_after} {BULAN_INDONESIA[month]} {year}"
+
+def render_results_page(origin, destination, tanggal, config, rng):
+    '''Membuat halaman hasil sintetis beserta padding markup.'''
+    blocks = []
+    if rng.random() >= config.empty_rate:
+        for i in range(rng.randint(config.min_trains, config.max_trains)):
+            train_name, train_class = SYNTHETIC_TRAINS[rng.randrange(len(SYNTHETIC_TRAINS))]
+            departure_minutes = rng.randrange(0, 24 * 60, 5)
+            duration_minutes = rng.randrange(6 * 60, 12 * 60)
+            date_label, arrival_date_label = _date_labels(tanggal, 1 if departure_minutes + duration_minutes >= 24 * 60 else 0)
+            blocks.append(_schedule_block(
+                train_name, rng.randrange(1, 400), train_class, origin, destination,
+                departure_minutes, duration_minutes, date_label, arrival_date_label,
+                rng.randrange(150, 900) * 1000, rng.randrange(0, 120)
+            ))
+    # Elemen tersembunyi (bukan komentar) agar ikut membebani DOM, page_source dan parser
+    if not blocks:
+        # Penanda yang sama dengan browser.EMPTY_RESULTS_SELECTOR
+        blocks.append('\n<div class="empty-result">Jadwal kereta tidak tersedia untuk tanggal ini.</div>')
+    padding = ('<div class="modal-filler" hidden>' + "x" * 990 + "</div>\n") * config.padding_kb
+    return f"""<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>Hasil Pencarian (tiruan)</title>
+<script>/* bundle tiruan */</script></head>
+<body>
+<header class="navbar">KAI</header>
+{padding}
+<div class="container result-list">{''.join(blocks)}
+</div>
+<div class="modal" id="modal-login"></div>
+</body>
+</html>
+"""
+
+class MockBookingServer:
+    '''
+    Server HTTP tiruan yang berjalan di thread latar belakang.
+
+    Contoh:
+        with MockBookingServer(MockBookingConfig(latency_ms=100)) as server:
+            scrape_kai_with_selenium(..., booking_url=server.url)
+    '''
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockBookingConfig()
+        self.recorded_pages = []
+        if self.config.recorded_pages_dir:
+            for path in sorted(glob.glob(os.path.join(self.config.recorded_pages_dir, "*.html"))):
+                with open(path, encoding='utf-8') as f:
+                    self.recorded_pages.append(f.read())
+        self.stats = {'form_requests': 0, 'search_requests': 0, 'errors': 0, 'bytes_sent': 0}
+        self._lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass # Jangan membanjiri output harness
+
+            def _send(self, status, body):
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with server._lock:
+                    server.stats['bytes_sent'] += len(payload)
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path == "/":
+                    with server._lock:
+                        server.stats['form_requests'] += 1
+                    self._send(200, BOOKING_FORM_HTML)
+                elif parsed.path == "/search":
+                    self._send(*server.handle_search(parse_qs(parsed.query)))
+                else:
+                    self._send(404, "<html><body>Tidak ditemukan</body></html>")
+
+        return Handler
+
+    def handle_search(self, query):
+        '''Mengembalikan (status, body) untuk satu permintaan halaman hasil.'''
+        origin = query.get('origination', [''])[0]
+        destination = query.get('destination', [''])[0]
+        tanggal = query.get('tanggal', [''])[0]
+        # RNG per permintaan diturunkan dari seed global agar aman dipakai banyak thread
+        with self._lock:
+            self.stats['search_requests'] += 1
+            rng = random.Random(self._rng.random())
+
+        config = self.config
+        delay_ms = max(0.0, config.latency_ms + rng.uniform(-config.latency_jitter_ms, config.latency_jitter_ms))
+        time.sleep(delay_ms / 1000)
+
+        if rng.random() < config.error_rate:
+            with self._lock:
+                self.stats['errors'] += 1
+            return 503, "<html><body><h1>503 Service Unavailable</h1></body></html>"
+
+        if self.recorded_pages:
+            key = hashlib.md5(urlencode(sorted((k, v[0]) for k, v in query.items())).encode('utf-8')).digest()
+            return 200, self.recorded_pages[key[0] % len(self.recorded_pages)]
+        return 200, render_results_page(origin, destination, tanggal, config, rng)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-kai-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+if __name__ == '__main__':
+    # --- KONFIGURASI ---
+    host = "127.0.0.1"
+    port = 8765
+    config = MockBookingConfig(latency_ms=300, latency_jitter_ms=100, error_rate=0.05, empty_rate=0.05, padding_kb=200)
+    # --- AKHIR KONFIGURASI ---
+
+    server = MockBookingServer(config, host=host, port=port)
+    print(f"Server tiruan KAI berjalan di {server.url} (Ctrl+C untuk berhenti)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServer dihentikan.")
+    finally:
+        server.httpd.server_close()
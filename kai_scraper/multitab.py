@@ -0,0 +1,335 @@
+'''
+Mode multi-tab: satu proses Chrome dengan beberapa tab (atau browser context
+terisolasi), masing-masing menjalankan siklus isi form/cari sendiri.
+
+Satu sesi WebDriver hanya bisa memerintah satu jendela dalam satu waktu, jadi
+tab-tab tidak berjalan paralel secara harfiah. Scheduler asyncio menjalankan
+langkah-langkah browser.search_steps untuk setiap tab dan berpindah tab setiap
+kali sebuah langkah harus menunggu (jeda flexdatalist, halaman dimuat, hasil
+pencarian). Waktu tunggu itulah yang mendominasi satu query, sehingga beberapa
+tab bisa "menunggu bersama" dengan biaya memori satu renderer per tab, bukan
+satu Chrome lengkap per worker. Driver dibuat dengan page_load_strategy "none"
+agar driver.get dan klik tombol cari tidak memblokir tab lain.
+'''
+import asyncio
+import time
+
+from selenium.common.exceptions import (
+    NoSuchElementException, NoSuchWindowException, StaleElementReferenceException,
+    TimeoutException, WebDriverException,
+)
+
+from .browser import search_steps
+from .driver_manager import LocalDriverSource
+from .retry import DEFAULT_RETRY_POLICIES, classify_error
+
+# "tab": tab biasa (berbagi cookie/cache); "context": setiap tab di browser
+# context sendiri lewat CDP (seperti jendela incognito terpisah)
+TAB_ISOLATION_MODES = ("tab", "context")
+
+class BrowserCrashed(WebDriverException):
+    '''Seluruh sesi browser tidak merespons; run multi-tab tidak bisa dilanjutkan.'''
+
+class MultiTabScraper:
+    '''
+    Args:
+        webdriver_path (str): Diteruskan ke setup_driver.
+        headless (bool): Diteruskan ke setup_driver.
+        tabs (int): Jumlah tab yang bekerja bersamaan.
+        isolation (str): "tab" atau "context" (lihat TAB_ISOLATION_MODES).
+        step_timeout (float): Batas tunggu satu kondisi (detik), sama seperti
+            WebDriverWait(driver, 20) di mode biasa.
+        poll_interval (float): Jeda antar pengecekan kondisi saat menunggu.
+        retry_policies (dict): Kebijakan retry per kelas exception.
+        driver_source: Sumber driver (default LocalDriverSource), lihat driver_manager.
+    '''
+
+    def __init__(self, webdriver_path, headless=False, tabs=4, isolation="tab", step_timeout=20,
+                 poll_interval=0.2, retry_policies=None, driver_source=None):
+        if isolation not in TAB_ISOLATION_MODES:
+            raise ValueError(f"Isolasi tab '{isolation}' tidak dikenal. Pilihan: {', '.join(TAB_ISOLATION_MODES)}")
+        self.webdriver_path = webdriver_path
+        self.headless = headless
+        self.tab_count = max(1, int(tabs))
+        self.isolation = isolation
+        self.step_timeout = step_timeout
+        self.poll_interval = poll_interval
+        self.retry_policies = retry_policies or DEFAULT_RETRY_POLICIES
+        self.driver_source = driver_source or LocalDriverSource(webdriver_path, headless)
+        self.driver = None
+        self.handles = []
+        self.stats = {'succeeded': 0, 'retried': 0, 'failed': 0, 'tab_restarts': 0, 'switches': 0}
+        self.startup_seconds = 0.0
+        self.wall_seconds = 0.0
+        # Durasi (detik) setiap query yang berhasil, dari mulai isi form sampai hasil diambil
+        self.latencies = []
+        self.peak_rss_mb = None
+        self._current_handle = None
+        self._browser_contexts = []
+        # Selama run: query yang sedang dikerjakan per tab, dan retry yang
+        # menunggu jadwal (id entri -> (entri, TimerHandle)); ditandai gagal jika browser crash
+        self._in_flight = {}
+        self._retrying = {}
+        # Jam bagian waktu browser: maju dt / jumlah tab yang sedang mengerjakan query
+        self._busy_tabs = 0
+        self._share_clock = 0.0
+        self._share_clock_updated = 0.0
+
+    def start(self):
+        started = time.perf_counter()
+        self.driver = self.driver_source.create(page_load_strategy="none")
+        if self.driver is None:
+            raise WebDriverException("Gagal membuat WebDriver untuk mode multi-tab.")
+        self.handles = [self.driver.current_window_handle]
+        self._current_handle = self.handles[0]
+        for _ in range(self.tab_count - 1):
+            self.handles.append(self._open_tab())
+        self.startup_seconds = time.perf_counter() - started
+        print(f"Mode multi-tab: {len(self.handles)} tab ({self.isolation}) dalam satu Chrome, "
+              f"siap dalam {self.startup_seconds:.1f} detik.")
+        return self
+
+    def _open_tab(self):
+        '''Membuka tab baru dan mengembalikan window handle-nya.'''
+        if self.isolation == "context":
+            try:
+                context_id = self.driver.execute_cdp_cmd("Target.createBrowserContext", {"disposeOnDetach": True})['browserContextId']
+                target_id = self.driver.execute_cdp_cmd("Target.createTarget", {"url": "about:blank", "browserContextId": context_id})['targetId']
+                # Di chromedriver, window handle sama dengan target id CDP
+                if target_id in self.driver.window_handles:
+                    self._browser_contexts.append(context_id)
+                    return target_id
+                print("  [multi-tab] Tab browser context tidak terlihat oleh chromedriver, memakai tab biasa.")
+            except WebDriverException as e:
+                print(f"  [multi-tab] Gagal membuat browser context ({e.msg}), memakai tab biasa.")
+            self.isolation = "tab"
+        self.driver.switch_to.new_window('tab')
+        self._current_handle = self.driver.current_window_handle
+        return self._current_handle
+
+    def _switch(self, handle):
+        if self._current_handle != handle:
+            self.driver.switch_to.window(handle)
+            self._current_handle = handle
+            self.stats['switches'] += 1
+
+    async def _run_steps(self, handle, steps):
+        '''Padanan async dari browser.run_steps_blocking untuk satu tab.'''
+        value = None
+        while True:
+            self._switch(handle)
+            try:
+                step = steps.send(value)
+            except StopIteration as finished:
+                return finished.value
+            value = None
+            if isinstance(step, (int, float)):
+                await asyncio.sleep(step)
+                continue
+            deadline = time.monotonic() + self.step_timeout
+            while True:
+                self._switch(handle)
+                try:
+                    value = step(self.driver)
+                except (NoSuchElementException, StaleElementReferenceException):
+                    value = None
+                if value:
+                    break
+                if time.monotonic() >= deadline:
+                    raise TimeoutException(f"Timeout {self.step_timeout} detik menunggu elemen di tab {handle}.")
+                await asyncio.sleep(self.poll_interval)
+
+    def _replace_tab(self, handle):
+        '''Tab crash/tertutup: buka tab pengganti. BrowserCrashed jika seluruh browser mati.'''
+        try:
+            self._current_handle = None
+            remaining = [h for h in self.driver.window_handles if h != handle]
+            if not remaining:
+                raise BrowserCrashed("Tidak ada jendela Chrome yang tersisa.")
+            # Tab baru hanya bisa dibuka dari jendela yang masih hidup
+            self.driver.switch_to.window(remaining[0])
+            new_handle = self._open_tab()
+        except BrowserCrashed:
+            raise
+        except WebDriverException as e:
+            raise BrowserCrashed(f"Browser tidak merespons: {e.msg}")
+        self.handles[self.handles.index(handle)] = new_handle
+        self.stats['tab_restarts'] += 1
+        return new_handle
+
+    def _browser_alive(self):
+        try:
+            self.driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def _sample_memory(self):
+        rss_mb = self.driver_source.rss_mb(self.driver)
+        if rss_mb is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss_mb)
+
+    def _advance_share_clock(self, busy_delta):
+        '''
+        Memajukan jam bagian waktu browser lalu mengubah jumlah tab sibuk.
+        Selisih nilai jam antara mulai dan selesai satu query adalah bagian
+        waktu browser query itu (waktu tunggu di belakang tab lain tidak ikut).
+        '''
+        now = time.perf_counter()
+        if self._busy_tabs:
+            self._share_clock += (now - self._share_clock_updated) / self._busy_tabs
+        self._share_clock_updated = now
+        self._busy_tabs += busy_delta
+        return self._share_clock
+
+    async def _tab_worker(self, tab_index, pending, query_fn, on_result, on_attempt, on_busy_time, failed_items, should_stop):
+        loop = asyncio.get_running_loop()
+        while True:
+            if should_stop and should_stop():
+                return
+            work_item, attempt = await pending.get()
+            self._in_flight[tab_index] = work_item
+            handle = self.handles[tab_index]
+            print(f"\n[tab {tab_index + 1}] Mencari rute: {work_item['query_origin_name']} -> "
+                  f"{work_item['query_destination_name']} tanggal {work_item['query_date_input_format']}")
+            query_started = time.perf_counter()
+            share_started = self._advance_share_clock(1)
+            try:
+                page_html, actual_url = await self._run_steps(handle, query_fn(self.driver, work_item))
+            except Exception as e:
+                busy_seconds = self._advance_share_clock(-1) - share_started
+                attempt += 1
+                if on_attempt:
+                    on_attempt(work_item, False, time.perf_counter() - query_started)
+                if on_busy_time:
+                    on_busy_time(work_item, False, busy_seconds)
+                # Jika browser crash, work_item tetap tercatat di _in_flight dan ditandai gagal oleh _run
+                if isinstance(e, NoSuchWindowException):
+                    self._replace_tab(handle)
+                elif isinstance(e, WebDriverException) and not self._browser_alive():
+                    raise BrowserCrashed(f"Browser tidak merespons setelah {type(e).__name__}.")
+                del self._in_flight[tab_index]
+                _, policy = classify_error(e, self.retry_policies)
+                if policy.should_retry(attempt):
+                    delay = policy.compute_delay(attempt)
+                    self.stats['retried'] += 1
+                    print(f"  [tab {tab_index + 1}] {type(e).__name__}, dicoba lagi ({attempt}/{policy.max_attempts}) dalam {delay:.1f} detik.")
+
+                    def requeue(entry):
+                        del self._retrying[id(entry)]
+                        pending.put_nowait(entry)
+                        pending.task_done()
+                    entry = (work_item, attempt)
+                    self._retrying[id(entry)] = (entry, loop.call_later(delay, requeue, entry))
+                else:
+                    self.stats['failed'] += 1
+                    failed_items.append(work_item)
+                    print(f"  [tab {tab_index + 1}] {type(e).__name__}, query gagal setelah {attempt} percobaan.")
+                    pending.task_done()
+                continue
+
+            busy_seconds = self._advance_share_clock(-1) - share_started
+            del self._in_flight[tab_index]
+            self.stats['succeeded'] += 1
+            self.latencies.append(time.perf_counter() - query_started)
+            if on_attempt:
+                on_attempt(work_item, True, self.latencies[-1])
+            if on_busy_time:
+                on_busy_time(work_item, True, busy_seconds)
+            if self.stats['succeeded'] % 5 == 0:
+                self._sample_memory()
+            if page_html:
+                on_result(page_html, actual_url or "N/A", work_item)
+            else:
+                print("    Tidak ada HTML hasil untuk diproses.")
+            pending.task_done()
+
+    async def _run(self, work_items, query_fn, on_result, on_attempt, on_busy_time, should_stop):
+        pending = asyncio.Queue()
+        for work_item in work_items:
+            pending.put_nowait((work_item, 0))
+        failed_items = []
+        self._in_flight, self._retrying = {}, {}
+        self._busy_tabs, self._share_clock, self._share_clock_updated = 0, 0.0, time.perf_counter()
+        workers = [
+            asyncio.create_task(self._tab_worker(i, pending, query_fn, on_result, on_attempt, on_busy_time, failed_items, should_stop))
+            for i in range(len(self.handles))
+        ]
+        all_done = asyncio.create_task(pending.join())
+        try:
+            done, _ = await asyncio.wait(workers + [all_done], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = None if task is all_done else task.exception()
+                if isinstance(error, BrowserCrashed):
+                    print(f"  [multi-tab] {error.msg} Query yang sedang berjalan, menunggu retry dan sisa antrian ditandai gagal.")
+                    lost = list(self._in_flight.values())
+                    for entry, timer in self._retrying.values():
+                        timer.cancel()
+                        lost.append(entry[0])
+                    while not pending.empty():
+                        lost.append(pending.get_nowait()[0])
+                    self._in_flight, self._retrying = {}, {}
+                    self.stats['failed'] += len(lost)
+                    failed_items.extend(lost)
+                elif error is not None:
+                    raise error
+        finally:
+            for task in workers + [all_done]:
+                task.cancel()
+            await asyncio.gather(*workers, all_done, return_exceptions=True)
+        return failed_items
+
+    def run(self, work_items, on_result, should_stop=None, capture_mode="page", booking_url=None, on_attempt=None,
+            on_busy_time=None):
+        '''
+        Menjalankan semua work_items di tab-tab yang tersedia.
+
+        Args:
+            on_result (callable): on_result(page_html, url, query_context) dipanggil
+                di thread ini untuk setiap query yang berhasil.
+            should_stop (callable): Jika mengembalikan True, tab berhenti mengambil query baru.
+            on_attempt (callable): on_attempt(query_context, sukses, detik) untuk setiap
+                percobaan; detik = latensi dari mulai sampai selesai, termasuk
+                menunggu giliran di belakang tab lain.
+            on_busy_time (callable): Seperti on_attempt, tetapi detik = bagian waktu
+                browser query itu (waktu berjalan dibagi jumlah tab yang sibuk
+                bersamaan), sehingga jumlahnya sama dengan waktu sibuk run. Dipakai
+                perencana rute sebagai biaya per query.
+
+        Returns:
+            list: work_items yang tetap gagal setelah semua retry.
+        '''
+        if self.driver is None:
+            self.start()
+
+        def query_fn(driver, work_item):
+            return search_steps(driver, work_item['query_origin_name'], work_item['query_destination_name'],
+                                work_item['query_date_input_format'], capture_mode=capture_mode, booking_url=booking_url)
+
+        started = time.perf_counter()
+        try:
+            return asyncio.run(self._run(work_items, query_fn, on_result, on_attempt, on_busy_time, should_stop))
+        finally:
+            self.wall_seconds = time.perf_counter() - started
+            self._sample_memory()
+
+    def quit(self):
+        if self.driver is not None:
+            print("Menutup Chrome multi-tab...")
+            try:
+                self.driver_source.dispose(self.driver)
+            except WebDriverException as e:
+                print(f"  [multi-tab] Error saat menutup browser: {e.msg}")
+            self.driver = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.quit()
+
+    def print_report(self):
+        print(f"Multi-tab: {len(self.handles)} tab, {self.stats['succeeded']} berhasil, {self.stats['failed']} gagal, "
+              f"{self.stats['retried']} retry, {self.stats['tab_restarts']} tab diganti, {self.stats['switches']} perpindahan tab.")
+        if self.peak_rss_mb is not None:
+            print(f"Memori Chrome puncak: {self.peak_rss_mb:.0f} MB (~{self.peak_rss_mb / len(self.handles):.0f} MB per query berjalan).")
@@ -0,0 +1,188 @@
+'''
+Penyimpanan hasil scraping: save_to_csv untuk satu list hasil, dan sink
+bertahap (CSV, Parquet, SQLite) untuk menulis baris per batch tanpa menahan
+seluruh dataset di memori, misalnya saat parsing ulang arsip halaman.
+'''
+import csv
+import os
+
+def flatten_row(item):
+    '''Baris parser (dengan dict hidden_details) -> dict datar berkolom hidden_*.'''
+    flat = {key: value for key, value in item.items() if key != 'hidden_details'}
+    if isinstance(item.get('hidden_details'), dict):
+        for h_key, h_value in item['hidden_details'].items():
+            flat[f"hidden_{h_key}"] = h_value
+    return flat
+
+def csv_fieldnames(data_list):
+    '''Kolom dasar dari baris pertama lalu kolom hidden_* terurut, sama seperti save_to_csv.'''
+    all_hidden_keys = set()
+    for item in data_list:
+        if 'hidden_details' in item and isinstance(item['hidden_details'], dict):
+            for key in item['hidden_details'].keys():
+                all_hidden_keys.add(f"hidden_{key}")
+    base_fieldnames = [key for key in data_list[0].keys() if key != 'hidden_details']
+    return base_fieldnames + sorted(list(all_hidden_keys))
+
+def save_to_csv(data_list, csv_file_path):
+    if not data_list:
+        print("Tidak ada data untuk disimpan ke CSV.")
+        return
+    fieldnames = csv_fieldnames(data_list)
+    try:
+        with open(csv_file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for item in data_list:
+                writer.writerow(flatten_row(item))
+        print(f"Data berhasil disimpan ke '{csv_file_path}'")
+    except IOError:
+        print(f"Error: Tidak dapat menulis ke file CSV '{csv_file_path}'.")
+    except Exception as e:
+        print(f"Error saat menyimpan ke CSV: {e}")
+
+class CsvSink:
+    '''
+    CSV bertahap. Header ditentukan dari batch pertama (urutan kolom sama
+    seperti save_to_csv); kolom hidden_* yang baru muncul di batch berikutnya
+    tidak ditulis dan dilaporkan saat close().
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.rows_written = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = None
+        self._dropped_columns = set()
+
+    def write(self, rows):
+        if not rows:
+            return
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=csv_fieldnames(rows), extrasaction='ignore')
+            self._writer.writeheader()
+        known = set(self._writer.fieldnames)
+        for item in rows:
+            flat = flatten_row(item)
+            self._dropped_columns.update(key for key in flat if key not in known)
+            self._writer.writerow(flat)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
+        if self._dropped_columns:
+            print(f"PERINGATAN: Kolom yang tidak ada di batch pertama tidak ditulis ke CSV: {', '.join(sorted(self._dropped_columns))}")
+
+class ParquetSink:
+    '''
+    Parquet bertipe (kolom sama seperti schedule_loader.schedules_from_rows),
+    ditulis per row group lewat pyarrow. Baris ditampung sampai batch_rows
+    sebelum ditulis agar row group tidak terlalu kecil.
+    '''
+
+    def __init__(self, path, batch_rows=50_000):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Output Parquet membutuhkan pyarrow (pip install pyarrow).")
+        self.path = path
+        self.batch_rows = batch_rows
+        self.rows_written = 0
+        self._pending = []
+        self._writer = None
+        self._schema = None
+
+    def _flush(self):
+        if not self._pending:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from .schedule_loader import schedules_from_rows
+
+        df = schedules_from_rows(self._pending)
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = table.schema
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        else:
+            # Samakan kolom dan tipe dengan batch pertama (kolom yang seluruhnya kosong tidak punya tipe sendiri)
+            df = df.reindex(columns=self._schema.names)
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+        self.rows_written += len(self._pending)
+        self._pending = []
+
+    def write(self, rows):
+        self._pending.extend(rows)
+        if len(self._pending) >= self.batch_rows:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+
+class SqliteSink:
+    '''
+    Tabel SQLite berisi baris datar seperti CSV (satu kolom per field dan per
+    hidden_*). Kolom baru ditambahkan dengan ALTER TABLE saat pertama muncul.
+    Seperti CSV dan Parquet, tabel yang sudah ada diganti; append=True
+    menambahkan baris ke tabel lama.
+    '''
+
+    def __init__(self, path, table="schedules", append=False):
+        import sqlite3
+        self.path = path
+        self.table = table
+        self.rows_written = 0
+        self._connection = sqlite3.connect(path)
+        if not append:
+            self._connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (rowid INTEGER PRIMARY KEY)')
+        self._columns = {row[1] for row in self._connection.execute(f'PRAGMA table_info("{table}")')}
+
+    def write(self, rows):
+        if not rows:
+            return
+        flat_rows = [flatten_row(item) for item in rows]
+        for key in csv_fieldnames(rows):
+            if key not in self._columns:
+                self._connection.execute(f'ALTER TABLE "{self.table}" ADD COLUMN "{key}"')
+                self._columns.add(key)
+        # Kelompokkan per himpunan kolom agar executemany bisa dipakai
+        by_columns = {}
+        for flat in flat_rows:
+            by_columns.setdefault(tuple(flat), []).append(tuple(flat.values()))
+        for columns, values in by_columns.items():
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join("?" for _ in columns)
+            self._connection.executemany(f'INSERT INTO "{self.table}" ({column_list}) VALUES ({placeholders})', values)
+        self._connection.commit()
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+# Ekstensi file keluaran -> kelas sink
+ROW_SINKS = {
+    '.csv': CsvSink,
+    '.parquet': ParquetSink,
+    '.sqlite': SqliteSink,
+    '.sqlite3': SqliteSink,
+    '.db': SqliteSink,
+}
+
+def open_row_sink(path, append=False):
+    '''
+    Sink bertahap sesuai ekstensi path (.csv, .parquet, .sqlite/.db). File
+    keluaran ditimpa; append=True (hanya SQLite) menambah ke tabel yang ada.
+    '''
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in ROW_SINKS:
+        raise ValueError(f"Format keluaran tidak dikenal: '{extension}' (pilihan: {', '.join(ROW_SINKS)})")
+    if append:
+        if ROW_SINKS[extension] is not SqliteSink:
+            raise ValueError("Mode tambah (append) hanya didukung untuk keluaran SQLite (.sqlite/.db).")
+        return SqliteSink(path, append=True)
+    return ROW_SINKS[extension](path)
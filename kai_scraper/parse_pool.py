@@ -0,0 +1,178 @@
+'''
+Tahap parsing terpisah berbasis process pool untuk hasil scraping KAI.
+
+Browser hanya bertugas mengambil HTML; halaman mentah dimasukkan ke antrian
+terbatas (bounded queue) lalu di-parse oleh beberapa proses sekaligus sehingga
+BeautifulSoup tidak lagi berebut CPU dengan thread yang mengendalikan Chrome.
+'''
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .parsing import parse_schedule_html_content
+
+_SENTINEL = object()
+
+def _parse_page_worker(page_html, url_queried, query_context):
+    '''Dijalankan di proses worker: parse satu halaman dan ukur durasinya.'''
+    started = time.perf_counter()
+    rows = parse_schedule_html_content(page_html, url_queried, query_context)
+    return rows, time.perf_counter() - started
+
+class ParseStage:
+    '''
+    Tahap parsing paralel yang diberi makan oleh antrian halaman mentah.
+
+    Args:
+        max_workers (int): Jumlah proses parser (default: jumlah core CPU).
+        max_queue_size (int): Kapasitas antrian halaman mentah. Jika penuh,
+            submit() akan menunggu (backpressure) sehingga browser tidak
+            menumpuk halaman lebih cepat daripada kemampuan parser.
+    '''
+
+    def __init__(self, max_workers=None, max_queue_size=8):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.raw_pages = queue.Queue(maxsize=max_queue_size)
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        # Batasi jumlah halaman yang sedang di-parse agar antrian tetap menjadi
+        # satu-satunya tempat halaman menunggu (dan kedalamannya bermakna).
+        self._in_flight = threading.BoundedSemaphore(self.max_workers)
+        self._lock = threading.Lock()
+        # Diberi tahu setiap kali satu halaman selesai (dipakai drain)
+        self._parsed = threading.Condition(self._lock)
+        self._results = {}
+        self._sequence = 0
+        # True setelah process pool rusak (worker mati); sisa halaman di-parse di proses ini
+        self.pool_broken = False
+        self._stats = {
+            'pages_submitted': 0,
+            'pages_parsed': 0,
+            'pages_failed': 0,
+            'rows_parsed': 0,
+            'max_queue_depth': 0,
+            'total_queue_wait': 0.0,
+            'total_parse_time': 0.0,
+            'total_stage_latency': 0.0,
+            'total_submit_block': 0.0,
+        }
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="parse-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, page_html, url_queried, query_context):
+        '''Masukkan satu halaman mentah ke antrian. Akan menunggu jika antrian penuh.'''
+        with self._lock:
+            sequence = self._sequence
+            self._sequence += 1
+            self._stats['pages_submitted'] += 1
+        started = time.perf_counter()
+        self.raw_pages.put((sequence, time.perf_counter(), page_html, url_queried, query_context))
+        with self._lock:
+            self._stats['total_submit_block'] += time.perf_counter() - started
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self.raw_pages.qsize())
+
+    def _dispatch_loop(self):
+        while True:
+            item = self.raw_pages.get()
+            if item is _SENTINEL:
+                break
+            sequence, enqueued_at, page_html, url_queried, query_context = item
+            self._in_flight.acquire()
+            dispatched_at = time.perf_counter()
+            if not self.pool_broken:
+                try:
+                    future = self.executor.submit(_parse_page_worker, page_html, url_queried, query_context)
+                except (BrokenProcessPool, RuntimeError) as e:
+                    print(f"    Process pool parsing rusak ({type(e).__name__}: {e}); sisa halaman di-parse di proses utama.")
+                    self.pool_broken = True
+                else:
+                    future.add_done_callback(
+                        lambda f, seq=sequence, enq=enqueued_at, disp=dispatched_at: self._on_parsed(f, seq, enq, disp)
+                    )
+                    continue
+            self._on_parsed(self._parse_in_process(page_html, url_queried, query_context), sequence, enqueued_at, dispatched_at)
+
+    def _parse_in_process(self, page_html, url_queried, query_context):
+        '''Fallback tanpa process pool; hasil dibungkus Future agar _on_parsed tetap sama.'''
+        future = Future()
+        try:
+            future.set_result(_parse_page_worker(page_html, url_queried, query_context))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _on_parsed(self, future, sequence, enqueued_at, dispatched_at):
+        finished_at = time.perf_counter()
+        try:
+            rows, parse_seconds = future.result()
+        except Exception as e:
+            print(f"    Error saat parsing halaman #{sequence} di process pool: {e}")
+            rows, parse_seconds = [], 0.0
+            failed = True
+        else:
+            failed = False
+        with self._lock:
+            self._results[sequence] = rows
+            self._stats['pages_failed' if failed else 'pages_parsed'] += 1
+            self._stats['rows_parsed'] += len(rows)
+            self._stats['total_queue_wait'] += dispatched_at - enqueued_at
+            self._stats['total_parse_time'] += parse_seconds
+            self._stats['total_stage_latency'] += finished_at - enqueued_at
+            self._parsed.notify_all()
+        self._in_flight.release()
+
+    def stats(self):
+        '''Ringkasan kedalaman antrian dan latensi tahap parsing saat ini.'''
+        with self._lock:
+            stats = dict(self._stats)
+        done = stats['pages_parsed'] + stats['pages_failed']
+        stats['queue_depth'] = self.raw_pages.qsize()
+        stats['in_flight'] = stats['pages_submitted'] - done - stats['queue_depth']
+        stats['avg_queue_wait'] = stats['total_queue_wait'] / done if done else 0.0
+        stats['avg_parse_time'] = stats['total_parse_time'] / done if done else 0.0
+        stats['avg_stage_latency'] = stats['total_stage_latency'] / done if done else 0.0
+        return stats
+
+    def print_stats(self):
+        stats = self.stats()
+        print(
+            f"    [parse-stage] antrian={stats['queue_depth']} (maks {stats['max_queue_depth']}), "
+            f"diproses={stats['in_flight']}, selesai={stats['pages_parsed']}, gagal={stats['pages_failed']}, "
+            f"tunggu antrian={stats['avg_queue_wait']:.3f}s, parse={stats['avg_parse_time']:.3f}s, "
+            f"latensi tahap={stats['avg_stage_latency']:.3f}s"
+        )
+
+    def _take_results(self):
+        rows = []
+        for sequence in sorted(self._results):
+            rows.extend(self._results[sequence])
+        self._results.clear()
+        return rows
+
+    def drain(self):
+        '''
+        Tunggu halaman yang sudah di-submit selesai di-parse dan kembalikan
+        barisnya sesuai urutan submit, tanpa mematikan process pool. Untuk
+        pemakai yang menjalankan beberapa batch dengan satu ParseStage.
+        '''
+        with self._parsed:
+            self._parsed.wait_for(
+                lambda: self._stats['pages_parsed'] + self._stats['pages_failed'] >= self._stats['pages_submitted'])
+            return self._take_results()
+
+    def close(self):
+        '''Tunggu semua halaman selesai di-parse dan kembalikan baris sesuai urutan submit.'''
+        self.raw_pages.put(_SENTINEL)
+        self._dispatcher.join()
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            return self._take_results()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._dispatcher.is_alive():
+            self.close()
@@ -0,0 +1,141 @@
+'''
+Parsing hasil pencarian KAI menjadi list dict jadwal, baik dari HTML (halaman
+penuh, fragmen, atau fragmen gzip) maupun dari record hasil ekstraksi di browser.
+BeautifulSoup baru di-import saat parsing HTML benar-benar dijalankan.
+'''
+import gzip
+
+# Urutan kolom hasil, sama dengan urutan key yang dibuat parse_schedule_html_content
+SCHEDULE_FIELDS = (
+    'train_name', 'train_number', 'train_class', 'departure_station', 'departure_time',
+    'departure_date', 'duration', 'arrival_station', 'arrival_date', 'arrival_time',
+    'price', 'availability',
+)
+
+def parse_price(price_str):
+    # Menghilangkan "Rp ", ",-" dan "." sebagai pemisah ribuan
+    return int(price_str.replace("Rp ", "").replace(",-", "").replace(".", ""))
+
+def normalize_price_text(price_text):
+    '''Konversi teks harga mentah ke int; teks asli jika gagal, "Tidak tersedia" jika kosong.'''
+    if price_text and price_text.strip() and "Rp" in price_text:
+        try:
+            return parse_price(price_text.strip())
+        except ValueError:
+            return price_text.strip()
+    return "Tidak tersedia"
+
+def decode_html_payload(html_content):
+    '''Ubah payload HTML (str, bytes, atau bytes gzip) menjadi string HTML.'''
+    if isinstance(html_content, (bytes, bytearray)):
+        if html_content[:2] == b'\x1f\x8b':
+            html_content = gzip.decompress(html_content)
+        return html_content.decode('utf-8', errors='replace')
+    return html_content
+
+def parse_schedule_html_content(html_content, url_queried, query_context):
+    '''
+    Mem-parsing konten HTML untuk mengekstrak data jadwal.
+
+    html_content boleh berupa halaman penuh, fragmen kontainer hasil saja,
+    atau fragmen yang masih terkompres gzip (bytes) dari mode "fragment_gzip".
+    '''
+    from bs4 import BeautifulSoup # Import lambat: perintah tanpa parsing tidak perlu bs4
+
+    train_schedules = []
+    html_content = decode_html_payload(html_content)
+    soup = BeautifulSoup(html_content, 'html.parser')
+    schedule_blocks = soup.find_all('div', class_='data-block list-kereta')
+
+    if not schedule_blocks:
+        print("    Tidak ada blok jadwal kereta yang ditemukan di HTML yang diambil.")
+        return train_schedules
+
+    for block in schedule_blocks:
+        schedule_data = {}
+        name_div = block.find('div', class_='name')
+        if name_div:
+            schedule_data['train_name'] = name_div.find(string=True, recursive=False).strip() if name_div.find(string=True, recursive=False) else ""
+            train_number_span = name_div.find('span')
+            schedule_data['train_number'] = train_number_span.text.strip("() ") if train_number_span else ""
+        else:
+            schedule_data['train_name'] = "Tidak tersedia"
+            schedule_data['train_number'] = "Tidak tersedia"
+
+        col_one_div = block.find('div', class_='col-one')
+        if col_one_div:
+            class_divs = col_one_div.find_all('div', recursive=False)
+            potential_class_divs = [d for d in class_divs if d != name_div and d.text.strip()]
+            if potential_class_divs:
+                schedule_data['train_class'] = potential_class_divs[0].text.strip()
+            else:
+                all_divs_in_col_one = col_one_div.find_all('div')
+                if len(all_divs_in_col_one) > 1 and all_divs_in_col_one[-1] != name_div:
+                    schedule_data['train_class'] = all_divs_in_col_one[-1].text.strip()
+                else:
+                    schedule_data['train_class'] = "Tidak tersedia"
+        else:
+            schedule_data['train_class'] = "Tidak tersedia"
+
+        station_start_div = block.find('div', class_='station station-start')
+        schedule_data['departure_station'] = station_start_div.text.strip() if station_start_div else "Tidak tersedia"
+        time_start_div = block.find('div', class_='times time-start')
+        schedule_data['departure_time'] = time_start_div.text.strip() if time_start_div else "Tidak tersedia"
+        date_start_div = block.find('div', class_='station date-start')
+        schedule_data['departure_date'] = date_start_div.text.strip() if date_start_div else "Tidak tersedia"
+
+        long_time_div = block.find('div', class_='long-time')
+        schedule_data['duration'] = long_time_div.text.strip() if long_time_div else "Tidak tersedia"
+
+        arrival_details = block.find('div', class_='card-arrival')
+        if arrival_details:
+            station_end_divs = arrival_details.find_all('div', class_='station station-end')
+            schedule_data['arrival_station'] = station_end_divs[0].text.strip() if len(station_end_divs) > 0 else "Tidak tersedia"
+            schedule_data['arrival_date'] = station_end_divs[1].text.strip() if len(station_end_divs) > 1 else "Tidak tersedia"
+            time_end_div = arrival_details.find('div', class_='times time-end')
+            schedule_data['arrival_time'] = time_end_div.text.strip() if time_end_div else "Tidak tersedia"
+        else:
+            schedule_data['arrival_station'] = "Tidak tersedia"
+            schedule_data['arrival_date'] = "Tidak tersedia"
+            schedule_data['arrival_time'] = "Tidak tersedia"
+
+        price_div = block.find('div', class_='price')
+        schedule_data['price'] = normalize_price_text(price_div.text if price_div else None)
+
+        sisa_kursi_small = block.find('small', class_='sisa-kursi')
+        schedule_data['availability'] = sisa_kursi_small.text.strip() if sisa_kursi_small else "Tidak tersedia"
+        
+        schedule_data['hidden_details'] = {
+            'query_url': url_queried, # URL saat ini yang di-scrape oleh Selenium (mungkin berbeda dari yg kita buat)
+            **query_context # Gabungkan dengan konteks query awal
+        }
+        train_schedules.append(schedule_data)
+    print(f"    Berhasil mengekstrak {len(train_schedules)} jadwal dari konten HTML ini.")
+    return train_schedules
+
+def parse_schedule_records(raw_records, url_queried, query_context):
+    '''
+    Menormalkan record dari extract_schedule_records_in_browser menjadi format
+    yang sama persis dengan keluaran parse_schedule_html_content.
+    '''
+    train_schedules = []
+    if not raw_records:
+        print("    Tidak ada blok jadwal kereta yang ditemukan oleh ekstraksi di browser.")
+        return train_schedules
+
+    for record in raw_records:
+        schedule_data = {field: record.get(field, "Tidak tersedia") for field in SCHEDULE_FIELDS}
+        schedule_data['price'] = normalize_price_text(record.get('price'))
+        schedule_data['hidden_details'] = {
+            'query_url': url_queried,
+            **query_context
+        }
+        train_schedules.append(schedule_data)
+    print(f"    Berhasil mengekstrak {len(train_schedules)} jadwal langsung dari browser.")
+    return train_schedules
+
+def parse_captured_payload(payload, url_queried, query_context):
+    '''Pilih parser sesuai bentuk payload: list record dari browser atau HTML.'''
+    if isinstance(payload, list):
+        return parse_schedule_records(payload, url_queried, query_context)
+    return parse_schedule_html_content(payload, url_queried, query_context)
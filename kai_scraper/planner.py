@@ -0,0 +1,174 @@
+'''
+Perencana rute berbasis hasil (yield): menyimpan statistik per rute dari run
+sebelumnya (baris per query, tingkat sukses, latensi) lalu mengurutkan work
+item agar baris per detik yang terkumpul maksimal, dengan porsi eksplorasi
+untuk rute yang belum pernah dicoba.
+
+Statistik disimpan di file JSON (default route_stats.json) dengan kunci
+"<nama asal> -> <nama tujuan>", karena nama stasiun yang diketik ke form
+(misal "SURABAYA" vs "SURABAYA PASAR TURI") menentukan hasil pencarian.
+'''
+import json
+import os
+import random
+import statistics
+
+# Latensi default (detik) untuk rute yang belum punya data latensi
+DEFAULT_QUERY_SECONDS = 15.0
+
+# Kekuatan prior (dalam jumlah query) saat menghaluskan baris per query rute
+# yang baru sedikit dicoba ke rata-rata semua rute
+PRIOR_QUERIES = 2
+
+def route_key(work_item):
+    return f"{work_item['query_origin_name']} -> {work_item['query_destination_name']}"
+
+class RouteStats:
+    '''
+    Statistik kumulatif per rute: jumlah percobaan, sukses, baris, serta total
+    latensi dan jumlah query sukses yang latensinya terukur (latency_samples;
+    sukses hasil seed_from_schedules tidak punya latensi). seeded berisi kunci "<rute> @ <tanggal>" yang sudah
+    diisi dari CSV lama, agar seed_from_schedules tidak menghitungnya dua kali.
+    '''
+
+    def __init__(self, routes=None, seeded=None):
+        self.routes = routes or {}
+        self.seeded = set(seeded or ())
+
+    @classmethod
+    def load(cls, path):
+        '''Memuat file statistik; objek kosong jika file belum ada.'''
+        if not path or not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        routes = data.get('routes', {})
+        for route in routes.values():
+            # File lama tanpa latency_samples: anggap semua sukses terukur jika ada latensi
+            route.setdefault('latency_samples', route['successes'] if route.get('latency_seconds') else 0)
+        return cls(routes, data.get('seeded', []))
+
+    def save(self, path):
+        '''Tulis atomik (file sementara + rename) agar run yang terputus tidak merusak statistik.'''
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'routes': self.routes, 'seeded': sorted(self.seeded)}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+    def _route(self, key):
+        return self.routes.setdefault(key, {'attempts': 0, 'successes': 0, 'rows': 0, 'latency_seconds': 0.0,
+                                            'latency_samples': 0})
+
+    def record_attempt(self, work_item, success, seconds):
+        route = self._route(route_key(work_item))
+        route['attempts'] += 1
+        if success:
+            route['successes'] += 1
+            route['latency_seconds'] += seconds
+            route['latency_samples'] += 1
+
+    def record_rows(self, rows):
+        '''Menambah jumlah baris per rute dari hasil parsing (dicocokkan lewat hidden_details).'''
+        for row in rows:
+            details = row.get('hidden_details') or {}
+            if 'query_origin_name' in details and 'query_destination_name' in details:
+                self._route(route_key(details))['rows'] += 1
+
+    def seed_from_schedules(self, schedules):
+        '''
+        Mengisi statistik awal dari CSV hasil scraping lama (DataFrame dari
+        schedule_loader): setiap kombinasi rute-tanggal dihitung satu query
+        sukses. Latensi tidak diketahui dan tidak diisi. Rute-tanggal yang
+        sudah pernah diisi dilewati, jadi CSV yang sama aman dipakai ulang.
+
+        Returns:
+            int: Jumlah rute-tanggal yang baru ditambahkan.
+        '''
+        key_columns = ['hidden_query_origin_name', 'hidden_query_destination_name', 'hidden_query_date_calendar']
+        counts = schedules.groupby(key_columns, observed=True).size()
+        added = 0
+        for (origin_name, dest_name, query_date), rows in counts.items():
+            key = f"{origin_name} -> {dest_name}"
+            seed_key = f"{key} @ {query_date.strftime('%Y-%m-%d')}"
+            if seed_key in self.seeded:
+                continue
+            self.seeded.add(seed_key)
+            route = self._route(key)
+            route['attempts'] += 1
+            route['successes'] += 1
+            route['rows'] += int(rows)
+            added += 1
+        return added
+
+    @staticmethod
+    def _mean_latency(route):
+        '''Rata-rata latensi query sukses yang terukur, atau None.'''
+        return route['latency_seconds'] / route['latency_samples'] if route.get('latency_samples') else None
+
+    def _priors(self):
+        seen = [route for route in self.routes.values() if route['successes']]
+        if not seen:
+            return 0.0, DEFAULT_QUERY_SECONDS
+        mean_rows = sum(route['rows'] for route in seen) / sum(route['successes'] for route in seen)
+        latencies = [self._mean_latency(route) for route in seen if route.get('latency_samples')]
+        return mean_rows, statistics.median(latencies) if latencies else DEFAULT_QUERY_SECONDS
+
+    def expected_rows_per_second(self, key, overhead_seconds=0.0, priors=None):
+        '''
+        Perkiraan baris per detik satu query rute ini: baris per query
+        (dihaluskan ke rata-rata) x tingkat sukses / (latensi + jeda antar query).
+        None jika rute belum pernah dicoba.
+        '''
+        route = self.routes.get(key)
+        if not route or not route['attempts']:
+            return None
+        mean_rows, default_latency = priors or self._priors()
+        rows_per_query = (route['rows'] + mean_rows * PRIOR_QUERIES) / (route['successes'] + PRIOR_QUERIES)
+        success_rate = (route['successes'] + 1) / (route['attempts'] + 2)
+        latency = self._mean_latency(route)
+        latency = default_latency if latency is None else latency
+        return rows_per_query * success_rate / (latency + overhead_seconds)
+
+    def print_summary(self, limit=20, overhead_seconds=0.0):
+        priors = self._priors()
+        ranked = sorted(self.routes, key=lambda key: self.expected_rows_per_second(key, overhead_seconds, priors) or 0.0, reverse=True)
+        print(f"{'rute':<45} {'query':>6} {'sukses':>7} {'baris/query':>12} {'latensi (s)':>12} {'baris/s':>8}")
+        for key in ranked[:limit]:
+            route = self.routes[key]
+            rows_per_query = route['rows'] / route['successes'] if route['successes'] else 0.0
+            mean_latency = self._mean_latency(route)
+            latency = f"{mean_latency:.1f}" if mean_latency is not None else "-"
+            score = self.expected_rows_per_second(key, overhead_seconds, priors) or 0.0
+            print(f"{key:<45} {route['attempts']:>6} {route['successes'] / route['attempts'] if route['attempts'] else 0:>7.0%} "
+                  f"{rows_per_query:>12.1f} {latency:>12} {score:>8.2f}")
+
+def plan_work_items(work_items, route_stats, exploration_share=0.2, overhead_seconds=0.0, rng=None):
+    '''
+    Mengurutkan work_items: rute yang sudah dikenal diurutkan menurut perkiraan
+    baris per detik (tertinggi dulu), dan di setiap posisi ada peluang
+    `exploration_share` untuk menyisipkan rute yang belum pernah dicoba
+    (urutan acak). Jika salah satu kelompok habis, sisanya dari kelompok lain.
+    '''
+    rng = rng or random.Random()
+    priors = route_stats._priors()
+    scored, unseen = [], []
+    for work_item in work_items:
+        score = route_stats.expected_rows_per_second(route_key(work_item), overhead_seconds, priors)
+        if score is None:
+            unseen.append(work_item)
+        else:
+            scored.append((score, work_item))
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+    rng.shuffle(unseen)
+
+    # Dibalik agar pop() mengambil skor tertinggi
+    known = [work_item for _, work_item in reversed(scored)]
+    planned = []
+    while known or unseen:
+        if unseen and (not known or rng.random() < exploration_share):
+            planned.append(unseen.pop())
+        else:
+            planned.append(known.pop())
+    print(f"Perencana rute: {len(scored)} rute dikenal, {len(planned) - len(scored)} rute baru "
+          f"(porsi eksplorasi {exploration_share:.0%}).")
+    return planned
@@ -0,0 +1,225 @@
+'''
+Profiling opsional untuk sweep/sample: cProfile (waktu CPU per fungsi) dan
+tracemalloc (alokasi memori terbesar) untuk seluruh run atau untuk setiap
+query ke-N.
+
+Mode (konfigurasi "profiling" -> "mode"):
+    "off"   : tidak ada profiling. Profiler tidak membungkus apa pun, jadi
+              tidak ada biaya tambahan per query.
+    "run"   : satu profil untuk seluruh run, termasuk save_to_csv.
+    "query" : profil untuk query ke-1, ke-(1+N), ke-(1+2N), ... tracemalloc
+              hanya aktif selama query sampel, sehingga query lain berjalan
+              tanpa overhead pelacakan. Snapshot di akhir query dibandingkan
+              dengan awal query: alokasi yang masih hidup setelah query
+              selesai. Jika jumlahnya tetap besar di setiap sampel (bandingkan
+              dengan query sampel pertama), itu indikasi kebocoran.
+
+Hasil ditulis ke direktori "<nama output>_profiles/" di sebelah file CSV:
+    <tag>.prof         data pstats (bisa dibuka dengan snakeviz / pstats)
+    <tag>.txt          ringkasan fungsi terberat (cumulative time)
+    <tag>.alloc.txt    alokasi terbesar dari tracemalloc
+
+Catatan: jika parse_pool aktif, BeautifulSoup berjalan di proses worker dan
+tidak muncul di profil; matikan parse_pool untuk memprofilkan parsing.
+'''
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import re
+import time
+import tracemalloc
+
+PROFILING_MODES = ("off", "run", "query")
+
+# Alokasi milik profiler sendiri dan mesin import tidak relevan untuk laporan
+_SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+def _take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+def _safe_tag(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(text)).strip('_')
+
+def query_tag(query_context, query_number):
+    '''Tag file profil per query, misal "q0007_SBI-GMR_2025-06-03".'''
+    return _safe_tag(
+        f"q{query_number:04d}_{query_context.get('query_origin_code', 'X')}-"
+        f"{query_context.get('query_destination_code', 'X')}_{query_context.get('query_date_calendar', '')}"
+    )
+
+def default_profile_dir(output_path):
+    '''Direktori profil di sebelah file output, misal "jadwal_profiles/".'''
+    base, _ = os.path.splitext(output_path)
+    return base + "_profiles"
+
+class Profiler:
+    '''
+    Args:
+        mode (str): "off", "run" atau "query".
+        output_dir (str): Direktori tujuan file profil.
+        every_n_queries (int): Pada mode "query", profilkan setiap query ke-N.
+        top_functions (int): Jumlah baris pada ringkasan pstats.
+        top_allocations (int): Jumlah baris pada laporan tracemalloc.
+        tracemalloc_frames (int): Kedalaman traceback yang disimpan tracemalloc.
+    '''
+
+    def __init__(self, mode="off", output_dir="profiles", every_n_queries=10,
+                 top_functions=40, top_allocations=25, tracemalloc_frames=1):
+        if mode not in PROFILING_MODES:
+            raise ValueError(f"Mode profiling '{mode}' tidak dikenal. Pilihan: {', '.join(PROFILING_MODES)}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.every_n_queries = max(1, int(every_n_queries))
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+        self.tracemalloc_frames = tracemalloc_frames
+        self.query_count = 0
+        self.written_files = []
+        self._first_retained_kib = None
+        self._started_tracemalloc = False
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def _start_tracemalloc(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.tracemalloc_frames)
+            self._started_tracemalloc = True
+
+    def _stop_tracemalloc(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _write(self, filename, content):
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        self.written_files.append(path)
+        return path
+
+    def _write_cpu_profile(self, profile, tag, elapsed):
+        os.makedirs(self.output_dir, exist_ok=True)
+        prof_path = os.path.join(self.output_dir, f"{tag}.prof")
+        profile.dump_stats(prof_path)
+        self.written_files.append(prof_path)
+
+        summary = io.StringIO()
+        summary.write(f"# {tag}: {elapsed:.3f} detik (wall clock)\n")
+        stats = pstats.Stats(profile, stream=summary)
+        stats.sort_stats('cumulative').print_stats(self.top_functions)
+        self._write(f"{tag}.txt", summary.getvalue())
+
+    def _format_allocations(self, title, statistics):
+        lines = [f"# {title}"]
+        if statistics and hasattr(statistics[0], 'size_diff'):
+            # Hasil compare_to: size adalah ukuran di snapshot akhir, pertumbuhannya ada di size_diff
+            total_diff = sum(stat.size_diff for stat in statistics)
+            lines.append(f"# total selisih: {total_diff / 1024:+.1f} KiB")
+        else:
+            total = sum(stat.size for stat in statistics)
+            lines.append(f"# total: {total / 1024:.1f} KiB")
+        for stat in statistics[:self.top_allocations]:
+            frame = stat.traceback[0]
+            size_diff = getattr(stat, 'size_diff', None)
+            diff_label = f" ({size_diff / 1024:+.1f} KiB)" if size_diff is not None else ""
+            lines.append(f"{stat.size / 1024:10.1f} KiB{diff_label}  {stat.count:7d} blok  {frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+    @contextlib.contextmanager
+    def _profiled(self, tag, per_query):
+        self._start_tracemalloc()
+        start_snapshot = _take_snapshot() if per_query else None
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            end_snapshot = _take_snapshot()
+            try:
+                self._write_cpu_profile(profile, tag, elapsed)
+                sections = []
+                if start_snapshot is not None:
+                    retained = end_snapshot.compare_to(start_snapshot, 'lineno')
+                    sections.append(self._format_allocations("alokasi selama query", retained))
+                    retained_kib = sum(stat.size_diff for stat in retained) / 1024
+                    if self._first_retained_kib is None:
+                        self._first_retained_kib = retained_kib
+                    sections.append(f"# tersisa di akhir query: {retained_kib:+.1f} KiB "
+                                    f"(query sampel pertama: {self._first_retained_kib:+.1f} KiB)\n")
+                else:
+                    sections.append(self._format_allocations("alokasi aktif di akhir run", end_snapshot.statistics('lineno')))
+                current, peak = tracemalloc.get_traced_memory()
+                sections.append(f"# traced sekarang: {current / 1024 / 1024:.1f} MiB, puncak: {peak / 1024 / 1024:.1f} MiB\n")
+                self._write(f"{tag}.alloc.txt", "\n".join(sections))
+                print(f"    [profiling] {tag}: {elapsed:.3f} detik, profil ditulis ke '{self.output_dir}'")
+            except OSError as e:
+                print(f"    [profiling] Gagal menulis profil {tag}: {e}")
+
+    def run(self, tag="run"):
+        '''Context manager untuk seluruh run; tidak melakukan apa pun kecuali mode "run".'''
+        if self.mode != "run":
+            return contextlib.nullcontext()
+        return self._run_context(tag)
+
+    @contextlib.contextmanager
+    def _run_context(self, tag):
+        try:
+            with self._profiled(_safe_tag(f"{tag}_{time.strftime('%Y%m%d-%H%M%S')}"), per_query=False):
+                yield
+        finally:
+            self._stop_tracemalloc()
+
+    def wrap_query(self, handler):
+        '''
+        Membungkus handler query(query_context) agar setiap query ke-N diprofilkan.
+        Di luar mode "query" handler dikembalikan apa adanya.
+        '''
+        if self.mode != "query":
+            return handler
+
+        def profiled_handler(query_context):
+            self.query_count += 1
+            if (self.query_count - 1) % self.every_n_queries != 0:
+                return handler(query_context)
+            try:
+                with self._profiled(query_tag(query_context, self.query_count), per_query=True):
+                    return handler(query_context)
+            finally:
+                # Lacak alokasi hanya selama query sampel
+                self._stop_tracemalloc()
+
+        return profiled_handler
+
+    def close(self):
+        '''Menghentikan tracemalloc yang dimulai oleh profiler ini.'''
+        self._stop_tracemalloc()
+        self._first_retained_kib = None
+        if self.written_files:
+            print(f"Profiling: {len(self.written_files)} file ditulis ke '{self.output_dir}'.")
+
+def create_profiler(config, output_path):
+    '''Profiler dari bagian "profiling" konfigurasi; direktori default di sebelah output.'''
+    profiling_config = config['profiling']
+    return Profiler(
+        mode=profiling_config['mode'],
+        output_dir=profiling_config['output_dir'] or default_profile_dir(output_path),
+        every_n_queries=profiling_config['every_n_queries'],
+        top_functions=profiling_config['top_functions'],
+        top_allocations=profiling_config['top_allocations'],
+    )
@@ -0,0 +1,460 @@
+'''
+Layanan query HTTP lokal di atas jadwal yang sudah di-scrape, supaya tool
+internal tidak perlu menjalankan Selenium atau grep CSV.
+
+    python -m kai_scraper serve --port 8080 jadwal_kereta_*.csv
+
+    GET /schedules?origin=SBI&destination=GMR&date=2025-06-03
+        200 {"origin", "destination", "date", "fetched_at", "count", "schedules": [...]}
+            header Age = umur data (detik) sejak fetched_at; count 0 berarti
+            sudah di-scrape tetapi KAI tidak menampilkan kereta
+        202 {"status": "queued"}     data belum ada, scrape latar belakang dijadwalkan
+        404 {"status": "not_found"}  data belum ada dan scrape_on_miss mati
+    GET /health
+        200 statistik cache, antrian scrape dan latensi p50/p99
+
+Indeks utama adalah dict (kode asal, kode tujuan, tanggal) -> baris jadwal.
+Body JSON jawaban yang sering diminta disimpan di cache LRU dalam bentuk
+bytes, jadi query yang di-cache tidak perlu serialisasi ulang.
+'''
+import json
+import os
+import queue
+import statistics
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Kolom yang dikirim ke klien
+SCHEDULE_RESPONSE_COLUMNS = [
+    'train_name', 'train_number', 'train_class', 'departure_station', 'departure_datetime',
+    'arrival_station', 'arrival_datetime', 'duration_minutes', 'price', 'seats_left', 'is_available',
+]
+
+def _iso_timestamp(epoch_seconds):
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).isoformat(timespec='seconds')
+
+def normalize_query_date(date_text):
+    '''"2025-06-03" (atau "2025-6-3") -> "2025-06-03"; ValueError jika tidak valid.'''
+    return datetime.strptime(date_text.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
+
+def schedules_to_records(schedules):
+    '''DataFrame bertipe -> list dict siap JSON (datetime ISO, NA -> None).'''
+    frame = schedules[[column for column in SCHEDULE_RESPONSE_COLUMNS if column in schedules.columns]].copy()
+    for column in ('departure_datetime', 'arrival_datetime'):
+        if column in frame.columns:
+            frame[column] = frame[column].dt.strftime('%Y-%m-%dT%H:%M')
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict('records')
+    # Tipe numpy/pandas tidak bisa di-serialize json; ubah ke int/bool Python
+    for record in records:
+        for key, value in record.items():
+            if value is not None and not isinstance(value, (str, bool, int, float)):
+                record[key] = value.item() if hasattr(value, 'item') else str(value)
+    return records
+
+class ScheduleStore:
+    '''
+    Indeks jadwal di memori: (kode asal, kode tujuan, tanggal) -> (baris, fetched_at).
+    fetched_at adalah waktu data diambil (epoch detik): mtime file CSV untuk data
+    yang dimuat dari disk, atau waktu selesai scrape untuk data dari scrape latar
+    belakang.
+    '''
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load_csvs(self, paths):
+        '''Memuat CSV hasil scraping (path atau pola glob). Mengembalikan kunci yang dimuat.'''
+        from .schedule_loader import _expand_paths, load_schedule_csvs
+        schedules = load_schedule_csvs(paths)
+        if schedules.empty:
+            return []
+        mtimes = {os.path.basename(path): os.path.getmtime(path) for path in _expand_paths(paths) if os.path.exists(path)}
+        loaded = []
+        for source_file, group in schedules.groupby('source_file', observed=True):
+            loaded.extend(self.add_schedules(group, fetched_at=mtimes.get(source_file, time.time())))
+        return loaded
+
+    def add_schedules(self, schedules, fetched_at=None):
+        '''
+        Menambah DataFrame bertipe; kunci yang sudah ada diganti jika data
+        baru lebih segar. Mengembalikan daftar kunci yang diperbarui.
+        '''
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        key_columns = ['hidden_query_origin_code', 'hidden_query_destination_code', 'hidden_query_date_calendar']
+        if any(column not in schedules.columns for column in key_columns):
+            print("    Baris jadwal tanpa kolom hidden_query_* dilewati (kunci rute tidak diketahui).")
+            return []
+        schedules = schedules.dropna(subset=key_columns)
+        updated = []
+        for (origin_code, destination_code, query_date), group in schedules.groupby(key_columns, observed=True):
+            key = (str(origin_code).upper(), str(destination_code).upper(), query_date.strftime('%Y-%m-%d'))
+            records = schedules_to_records(group.sort_values('departure_datetime'))
+            with self._lock:
+                current = self._entries.get(key)
+                if current is None or current[1] <= fetched_at:
+                    self._entries[key] = (records, fetched_at)
+                    updated.append(key)
+        return updated
+
+    def add_rows(self, rows, fetched_at=None):
+        '''Menambah baris mentah hasil parser (list dict) setelah scrape latar belakang.'''
+        from .schedule_loader import schedules_from_rows
+        if not rows:
+            return []
+        return self.add_schedules(schedules_from_rows(rows), fetched_at=fetched_at)
+
+    def add_empty(self, key, fetched_at=None):
+        '''
+        Mencatat rute-tanggal yang berhasil di-scrape tetapi tanpa kereta, agar
+        query berikutnya dijawab 200 dengan count 0 alih-alih di-scrape ulang.
+        '''
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current[1] <= fetched_at:
+                self._entries[key] = ([], fetched_at)
+                return True
+        return False
+
+    def lookup(self, origin_code, destination_code, query_date):
+        '''(baris, fetched_at) atau None jika rute-tanggal belum pernah di-scrape.'''
+        return self._entries.get((origin_code.upper(), destination_code.upper(), query_date))
+
+class LRUCache:
+    '''Cache LRU thread-safe berbasis OrderedDict untuk body jawaban yang sudah di-encode.'''
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def __len__(self):
+        return len(self._items)
+
+class BackgroundScraper:
+    '''
+    Antrian scrape latar belakang untuk cache miss. Permintaan yang sama tidak
+    diantrekan dua kali; satu thread worker menguras antrian per batch dan
+    menjalankan sweep.run_queries, lalu memasukkan hasilnya ke store. Rute
+    tanpa kereta disimpan sebagai entri kosong.
+
+    Chrome (DriverManager) dan ParseStage dibuat saat batch pertama lalu
+    dipakai ulang oleh batch berikutnya; Chrome ditutup setelah idle_timeout
+    detik tanpa permintaan dan dibuat lagi saat dibutuhkan.
+    '''
+
+    def __init__(self, store, config, on_updated=None, batch_wait=2.0, idle_timeout=None):
+        self.store = store
+        self.config = config
+        self.on_updated = on_updated
+        self.batch_wait = batch_wait
+        self.idle_timeout = config['query_service']['scraper_idle_timeout'] if idle_timeout is None else idle_timeout
+        self.stats = {'queued': 0, 'scraped': 0, 'empty': 0, 'failed': 0}
+        self.driver_manager = None
+        self.parse_stage = None
+        self._station_names = {}
+        for section in ('sweep', 'sample'):
+            for name, code in config[section]['origin_stations'] + config[section]['destination_stations']:
+                self._station_names.setdefault(code.upper(), name)
+        self._pending = set()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="background-scraper", daemon=True)
+        self._thread.start()
+
+    def knows_station(self, code):
+        return code.upper() in self._station_names
+
+    def enqueue(self, key):
+        '''True jika kunci baru dimasukkan ke antrian (atau sudah menunggu).'''
+        origin_code, destination_code, _ = key
+        if not (self.knows_station(origin_code) and self.knows_station(destination_code)):
+            return False
+        with self._lock:
+            if key not in self._pending:
+                self._pending.add(key)
+                self.stats['queued'] += 1
+                self._queue.put(key)
+        return True
+
+    def pending_count(self):
+        return len(self._pending)
+
+    def _work_item(self, key):
+        from .dates import format_kai_date
+        origin_code, destination_code, query_date = key
+        date_obj = datetime.strptime(query_date, "%Y-%m-%d").date()
+        return {
+            'query_origin_name': self._station_names[origin_code],
+            'query_origin_code': origin_code,
+            'query_destination_name': self._station_names[destination_code],
+            'query_destination_code': destination_code,
+            'query_date_calendar': query_date,
+            # Pemetaan bulan manual: setlocale tidak aman dipanggil dari thread
+            'query_date_input_format': format_kai_date(date_obj, use_locale=False),
+        }
+
+    def _release_browser(self):
+        if self.driver_manager is not None:
+            self.driver_manager.quit()
+            self.driver_manager = None
+
+    def _scrape_batch(self, batch):
+        from .sweep import create_driver_manager, create_parse_stage, run_queries
+        if self.driver_manager is None:
+            self.driver_manager = create_driver_manager(self.config)
+        if self.parse_stage is None:
+            self.parse_stage = create_parse_stage(self.config)
+        rows, failed = run_queries([self._work_item(key) for key in batch], self.config, delay_between_searches=0,
+                                   driver_manager=self.driver_manager, parse_stage=self.parse_stage)
+        fetched_at = time.time()
+        updated = self.store.add_rows(rows, fetched_at=fetched_at)
+        failed_keys = {
+            (item['query_origin_code'].upper(), item['query_destination_code'].upper(), item['query_date_calendar'])
+            for item in failed
+        }
+        for key in batch:
+            if key not in failed_keys and key not in updated and self.store.add_empty(key, fetched_at):
+                self.stats['empty'] += 1
+                updated.append(key)
+        self.stats['scraped'] += len(batch) - len(failed_keys)
+        self.stats['failed'] += len(failed_keys)
+        if self.on_updated:
+            for key in updated:
+                self.on_updated(key)
+
+    def _loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout if self.driver_manager is not None else None)
+            except queue.Empty:
+                print("    [query-service] Tidak ada permintaan scrape; Chrome latar belakang ditutup.")
+                self._release_browser()
+                continue
+            if first is None:
+                break
+            batch = [first]
+            # Tunggu sebentar agar beberapa miss berdekatan cukup memakai satu browser
+            time.sleep(self.batch_wait)
+            closing = False
+            while True:
+                try:
+                    key = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if key is None:
+                    closing = True
+                    break
+                batch.append(key)
+            try:
+                self._scrape_batch(batch)
+            except Exception as e:
+                self.stats['failed'] += len(batch)
+                print(f"    [query-service] Scrape latar belakang gagal: {e}")
+            finally:
+                with self._lock:
+                    self._pending.difference_update(batch)
+            if closing:
+                break
+        self._release_browser()
+        if self.parse_stage is not None:
+            self.parse_stage.close()
+            self.parse_stage = None
+
+    def close(self, timeout=30):
+        '''Menghentikan thread worker setelah batch yang sedang berjalan, lalu menutup Chrome dan process pool.'''
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+class QueryService:
+    '''
+    Server HTTP query jadwal yang berjalan di thread latar belakang.
+
+    Args:
+        store (ScheduleStore): Sumber data.
+        cache_size (int): Jumlah jawaban yang disimpan di cache LRU.
+        background_scraper (BackgroundScraper | None): Jika ada, cache miss
+            dijawab 202 dan scrape dijadwalkan; jika None, dijawab 404.
+    '''
+
+    def __init__(self, store, cache_size=1024, background_scraper=None, host="127.0.0.1", port=8080):
+        self.store = store
+        self.cache = LRUCache(cache_size)
+        self.background_scraper = background_scraper
+        if background_scraper is not None:
+            background_scraper.on_updated = self.cache.invalidate
+        self.latencies_ms = deque(maxlen=10_000)
+        self.stats = {'requests': 0, 'not_found': 0, 'queued': 0, 'bad_requests': 0}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _encode_answer(self, key, records, fetched_at):
+        origin_code, destination_code, query_date = key
+        body = json.dumps({
+            'origin': origin_code,
+            'destination': destination_code,
+            'date': query_date,
+            'fetched_at': _iso_timestamp(fetched_at),
+            'count': len(records),
+            'schedules': records,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return body, fetched_at
+
+    def handle_schedules(self, query):
+        '''Mengembalikan (status, body bytes, fetched_at atau None).'''
+        try:
+            key = (query['origin'][0].strip().upper(), query['destination'][0].strip().upper(),
+                   normalize_query_date(query['date'][0]))
+        except (KeyError, IndexError, ValueError):
+            with self._lock:
+                self.stats['bad_requests'] += 1
+            return 400, _json_bytes({'status': 'bad_request', 'message': 'Parameter wajib: origin, destination, date (YYYY-MM-DD).'}), None
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return 200, cached[0], cached[1]
+
+        entry = self.store.lookup(*key)
+        if entry is not None:
+            answer = self._encode_answer(key, *entry)
+            self.cache.put(key, answer)
+            return 200, answer[0], answer[1]
+
+        if self.background_scraper is not None and self.background_scraper.enqueue(key):
+            with self._lock:
+                self.stats['queued'] += 1
+            return 202, _json_bytes({'status': 'queued', 'pending': self.background_scraper.pending_count()}), None
+        with self._lock:
+            self.stats['not_found'] += 1
+        return 404, _json_bytes({'status': 'not_found'}), None
+
+    def health(self):
+        latencies = list(self.latencies_ms)
+        if len(latencies) >= 2:
+            cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+            p50, p99 = cuts[49], cuts[98]
+        else:
+            p50 = p99 = latencies[0] if latencies else 0.0
+        health = {
+            'status': 'ok',
+            'routes_indexed': len(self.store),
+            'cache': {'entries': len(self.cache), 'hits': self.cache.hits, 'misses': self.cache.misses},
+            'latency_ms': {'p50': round(p50, 3), 'p99': round(p99, 3), 'samples': len(latencies)},
+        }
+        health.update(self.stats)
+        if self.background_scraper is not None:
+            health['background_scrape'] = dict(self.background_scraper.stats, pending=self.background_scraper.pending_count())
+        return health
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass # Latensi dicatat di /health, bukan per baris log
+
+            def _send(self, status, body, fetched_at=None):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                if fetched_at is not None:
+                    self.send_header("Age", str(max(0, int(time.time() - fetched_at))))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                started = time.perf_counter()
+                parsed = urlparse(self.path)
+                if parsed.path == "/schedules":
+                    self._send(*service.handle_schedules(parse_qs(parsed.query)))
+                    with service._lock:
+                        service.stats['requests'] += 1
+                        service.latencies_ms.append((time.perf_counter() - started) * 1000)
+                elif parsed.path == "/health":
+                    self._send(200, _json_bytes(service.health()))
+                else:
+                    self._send(404, _json_bytes({'status': 'not_found'}))
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="query-service", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def _json_bytes(data):
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+def run_query_service(config, csv_paths=None):
+    '''Memuat CSV lalu melayani query sampai Ctrl+C.'''
+    service_config = config['query_service']
+    store = ScheduleStore()
+    csv_paths = csv_paths or service_config['csv_files']
+    started = time.perf_counter()
+    routes_loaded = store.load_csvs(csv_paths)
+    print(f"{len(routes_loaded)} rute-tanggal dimuat dalam {time.perf_counter() - started:.2f} detik.")
+
+    background_scraper = BackgroundScraper(store, config) if service_config['scrape_on_miss'] else None
+    service = QueryService(store, cache_size=service_config['cache_size'], background_scraper=background_scraper,
+                           host=service_config['host'], port=service_config['port'])
+    print(f"Layanan query jadwal berjalan di {service.url} (Ctrl+C untuk berhenti)")
+    print(f"Contoh: {service.url}schedules?origin=SBI&destination=GMR&date=2025-06-03")
+    try:
+        service.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nLayanan dihentikan.")
+    finally:
+        service.httpd.server_close()
+        if background_scraper is not None:
+            background_scraper.close()
@@ -0,0 +1,228 @@
+'''
+Parsing ulang halaman hasil KAI yang tersimpan (file .html, .html.gz, atau
+.json berisi record ekstraksi browser) tanpa membuka browser.
+
+Konteks query dibaca dari file sidecar "<nama halaman>.context.json" jika ada,
+misalnya {"query_url": "...", "query_origin_code": "SBI", ...}. Sweep/sample
+menulis pasangan halaman + sidecar ini jika konfigurasi "archive" aktif
+(lihat archive_page), sehingga dataset lama bisa dibangun ulang setelah
+markup KAI berubah atau parser mendapat field baru.
+
+Parsing ulang massal (run_reparse) membagi halaman ke process pool per
+potongan beberapa halaman; worker membaca file sendiri sehingga yang dikirim
+antar proses hanya path dan baris hasil. Baris ditulis bertahap ke sink
+keluaran (CSV, Parquet atau SQLite, lihat output.open_row_sink) dalam urutan
+halaman masukan.
+'''
+import collections
+import contextlib
+import glob
+import gzip
+import io
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .output import open_row_sink
+from .parsing import parse_captured_payload
+
+CONTEXT_SUFFIX = ".context.json"
+PAGE_EXTENSIONS = ('.html.gz', '.html', '.json')
+
+def page_base_path(page_path):
+    '''Path halaman tanpa ekstensi .html/.html.gz/.json.'''
+    for extension in PAGE_EXTENSIONS:
+        if page_path.endswith(extension):
+            return page_path[:-len(extension)]
+    return page_path
+
+def _safe_name(text):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(text)).strip('_')
+
+def archive_page(archive_dir, payload, query_url, query_context):
+    '''
+    Menyimpan satu halaman hasil mentah beserta sidecar konteksnya ke
+    "<archive_dir>/<tanggal query>/", dalam bentuk yang dibaca kembali oleh
+    load_archived_page. HTML disimpan ter-gzip; payload "records" sebagai JSON.
+
+    Returns:
+        str: Path halaman yang ditulis.
+    '''
+    day_dir = os.path.join(archive_dir, _safe_name(query_context.get('query_date_calendar') or 'tanpa_tanggal'))
+    os.makedirs(day_dir, exist_ok=True)
+    base_path = os.path.join(day_dir, _safe_name(
+        f"{query_context.get('query_origin_name', 'X')}_{query_context.get('query_destination_name', 'X')}_"
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    ))
+
+    if isinstance(payload, list):
+        page_path = base_path + '.json'
+        with open(page_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+    else:
+        page_path = base_path + '.html.gz'
+        if isinstance(payload, str):
+            payload = gzip.compress(payload.encode('utf-8'), compresslevel=6)
+        elif payload[:2] != b'\x1f\x8b':
+            payload = gzip.compress(payload, compresslevel=6)
+        with open(page_path, 'wb') as f:
+            f.write(payload)
+
+    with open(base_path + CONTEXT_SUFFIX, 'w', encoding='utf-8') as f:
+        json.dump({'query_url': query_url, **query_context}, f, ensure_ascii=False, indent=1)
+    return page_path
+
+def find_archived_pages(paths):
+    '''
+    Menjabarkan file, pola glob dan direktori (dibaca rekursif) menjadi daftar
+    halaman tersimpan yang terurut; file sidecar konteks dilewati.
+    '''
+    page_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in os.walk(path):
+                page_paths.extend(os.path.join(root, name) for name in filenames)
+        else:
+            matches = glob.glob(path, recursive=True)
+            page_paths.extend(matches if matches else [path])
+    return sorted({
+        page_path for page_path in page_paths
+        if page_path.endswith(PAGE_EXTENSIONS) and not page_path.endswith(CONTEXT_SUFFIX)
+    })
+
+def load_archived_page(page_path):
+    '''
+    Membaca satu halaman tersimpan.
+
+    Returns:
+        tuple: (payload, query_url, query_context). payload berupa bytes (HTML
+        atau gzip, didekode oleh parser) atau list record untuk file .json.
+    '''
+    if page_path.endswith('.json'):
+        with open(page_path, encoding='utf-8') as f:
+            payload = json.load(f)
+    else:
+        with open(page_path, 'rb') as f:
+            payload = f.read()
+
+    query_context = {}
+    context_path = page_base_path(page_path) + CONTEXT_SUFFIX
+    if os.path.exists(context_path):
+        with open(context_path, encoding='utf-8') as f:
+            query_context = json.load(f)
+    query_url = query_context.pop('query_url', "N/A")
+    query_context.setdefault('archived_page', os.path.basename(page_path))
+    return payload, query_url, query_context
+
+def _reparse_page(page_path):
+    '''Returns: (rows, pesan error atau None).'''
+    try:
+        payload, query_url, query_context = load_archived_page(page_path)
+    except (OSError, ValueError) as e:
+        return [], f"gagal dibaca: {e}"
+    try:
+        return parse_captured_payload(payload, query_url, query_context), None
+    except Exception as e:
+        return [], f"gagal di-parse: {type(e).__name__}: {e}"
+
+def _reparse_chunk_worker(page_paths):
+    '''Dijalankan di proses worker untuk beberapa halaman sekaligus; log parser per halaman dibuang.'''
+    results = []
+    for page_path in page_paths:
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows, error = _reparse_page(page_path)
+        results.append((page_path, rows, error))
+    return results
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+def iter_reparsed_chunks(page_paths, workers=None, pages_per_task=32):
+    '''
+    Parsing ulang page_paths di process pool dan menghasilkan list
+    (page_path, rows, error) per potongan, dalam urutan masukan. Paling banyak
+    2 x workers potongan diproses sekaligus agar hasil tidak menumpuk di memori
+    saat sink lebih lambat dari parser. workers=1 berjalan di proses ini.
+    '''
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(page_paths, max(1, int(pages_per_task)))
+    if workers == 1:
+        yield from map(_reparse_chunk_worker, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = collections.deque()
+        max_in_flight = 2 * workers
+        for chunk in chunks:
+            in_flight.append(executor.submit(_reparse_chunk_worker, chunk))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def run_reparse(paths, output_path, workers=None, pages_per_task=32, progress_interval=5.0, append=False):
+    '''
+    Parsing ulang massal halaman tersimpan ke output_path (.csv, .parquet,
+    .sqlite/.db) dengan laporan halaman per detik dan daftar halaman gagal.
+
+    Args:
+        paths (list): File halaman, pola glob, atau direktori arsip.
+        workers (int): Jumlah proses parser (None = jumlah core CPU).
+        pages_per_task (int): Jumlah halaman per tugas yang dikirim ke worker.
+        progress_interval (float): Jeda (detik) antar baris progres.
+        append (bool): Tambahkan ke tabel SQLite yang ada alih-alih menggantinya.
+
+    Returns:
+        dict: Statistik run (pages, rows, empty_pages, failures, seconds).
+    '''
+    page_paths = find_archived_pages(paths)
+    if not page_paths:
+        print("Tidak ada halaman tersimpan (.html, .html.gz, .json) yang ditemukan.")
+        return None
+    workers = workers or os.cpu_count() or 1
+    print(f"Parsing ulang {len(page_paths)} halaman dengan {workers} worker ke '{output_path}'...")
+
+    stats = {'pages': 0, 'rows': 0, 'empty_pages': 0, 'failures': [], 'seconds': 0.0}
+    sink = open_row_sink(output_path, append=append)
+    started = time.perf_counter()
+    last_report = started
+    try:
+        for results in iter_reparsed_chunks(page_paths, workers=workers, pages_per_task=pages_per_task):
+            chunk_rows = []
+            for page_path, rows, error in results:
+                stats['pages'] += 1
+                if error:
+                    stats['failures'].append((page_path, error))
+                elif not rows:
+                    stats['empty_pages'] += 1
+                chunk_rows.extend(rows)
+            sink.write(chunk_rows)
+            stats['rows'] += len(chunk_rows)
+
+            now = time.perf_counter()
+            if now - last_report >= progress_interval:
+                last_report = now
+                print(f"  [reparse] {stats['pages']}/{len(page_paths)} halaman, "
+                      f"{stats['pages'] / (now - started):.0f} halaman/s, {stats['rows']} jadwal, "
+                      f"{len(stats['failures'])} gagal")
+    except KeyboardInterrupt:
+        print("\n\nParsing ulang dihentikan oleh user (Ctrl+C); baris yang sudah diproses tetap disimpan.")
+    finally:
+        sink.close()
+        stats['seconds'] = time.perf_counter() - started
+
+    seconds = stats['seconds'] or 1e-9
+    print(f"\nSelesai: {stats['pages']} halaman dalam {stats['seconds']:.1f} detik "
+          f"({stats['pages'] / seconds:.0f} halaman/s, {stats['rows'] / seconds:.0f} jadwal/s).")
+    print(f"Total {stats['rows']} jadwal ditulis ke '{output_path}'; "
+          f"{stats['empty_pages']} halaman tanpa jadwal, {len(stats['failures'])} halaman gagal.")
+    for page_path, error in stats['failures'][:20]:
+        print(f"  - {page_path}: {error}")
+    if len(stats['failures']) > 20:
+        print(f"  ... dan {len(stats['failures']) - 20} lainnya.")
+    return stats
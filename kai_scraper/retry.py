@@ -0,0 +1,207 @@
+'''
+Subsistem retry untuk query scraping KAI: kebijakan per jenis error dengan
+exponential backoff + jitter, circuit breaker per situs, dan antrian kerja yang
+memasukkan kembali query gagal alih-alih membuangnya.
+'''
+import random
+import time
+from collections import deque
+
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException, WebDriverException
+
+class RetryPolicy:
+    '''
+    Kebijakan retry untuk satu kelas exception.
+
+    Args:
+        max_attempts (int): Jumlah percobaan maksimum (termasuk percobaan pertama).
+        base_delay (float): Jeda (detik) sebelum retry pertama.
+        multiplier (float): Faktor pengali jeda untuk setiap retry berikutnya.
+        max_delay (float): Batas atas jeda.
+        jitter (float): Porsi acak jeda (0..1). 0.5 berarti jeda diambil acak
+            antara 50% dan 100% dari nilai backoff.
+    '''
+
+    def __init__(self, max_attempts=3, base_delay=5.0, multiplier=2.0, max_delay=120.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def should_retry(self, attempt):
+        '''attempt adalah jumlah percobaan yang sudah gagal.'''
+        return attempt < self.max_attempts
+
+    def compute_delay(self, attempt):
+        backoff = min(self.max_delay, self.base_delay * (self.multiplier ** max(attempt - 1, 0)))
+        return random.uniform(backoff * (1 - self.jitter), backoff)
+
+    def __repr__(self):
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+                f"multiplier={self.multiplier}, max_delay={self.max_delay}, jitter={self.jitter})")
+
+# Kebijakan default per jenis error. Dicocokkan berdasarkan MRO exception, jadi
+# kelas yang lebih spesifik harus tetap punya entri sendiri.
+DEFAULT_RETRY_POLICIES = {
+    # Halaman lambat: coba sekali lagi dengan jeda cukup panjang. Rute tanpa
+    # jadwal tidak sampai ke sini (search_steps mengenali halaman kosong)
+    TimeoutException: RetryPolicy(max_attempts=2, base_delay=10.0),
+    # Form belum siap / markup berubah: jarang pulih, cukup satu retry
+    NoSuchElementException: RetryPolicy(max_attempts=2, base_delay=5.0),
+    # Suggestion flexdatalist atau overlay menghalangi: biasanya pulih cepat
+    ElementNotInteractableException: RetryPolicy(max_attempts=3, base_delay=2.0),
+    # Masalah sesi/koneksi browser
+    WebDriverException: RetryPolicy(max_attempts=3, base_delay=15.0),
+    # Error lain yang tidak terduga: jangan diulang
+    Exception: RetryPolicy(max_attempts=1),
+}
+
+def classify_error(error, policies=None):
+    '''Mencari RetryPolicy yang paling spesifik untuk sebuah exception.'''
+    policies = policies or DEFAULT_RETRY_POLICIES
+    for error_class in type(error).__mro__:
+        if error_class in policies:
+            return error_class, policies[error_class]
+    return Exception, RetryPolicy(max_attempts=1)
+
+class CircuitBreaker:
+    '''
+    Circuit breaker per situs berbasis tingkat kegagalan dalam jendela geser.
+
+    Jika dari `window_size` query terakhir (minimal `min_calls`) tingkat gagalnya
+    mencapai `failure_threshold`, breaker terbuka dan sweep dijeda selama
+    `cooldown` detik. Setelah itu satu query percobaan (half-open) dijalankan:
+    sukses menutup breaker, gagal membukanya lagi dengan cooldown dua kali lipat
+    (maksimal `max_cooldown`).
+    '''
+
+    def __init__(self, site="booking.kai.id", window_size=10, min_calls=5, failure_threshold=0.6, cooldown=60.0, max_cooldown=900.0):
+        self.site = site
+        self.window = deque(maxlen=window_size)
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = "closed"
+        self.opened_at = None
+        self.times_opened = 0
+
+    def failure_rate(self):
+        if not self.window:
+            return 0.0
+        return self.window.count(False) / len(self.window)
+
+    def before_call(self):
+        '''Dipanggil sebelum setiap query; menunggu jika breaker sedang terbuka.'''
+        if self.state != "open":
+            return
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        if remaining > 0:
+            print(f"  [circuit-breaker] {self.site} sedang terbuka, sweep dijeda {remaining:.0f} detik...")
+            time.sleep(remaining)
+        self.state = "half_open"
+        print(f"  [circuit-breaker] {self.site} half-open, mencoba satu query percobaan.")
+
+    def record_success(self):
+        self.window.append(True)
+        if self.state == "half_open":
+            print(f"  [circuit-breaker] {self.site} pulih, breaker ditutup kembali.")
+            self.state = "closed"
+            self.cooldown = self.base_cooldown
+            self.window.clear()
+
+    def record_failure(self):
+        self.window.append(False)
+        if self.state == "half_open":
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == "closed" and len(self.window) >= self.min_calls and self.failure_rate() >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.times_opened += 1
+        print(f"  [circuit-breaker] {self.site} dibuka (tingkat gagal {self.failure_rate():.0%}), jeda {self.cooldown:.0f} detik.")
+
+class RetryQueue:
+    '''
+    Antrian item kerja dengan retry. Item yang gagal dimasukkan kembali ke
+    antrian dengan waktu tunggu sesuai kebijakan retry-nya; item yang kehabisan
+    percobaan dikumpulkan di `failed_items`.
+    '''
+
+    def __init__(self, work_items, policies=None, circuit_breaker=None):
+        # Setiap entri: [waktu_siap (monotonic), jumlah_gagal, item]
+        self.pending = deque([0.0, 0, item] for item in work_items)
+        self.policies = policies or DEFAULT_RETRY_POLICIES
+        self.circuit_breaker = circuit_breaker
+        self.failed_items = []
+        self.stats = {'attempts': 0, 'succeeded': 0, 'retried': 0, 'gave_up': 0, 'errors_by_class': {}}
+
+    def __len__(self):
+        return len(self.pending)
+
+    def _next_ready(self):
+        '''Ambil item yang paling cepat siap, tunggu jika belum ada yang siap.'''
+        entry = min(self.pending, key=lambda e: e[0])
+        self.pending.remove(entry)
+        wait_seconds = entry[0] - time.monotonic()
+        if wait_seconds > 0:
+            print(f"  Menunggu {wait_seconds:.1f} detik (backoff) sebelum mencoba ulang...")
+            time.sleep(wait_seconds)
+        return entry
+
+    def run(self, handler, delay_between_items=0, should_stop=None):
+        '''
+        Menjalankan handler(item) untuk setiap item sampai antrian kosong atau
+        should_stop() bernilai True. handler harus melempar exception jika
+        query gagal.
+
+        Returns:
+            list: Item yang tetap gagal setelah semua percobaan.
+        '''
+        while self.pending:
+            if should_stop and should_stop():
+                break
+            ready_at, failures, item = self._next_ready()
+            if self.circuit_breaker:
+                self.circuit_breaker.before_call()
+            self.stats['attempts'] += 1
+            try:
+                handler(item)
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                failures += 1
+                _, policy = classify_error(e, self.policies)
+                errors = self.stats['errors_by_class']
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_failure()
+                if policy.should_retry(failures):
+                    delay = policy.compute_delay(failures)
+                    self.stats['retried'] += 1
+                    print(f"    {type(e).__name__}: dijadwalkan ulang (percobaan {failures + 1}/{policy.max_attempts}) dalam {delay:.1f} detik.")
+                    self.pending.append([time.monotonic() + delay, failures, item])
+                else:
+                    self.stats['gave_up'] += 1
+                    print(f"    {type(e).__name__}: menyerah setelah {failures} percobaan.")
+                    self.failed_items.append(item)
+            else:
+                self.stats['succeeded'] += 1
+                if self.circuit_breaker:
+                    self.circuit_breaker.record_success()
+            if self.pending and delay_between_items:
+                time.sleep(delay_between_items)
+        return self.failed_items
+
+    def print_stats(self):
+        stats = self.stats
+        print(f"Retry: {stats['attempts']} percobaan, {stats['succeeded']} sukses, {stats['retried']} dijadwalkan ulang, {stats['gave_up']} menyerah.")
+        if stats['errors_by_class']:
+            print("Error per jenis: " + ", ".join(f"{name}={count}" for name, count in sorted(stats['errors_by_class'].items())))
+        if self.circuit_breaker and self.circuit_breaker.times_opened:
+            print(f"Circuit breaker terbuka {self.circuit_breaker.times_opened} kali.")
@@ -0,0 +1,209 @@
+'''
+Loader CSV jadwal hasil scraping (misalnya jadwal_kereta_sby_jkt1.csv) menjadi
+DataFrame pandas bertipe: durasi dalam menit, tanggal/waktu sebagai datetime,
+sisa kursi sebagai angka, dan harga sebagai integer. Konversi dilakukan secara
+vectorized; nilai teks yang berulang (tanggal, nama bulan) cukup di-parse sekali.
+'''
+import glob
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from .output import flatten_row
+
+BULAN_INDONESIA = {
+    "januari": 1, "februari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6,
+    "juli": 7, "agustus": 8, "september": 9, "oktober": 10, "november": 11, "desember": 12,
+    # Singkatan yang kadang muncul di halaman KAI
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "agu": 8, "agt": 8,
+    "sep": 9, "okt": 10, "nov": 11, "des": 12,
+}
+
+# Kolom yang dibaca sebagai teks apa adanya; konversi tipe dilakukan setelahnya
+RAW_STRING_COLUMNS = [
+    'train_name', 'train_number', 'train_class', 'departure_station', 'departure_time',
+    'departure_date', 'duration', 'arrival_station', 'arrival_date', 'arrival_time',
+    'price', 'availability',
+]
+
+# Kolom teks dengan sedikit nilai unik: disimpan sebagai category agar hemat memori
+CATEGORY_COLUMNS = [
+    'train_name', 'train_class', 'departure_station', 'arrival_station',
+    'hidden_query_origin_code', 'hidden_query_origin_name',
+    'hidden_query_destination_code', 'hidden_query_destination_name',
+]
+
+# Satu jadwal dianggap sama jika kereta, kelas, stasiun dan waktu berangkatnya sama
+DEDUP_KEY_COLUMNS = [
+    'train_number', 'train_class', 'departure_station', 'arrival_station',
+    'departure_datetime',
+]
+
+@lru_cache(maxsize=None)
+def month_number(month_name):
+    '''Nama bulan Indonesia (huruf besar/kecil bebas) -> nomor bulan, atau None.'''
+    return BULAN_INDONESIA.get(month_name.strip().lower())
+
+@lru_cache(maxsize=None)
+def parse_indonesian_date(date_text):
+    '''"2 Juni 2025" atau "02-Juni-2025" -> pandas.Timestamp, NaT jika gagal.'''
+    parts = date_text.replace('-', ' ').split()
+    if len(parts) != 3:
+        return pd.NaT
+    day, month_name, year = parts
+    month = month_number(month_name)
+    if month is None or not day.isdigit() or not year.isdigit():
+        return pd.NaT
+    try:
+        return pd.Timestamp(year=int(year), month=month, day=int(day))
+    except ValueError:
+        return pd.NaT
+
+def parse_date_column(series):
+    '''Parse kolom tanggal teks; setiap nilai unik hanya di-parse sekali.'''
+    values = series.astype('string')
+    uniques = values.dropna().unique()
+    lookup = {value: parse_indonesian_date(value) for value in uniques}
+    return pd.to_datetime(values.map(lookup), errors='coerce')
+
+def parse_duration_minutes(series):
+    '''"10j 6m" -> 606. Bagian jam/menit boleh salah satu saja.'''
+    parts = series.astype('string').str.extract(r'(?:(\d+)\s*j)?\s*(?:(\d+)\s*m)?')
+    hours = pd.to_numeric(parts[0], errors='coerce')
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    total = hours.fillna(0) * 60 + minutes.fillna(0)
+    return total.where(hours.notna() | minutes.notna()).astype('Int32')
+
+def parse_time_offset(series):
+    '''"22:10" -> Timedelta 22 jam 10 menit, NaT jika tidak valid.'''
+    parts = series.astype('string').str.extract(r'^\s*(\d{1,2}):(\d{2})\s*$')
+    hours = pd.to_numeric(parts[0], errors='coerce')
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    return pd.to_timedelta(hours * 60 + minutes, unit='m')
+
+def parse_price_column(series):
+    '''
+    Harga yang sudah berupa angka dipakai langsung; sisa string seperti
+    "Rp 680.000,-" (saat parse_price gagal) dibersihkan secara vectorized.
+    '''
+    values = series.astype('string')
+    numeric = pd.to_numeric(values, errors='coerce')
+    needs_cleaning = numeric.isna() & values.str.contains('Rp', na=False)
+    if needs_cleaning.any():
+        cleaned = values[needs_cleaning].str.replace(r'[^\d]', '', regex=True)
+        numeric[needs_cleaning] = pd.to_numeric(cleaned, errors='coerce')
+    return numeric.round().astype('Int64')
+
+def parse_availability(series):
+    '''
+    "Tersisa 14 kursi" -> (14, True), "Tersedia" -> (<NA>, True),
+    "Habis"/"Penuh" -> (0, False). Mengembalikan (seats_left, is_available).
+    '''
+    values = series.astype('string').str.strip().str.lower()
+    seats_left = pd.to_numeric(values.str.extract(r'(\d+)\s*kursi')[0], errors='coerce').astype('Int32')
+    sold_out = values.str.contains(r'habis|penuh', na=False)
+    seats_left = seats_left.mask(sold_out, 0)
+    has_seats = seats_left.fillna(0).gt(0).to_numpy(dtype=bool) | values.str.startswith('tersedia').fillna(False).to_numpy(dtype=bool)
+    is_available = pd.Series(has_seats & ~sold_out.to_numpy(dtype=bool), index=series.index, dtype='boolean')
+    is_available = is_available.mask(values.isna())
+    return seats_left, is_available
+
+def normalize_schedules(df):
+    '''Menambahkan kolom bertipe ke DataFrame mentah hasil read_csv.'''
+    df = df.copy()
+    df['duration_minutes'] = parse_duration_minutes(df['duration'])
+    df['departure_datetime'] = parse_date_column(df['departure_date']) + parse_time_offset(df['departure_time'])
+    df['arrival_datetime'] = parse_date_column(df['arrival_date']) + parse_time_offset(df['arrival_time'])
+    df['price'] = parse_price_column(df['price'])
+    df['seats_left'], df['is_available'] = parse_availability(df['availability'])
+    if 'hidden_query_date_calendar' in df.columns:
+        df['hidden_query_date_calendar'] = pd.to_datetime(df['hidden_query_date_calendar'], format='%Y-%m-%d', errors='coerce')
+    return df
+
+def schedules_from_rows(rows):
+    '''
+    Baris mentah hasil parser (list dict dengan hidden_details) -> DataFrame
+    bertipe, dengan kolom yang sama seperti CSV keluaran save_to_csv.
+    Tanpa baris, hasilnya DataFrame kosong dengan kolom dan tipe yang sama.
+    '''
+    if rows:
+        raw = pd.DataFrame([flatten_row(row) for row in rows])
+    else:
+        raw = pd.DataFrame(columns=RAW_STRING_COLUMNS, dtype=str)
+    raw = raw.astype({'price': 'string'}).replace({'Tidak tersedia': pd.NA})
+    return normalize_schedules(raw)
+
+def _expand_paths(paths):
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    expanded = []
+    for path in paths:
+        matches = sorted(glob.glob(str(path)))
+        expanded.extend(matches if matches else [str(path)])
+    return expanded
+
+def load_schedule_csvs(paths, chunksize=100_000, deduplicate=True):
+    '''
+    Membaca satu atau banyak CSV keluaran scraper (path atau pola glob) secara
+    bertahap per chunk dan mengembalikan satu DataFrame bertipe.
+
+    Args:
+        paths (str | list): Path file atau pola glob, misalnya "jadwal_*.csv".
+        chunksize (int): Jumlah baris per chunk saat membaca CSV.
+        deduplicate (bool): Buang jadwal yang sama dari beberapa sweep/file
+            (lihat DEDUP_KEY_COLUMNS); baris terakhir yang dipertahankan.
+    '''
+    frames = []
+    for path in _expand_paths(paths):
+        reader = pd.read_csv(
+            path, chunksize=chunksize, encoding='utf-8',
+            dtype={column: 'string' for column in RAW_STRING_COLUMNS},
+            keep_default_na=False, na_values=['', 'Tidak tersedia'],
+        )
+        for chunk in reader:
+            chunk = normalize_schedules(chunk)
+            chunk['source_file'] = os.path.basename(path)
+            frames.append(chunk)
+
+    if not frames:
+        return pd.DataFrame()
+
+    df = pd.concat(frames, ignore_index=True)
+    for column in CATEGORY_COLUMNS + ['source_file']:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+
+    if deduplicate:
+        key_columns = [column for column in DEDUP_KEY_COLUMNS if column in df.columns]
+        before = len(df)
+        df = df.drop_duplicates(subset=key_columns, keep='last').reset_index(drop=True)
+        print(f"Deduplikasi: {before - len(df)} baris duplikat dibuang dari {before} baris.")
+    return df
+
+def export_schedules(df, output_path):
+    '''Simpan DataFrame bertipe; format ditentukan dari ekstensi file.'''
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension == '.parquet':
+        df.to_parquet(output_path, index=False)
+    elif extension == '.feather':
+        df.reset_index(drop=True).to_feather(output_path)
+    elif extension == '.json':
+        df.to_json(output_path, orient='records', date_format='iso', force_ascii=False)
+    elif extension == '.csv':
+        df.to_csv(output_path, index=False, encoding='utf-8')
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: '{extension}' (pilihan: .csv, .parquet, .feather, .json)")
+    print(f"{len(df)} jadwal diekspor ke '{output_path}'")
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    csv_patterns = sys.argv[1:] or ["jadwal_kereta_*.csv"]
+    started = time.perf_counter()
+    schedules = load_schedule_csvs(csv_patterns)
+    print(f"Memuat {len(schedules)} jadwal dalam {time.perf_counter() - started:.2f} detik.")
+    if not schedules.empty:
+        print(schedules.dtypes)
+        print(schedules[['train_name', 'departure_datetime', 'duration_minutes', 'price', 'seats_left']].head())
@@ -0,0 +1,384 @@
+'''
+Menjalankan query scraping KAI: sweep penuh (semua asal x tujuan x tanggal)
+dan random sampling rute sampai target jumlah sampel tercapai.
+'''
+import random
+import time
+from datetime import datetime, timedelta
+
+from .dates import format_kai_date, setup_indonesian_locale
+from .output import save_to_csv
+from .planner import RouteStats, plan_work_items
+from .profiling import create_profiler
+
+def _parse_date(date_str):
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"Format tanggal '{date_str}' salah. Gunakan format YYYY-MM-DD.")
+
+def build_sweep_work_items(config):
+    '''Semua kombinasi asal x tujuan x tanggal dari bagian "sweep" konfigurasi.'''
+    sweep_config = config['sweep']
+    start_date_obj = _parse_date(sweep_config['start_date'])
+    use_locale = setup_indonesian_locale()
+    work_items = []
+    for origin_name, origin_code in sweep_config['origin_stations']:
+        for dest_name, dest_code in sweep_config['destination_stations']:
+            for i in range(sweep_config['num_days']):
+                current_date_obj = start_date_obj + timedelta(days=i)
+                work_items.append({
+                    'query_origin_name': origin_name,
+                    'query_origin_code': origin_code,
+                    'query_destination_name': dest_name,
+                    'query_destination_code': dest_code,
+                    'query_date_calendar': current_date_obj.strftime('%Y-%m-%d'),
+                    'query_date_input_format': format_kai_date(current_date_obj, use_locale)
+                })
+    return work_items
+
+def build_sample_work_items(config):
+    '''Kombinasi rute unik (asal != tujuan) dalam urutan acak untuk satu tanggal.'''
+    sample_config = config['sample']
+    target_date_obj = _parse_date(sample_config['target_date'])
+    date_str_for_kai_form = format_kai_date(target_date_obj, setup_indonesian_locale())
+    print(f"Tanggal yang akan di-scrape: {sample_config['target_date']} ({date_str_for_kai_form})")
+
+    routes = [
+        (origin_name, origin_code, dest_name, dest_code)
+        for origin_name, origin_code in sample_config['origin_stations']
+        for dest_name, dest_code in sample_config['destination_stations']
+        if origin_code != dest_code # Pastikan stasiun asal dan tujuan berbeda
+    ]
+    print(f"Total kombinasi rute yang tersedia: {len(routes)}")
+    random.shuffle(routes)
+
+    return [
+        {
+            'query_origin_name': origin_name,
+            'query_origin_code': origin_code,
+            'query_destination_name': dest_name,
+            'query_destination_code': dest_code,
+            'query_date_calendar': target_date_obj.strftime('%Y-%m-%d'),
+            'query_date_input_format': date_str_for_kai_form,
+            'route_index': route_index
+        }
+        for route_index, (origin_name, origin_code, dest_name, dest_code) in enumerate(routes, 1)
+    ]
+
+def _driver_source(config):
+    '''DaemonDriverSource jika daemon browser diaktifkan; None = Chrome sendiri (setup_driver).'''
+    if not config['browser_daemon']['enabled']:
+        return None
+    from .browser_daemon import DaemonDriverSource
+    return DaemonDriverSource.from_config(config)
+
+def create_driver_manager(config):
+    '''DriverManager sesuai bagian "driver" konfigurasi (dan daemon browser jika aktif).'''
+    from .driver_manager import DriverManager
+    driver_config = config['driver']
+    return DriverManager(
+        config['webdriver_path'], headless=config['headless'],
+        max_queries_per_driver=driver_config['max_queries_per_driver'],
+        max_rss_mb=driver_config['max_rss_mb'],
+        max_consecutive_failures=driver_config['max_consecutive_failures'],
+        driver_source=_driver_source(config)
+    )
+
+def create_parse_stage(config):
+    '''ParseStage sesuai bagian "parse_pool" konfigurasi, atau None jika tidak dipakai.'''
+    pool_config = config['parse_pool']
+    # "records" sudah diekstrak di browser; process pool tidak diperlukan
+    if not pool_config['enabled'] or config['capture_mode'] == "records":
+        return None
+    from .parse_pool import ParseStage
+    return ParseStage(max_workers=pool_config['workers'], max_queue_size=pool_config['queue_size'])
+
+def _run_with_driver_manager(work_items, config, process_page, target_reached, delay_between_searches, profiler, progress, on_attempt,
+                             driver_manager=None):
+    '''
+    Satu Chrome, satu query dalam satu waktu, lewat DriverManager + RetryQueue.
+    driver_manager milik pemanggil tidak ditutup di akhir run.
+    '''
+    from .browser import scrape_kai_with_selenium
+    from .retry import CircuitBreaker, RetryQueue
+    from selenium.common.exceptions import WebDriverException
+
+    owns_driver_manager = driver_manager is None
+    if owns_driver_manager:
+        driver_manager = create_driver_manager(config)
+    try:
+        driver_manager.get_driver()
+    except WebDriverException:
+        print("Gagal setup WebDriver; semua query dianggap gagal.")
+        return list(work_items)
+
+    def scrape_work_item(query_context):
+        '''Menjalankan satu query; melempar exception agar RetryQueue bisa menjadwalkan ulang.'''
+        print(f"\nMencari rute: {query_context['query_origin_name']} ({query_context['query_origin_code']}) -> "
+              f"{query_context['query_destination_name']} ({query_context['query_destination_code']}) "
+              f"tanggal {query_context['query_date_calendar']} ({query_context['query_date_input_format']})")
+        progress()
+
+        page_html, actual_url_loaded = driver_manager.run_query(lambda driver: scrape_kai_with_selenium(
+            driver, query_context['query_origin_name'], query_context['query_destination_name'],
+            query_context['query_date_input_format'], config['adult_passengers'], config['infant_passengers'],
+            capture_mode=config['capture_mode'], raise_errors=True, booking_url=config['booking_url']
+        ))
+        if page_html:
+            process_page(page_html, actual_url_loaded or "N/A", query_context)
+        else:
+            print("    Tidak ada HTML hasil untuk diproses.")
+
+    def timed_work_item(query_context):
+        started = time.perf_counter()
+        try:
+            scrape_work_item(query_context)
+        except Exception:
+            on_attempt(query_context, False, time.perf_counter() - started)
+            raise
+        on_attempt(query_context, True, time.perf_counter() - started)
+
+    retry_queue = RetryQueue(work_items, circuit_breaker=CircuitBreaker(cooldown=config['retry']['breaker_cooldown']))
+    try:
+        handler = timed_work_item if on_attempt else scrape_work_item
+        handler = profiler.wrap_query(handler) if profiler else handler
+        failed_items = retry_queue.run(handler, delay_between_items=delay_between_searches, should_stop=target_reached)
+        retry_queue.print_stats()
+        return failed_items
+    finally:
+        if owns_driver_manager:
+            driver_manager.quit()
+            driver_manager.print_report()
+
+def _run_in_tabs(work_items, config, process_page, target_reached, profiler, on_attempt, on_busy_time):
+    '''Satu Chrome dengan beberapa tab yang diselingi scheduler async (lihat multitab.py).'''
+    from .multitab import MultiTabScraper
+    from selenium.common.exceptions import WebDriverException
+
+    multitab_config = config['multitab']
+    if profiler and profiler.mode == "query":
+        print("Catatan profiling: mode \"query\" tidak didukung di mode multi-tab; gunakan mode \"run\".")
+    scraper = MultiTabScraper(config['webdriver_path'], headless=config['headless'],
+                              tabs=multitab_config['tabs'], isolation=multitab_config['isolation'],
+                              driver_source=_driver_source(config))
+    try:
+        scraper.start()
+    except WebDriverException:
+        print("Gagal setup WebDriver; semua query dianggap gagal.")
+        return list(work_items)
+    try:
+        # Tidak ada jeda antar query: tab-tab sudah bergantian selama menunggu halaman
+        return scraper.run(work_items, on_result=process_page, should_stop=target_reached,
+                           capture_mode=config['capture_mode'], booking_url=config['booking_url'],
+                           on_attempt=on_attempt, on_busy_time=on_busy_time)
+    finally:
+        scraper.quit()
+        scraper.print_report()
+
+def run_queries(work_items, config, delay_between_searches=None, target_row_count=None, profiler=None, route_stats=None,
+                on_attempt=None, driver_manager=None, parse_stage=None):
+    '''
+    Menjalankan work_items melalui DriverManager + RetryQueue, atau beberapa
+    tab dalam satu Chrome jika konfigurasi "multitab" aktif, dengan ParseStage
+    opsional. Berhenti lebih awal jika target_row_count tercapai. Jika
+    profiler dalam mode "query", setiap query ke-N diprofilkan. Jika
+    route_stats (planner.RouteStats) diberikan, setiap percobaan dan jumlah
+    baris per rute dicatat. Jika konfigurasi "archive" aktif, setiap halaman
+    mentah disimpan beserta konteks query-nya untuk parsing ulang (reparse).
+    on_attempt(query_context, sukses, detik) dipanggil untuk setiap percobaan
+    query (dipakai loadtest untuk latensi).
+
+    driver_manager dan parse_stage opsional milik pemanggil dipakai ulang dan
+    tidak ditutup di akhir run, sehingga beberapa panggilan berturut-turut
+    (misalnya batch scrape latar belakang layanan query) cukup memakai satu
+    Chrome dan satu process pool. driver_manager selalu memakai jalur
+    DriverManager + RetryQueue, juga jika "multitab" aktif. Jika Chrome gagal
+    dibuat, semua work_items dikembalikan sebagai gagal.
+
+    Returns:
+        tuple: (list baris jadwal, list item yang tetap gagal)
+    '''
+    from .parsing import parse_captured_payload
+
+    if delay_between_searches is None:
+        delay_between_searches = config['delay_between_searches']
+    all_extracted_data = []
+
+    owns_parse_stage = parse_stage is None
+    if owns_parse_stage:
+        parse_stage = create_parse_stage(config)
+        if parse_stage:
+            print(f"Parsing dijalankan di process pool ({parse_stage.max_workers} worker, antrian maks {config['parse_pool']['queue_size']}).")
+            if profiler and profiler.enabled:
+                print("Catatan profiling: parsing berjalan di proses worker dan tidak masuk profil (matikan parse_pool untuk memprofilkannya).")
+    # ParseStage milik pemanggil bisa sudah mem-parse baris dari run sebelumnya
+    rows_parsed_before = parse_stage.stats()['rows_parsed'] if parse_stage else 0
+
+    def collected_rows():
+        return len(all_extracted_data) + (parse_stage.stats()['rows_parsed'] - rows_parsed_before if parse_stage else 0)
+
+    def progress():
+        if target_row_count:
+            print(f"Progress: {collected_rows()}/{target_row_count} sampel terkumpul")
+
+    archive_dir = config['archive']['dir'] if config['archive']['enabled'] else None
+    if archive_dir:
+        from .reparse import archive_page
+        print(f"Halaman hasil mentah diarsipkan ke '{archive_dir}'.")
+
+    def process_page(page_html, actual_url_loaded, query_context):
+        if archive_dir:
+            try:
+                archive_page(archive_dir, page_html, actual_url_loaded, query_context)
+            except OSError as e:
+                print(f"    Error saat mengarsipkan halaman: {e}")
+        if parse_stage:
+            parse_stage.submit(page_html, actual_url_loaded, query_context)
+            parse_stage.print_stats()
+            return
+        parse_started = time.perf_counter()
+        data_from_current_page = parse_captured_payload(page_html, actual_url_loaded, query_context)
+        print(f"    Waktu parsing: {time.perf_counter() - parse_started:.3f} detik.")
+        if data_from_current_page:
+            all_extracted_data.extend(data_from_current_page)
+
+    def target_reached():
+        if target_row_count and collected_rows() >= target_row_count:
+            print(f"\nTarget {target_row_count} sampel sudah tercapai!")
+            return True
+        return False
+
+    record_route_attempt = route_stats.record_attempt if route_stats else None
+    failed_items = []
+    print(f"Memulai proses scraping otomatis dengan Selenium ({len(work_items)} query)...")
+    try:
+        if config['multitab']['enabled'] and driver_manager is None:
+            # Latensi tab termasuk menunggu giliran di belakang tab lain; perencana
+            # mencatat bagian waktu browser per query (on_busy_time) sebagai biayanya
+            failed_items = _run_in_tabs(work_items, config, process_page, target_reached, profiler,
+                                        on_attempt, record_route_attempt)
+        else:
+            attempt_callbacks = [callback for callback in (record_route_attempt, on_attempt) if callback]
+
+            def record_attempt(query_context, success, seconds):
+                for callback in attempt_callbacks:
+                    callback(query_context, success, seconds)
+
+            on_attempt = record_attempt if attempt_callbacks else None
+            failed_items = _run_with_driver_manager(work_items, config, process_page, target_reached,
+                                                    delay_between_searches, profiler, progress, on_attempt,
+                                                    driver_manager=driver_manager)
+        if failed_items:
+            print(f"PERINGATAN: {len(failed_items)} query tetap gagal setelah semua percobaan:")
+            for item in failed_items:
+                print(f"  - {item['query_origin_code']} -> {item['query_destination_code']} {item['query_date_calendar']}")
+    except KeyboardInterrupt:
+        print("\n\nProses dihentikan oleh user (Ctrl+C)")
+    finally:
+        if parse_stage:
+            print("Menunggu tahap parsing menyelesaikan sisa antrian...")
+            all_extracted_data.extend(parse_stage.close() if owns_parse_stage else parse_stage.drain())
+            parse_stage.print_stats()
+        if route_stats:
+            route_stats.record_rows(all_extracted_data)
+
+    return all_extracted_data, failed_items
+
+def _load_route_stats(config):
+    '''RouteStats dari file statistik perencana, atau None jika perencana dimatikan.'''
+    planner_config = config['planner']
+    if not planner_config['enabled']:
+        return None
+    try:
+        return RouteStats.load(planner_config['stats_file'])
+    except (OSError, ValueError) as e:
+        print(f"PERINGATAN: Statistik rute '{planner_config['stats_file']}' tidak bisa dibaca ({e}); mulai dari kosong.")
+        return RouteStats()
+
+def _save_route_stats(route_stats, config):
+    if route_stats is None:
+        return
+    stats_file = config['planner']['stats_file']
+    try:
+        route_stats.save(stats_file)
+        print(f"Statistik {len(route_stats.routes)} rute disimpan ke '{stats_file}'.")
+    except OSError as e:
+        print(f"Error saat menyimpan statistik rute: {e}")
+
+def run_sweep(config, output_path=None):
+    '''Sweep penuh sesuai bagian "sweep" konfigurasi, lalu simpan ke CSV.'''
+    sweep_config = config['sweep']
+    output_path = output_path or sweep_config['output']
+    work_items = build_sweep_work_items(config)
+    # Sweep menjalankan semua kombinasi, jadi urutan tidak diubah; statistiknya tetap dicatat
+    route_stats = _load_route_stats(config)
+    profiler = create_profiler(config, output_path)
+    try:
+        with profiler.run(f"sweep_{sweep_config['start_date']}_{sweep_config['num_days']}hari"):
+            all_extracted_data, _ = run_queries(work_items, config, profiler=profiler, route_stats=route_stats)
+
+            if all_extracted_data:
+                print(f"\nTotal {len(all_extracted_data)} jadwal kereta berhasil diekstrak dari semua query.")
+                save_to_csv(all_extracted_data, output_path)
+            else:
+                print("\nTidak ada data jadwal kereta yang berhasil diekstrak dari semua query.")
+    finally:
+        profiler.close()
+        _save_route_stats(route_stats, config)
+    print("Proses scraping otomatis selesai.")
+    return all_extracted_data
+
+def _finish_sample(all_extracted_data, target_sample_count, output_path):
+    # Potong data jika melebihi target (ambil sample acak dari data yang terkumpul)
+    if len(all_extracted_data) > target_sample_count:
+        print(f"\nData terkumpul ({len(all_extracted_data)}) melebihi target ({target_sample_count})")
+        print(f"Melakukan random sampling untuk mendapatkan tepat {target_sample_count} sampel...")
+        all_extracted_data = random.sample(all_extracted_data, target_sample_count)
+
+    if all_extracted_data:
+        routes_with_data = len({row['hidden_details'].get('route_index') for row in all_extracted_data})
+        print("\n=== HASIL AKHIR ===")
+        print(f"Rute yang berhasil memberikan data: {routes_with_data}")
+        print(f"Total sampel data yang dikumpulkan: {len(all_extracted_data)}")
+        print(f"Target yang diharapkan: {target_sample_count}")
+        save_to_csv(all_extracted_data, output_path)
+        if len(all_extracted_data) < target_sample_count:
+            print(f"Target belum tercapai. Kekurangan: {target_sample_count - len(all_extracted_data)} sampel")
+            print("Tip: Coba tambahkan lebih banyak stasiun atau periksa koneksi internet")
+    else:
+        print("\nTidak ada data yang berhasil dikumpulkan")
+    return all_extracted_data
+
+def run_sample(config, output_path=None):
+    '''
+    Sampling rute sampai target_sample_count tercapai, lalu simpan ke CSV.
+    Jika perencana aktif, rute dengan baris per detik tertinggi dari run
+    sebelumnya didahulukan (lihat planner.plan_work_items); selain itu acak.
+    '''
+    sample_config = config['sample']
+    target_sample_count = sample_config['target_sample_count']
+    output_path = output_path or sample_config['output']
+    work_items = build_sample_work_items(config)
+    route_stats = _load_route_stats(config)
+    if route_stats is not None:
+        work_items = plan_work_items(work_items, route_stats, exploration_share=config['planner']['exploration_share'],
+                                     overhead_seconds=sample_config['delay_between_searches'])
+    print(f"Memulai random sampling rute untuk target {target_sample_count} sampel data...")
+
+    profiler = create_profiler(config, output_path)
+    try:
+        with profiler.run(f"sample_{sample_config['target_date']}_{target_sample_count}"):
+            all_extracted_data, _ = run_queries(
+                work_items, config,
+                delay_between_searches=sample_config['delay_between_searches'],
+                target_row_count=target_sample_count,
+                profiler=profiler,
+                route_stats=route_stats
+            )
+            all_extracted_data = _finish_sample(all_extracted_data, target_sample_count, output_path)
+    finally:
+        profiler.close()
+        _save_route_stats(route_stats, config)
+    print("\nProses random sampling selesai.")
+    return all_extracted_data
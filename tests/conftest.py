@@ -0,0 +1,111 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Tes dijalankan dari root repo tanpa instalasi paket
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kai_scraper.mock_server import MockBookingConfig, render_results_page  # noqa: E402
+
+QUERY_CONTEXT = {
+    'query_origin_name': 'SURABAYA PASAR TURI', 'query_origin_code': 'SBI',
+    'query_destination_name': 'GAMBIR', 'query_destination_code': 'GMR',
+    'query_date_calendar': '2025-06-03', 'query_date_input_format': '03-Juni-2025',
+}
+
+@pytest.fixture
+def results_page():
+    '''Halaman hasil sintetis kecil dari server tiruan (deterministik).'''
+    def make(seed=1, min_trains=3, max_trains=6):
+        config = MockBookingConfig(min_trains=min_trains, max_trains=max_trains, padding_kb=1)
+        return render_results_page("SURABAYA PASAR TURI", "GAMBIR", "03-Juni-2025", config, random.Random(seed))
+    return make
+
+@pytest.fixture
+def query_context():
+    return dict(QUERY_CONTEXT)
+
+class MockPageElement:
+    def __init__(self, driver, element_id):
+        self.driver = driver
+        self.element_id = element_id
+        self.value = ""
+
+    def clear(self):
+        self.value = ""
+
+    def send_keys(self, keys):
+        # Tombol khusus Selenium (ARROW_DOWN, ENTER) ada di area Unicode privat
+        self.value += "".join(char for char in keys if char < "\ue000")
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.driver.submit_search()
+
+class MockPageDriver:
+    '''
+    WebDriver tiruan untuk search_steps: form pencarian dengan elemen yang sama
+    seperti server tiruan, lalu halaman hasil dari render_results_page.
+    Selektor CSS di halaman hasil dicocokkan dengan BeautifulSoup.
+    '''
+
+    def __init__(self, config_for_destination=None):
+        self.config_for_destination = config_for_destination or (lambda destination: MockBookingConfig(padding_kb=0))
+        self.searches = []
+        self.current_url = "about:blank"
+        self.page_source = ""
+        self._soup = None
+        self._elements = {}
+
+    def get(self, url):
+        self.current_url = url
+        self.page_source = "<html><body>form</body></html>"
+        self._soup = None
+        self._elements = {element_id: MockPageElement(self, element_id) for element_id in
+                          ("origination-flexdatalist", "destination-flexdatalist", "departure_dateh", "submit")}
+
+    def find_element(self, by, value):
+        from selenium.common.exceptions import NoSuchElementException
+        if by == "id" and value in self._elements:
+            return self._elements[value]
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        if self._soup is None or by != "css selector":
+            return []
+        return self._soup.select(value)
+
+    def execute_script(self, script, *args):
+        if script.startswith("arguments[0].value = '"):
+            args[0].value = script[len("arguments[0].value = '"):-2]
+        return 1
+
+    def submit_search(self):
+        from bs4 import BeautifulSoup
+        origin = self._elements["origination-flexdatalist"].value
+        destination = self._elements["destination-flexdatalist"].value
+        tanggal = self._elements["departure_dateh"].value
+        self.searches.append((origin, destination, tanggal))
+        config = self.config_for_destination(destination)
+        self.page_source = render_results_page(origin, destination, tanggal, config, random.Random(len(self.searches)))
+        self._soup = BeautifulSoup(self.page_source, "html.parser")
+        self.current_url = f"http://tiruan/search?destination={destination}"
+
+    def quit(self):
+        pass
+
+@pytest.fixture
+def no_step_delays(monkeypatch):
+    '''Jeda tetap di search_steps (yield 1, yield 3, ...) tidak perlu ditunggu di tes.'''
+    import time
+    import types
+
+    import kai_scraper.browser as browser
+    monkeypatch.setattr(browser, "time", types.SimpleNamespace(sleep=lambda seconds: None, perf_counter=time.perf_counter))
@@ -0,0 +1,47 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from kai_scraper.browser import run_steps_blocking, scrape_kai_with_selenium, search_steps
+from kai_scraper.mock_server import MockBookingConfig
+from kai_scraper.retry import CircuitBreaker, RetryQueue
+
+from conftest import MockPageDriver
+
+def _empty_driver():
+    return MockPageDriver(lambda destination: MockBookingConfig(padding_kb=0, empty_rate=1.0))
+
+@pytest.mark.parametrize("capture_mode, expected", [("page", ""), ("fragment", ""), ("records", [])])
+def test_page_without_trains_returns_empty_payload(no_step_delays, capture_mode, expected):
+    driver = _empty_driver()
+    payload, url = run_steps_blocking(driver, search_steps(
+        driver, "SURABAYA PASAR TURI", "GAMBIR", "03-Juni-2025", capture_mode=capture_mode), timeout=1)
+    assert payload == expected
+    assert driver.searches == [("SURABAYA PASAR TURI", "GAMBIR", "03-Juni-2025")]
+
+def test_page_with_trains_returns_html(no_step_delays):
+    driver = MockPageDriver()
+    payload, _ = run_steps_blocking(driver, search_steps(driver, "SURABAYA PASAR TURI", "GAMBIR", "03-Juni-2025"), timeout=1)
+    assert "list-kereta" in payload
+
+def test_page_without_results_or_marker_still_times_out(no_step_delays):
+    driver = MockPageDriver()
+    driver.submit_search = lambda: None # Halaman hasil tidak pernah muncul
+    with pytest.raises(TimeoutException):
+        run_steps_blocking(driver, search_steps(driver, "SURABAYA PASAR TURI", "GAMBIR", "03-Juni-2025"), timeout=0.2)
+
+def test_empty_result_is_not_retried(no_step_delays):
+    driver = _empty_driver()
+    breaker = CircuitBreaker(min_calls=1)
+    retry_queue = RetryQueue([{'destination': "GAMBIR"}] * 3, circuit_breaker=breaker)
+
+    def handler(work_item):
+        scrape_kai_with_selenium(driver, "SURABAYA PASAR TURI", work_item['destination'], "03-Juni-2025",
+                                 1, 0, raise_errors=True)
+
+    assert retry_queue.run(handler) == []
+    assert retry_queue.stats['attempts'] == 3
+    assert retry_queue.stats['retried'] == 0
+    assert len(driver.searches) == 3
+    # Halaman kosong dihitung sukses, jadi tidak ikut membuka circuit breaker
+    assert list(breaker.window) == [True, True, True]
+    assert breaker.times_opened == 0
@@ -0,0 +1,120 @@
+import subprocess
+import sys
+import time
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import kai_scraper.browser_daemon as browser_daemon
+from kai_scraper.browser_daemon import BrowserDaemon, BrowserPool, DaemonClient
+
+class FakeDriver:
+    '''Chrome tiruan milik daemon: satu jendela, health check dan reset selalu berhasil.'''
+
+    def __init__(self):
+        self.alive = True
+        self.switch_to = self
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise WebDriverException("chrome mati")
+        return ['w0']
+
+    def window(self, handle):
+        pass
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException("chrome mati")
+        return 1
+
+    def quit(self):
+        self.alive = False
+
+@pytest.fixture
+def make_pool(monkeypatch, tmp_path):
+    monkeypatch.setattr(browser_daemon, "setup_driver", lambda *args, **kwargs: FakeDriver())
+    monkeypatch.setattr(browser_daemon, "driver_rss_mb", lambda driver: None)
+    pools = []
+
+    def make(**kwargs):
+        # Thread pemeliharaan praktis tidak pernah berjalan; tes memanggil maintain() sendiri
+        kwargs.setdefault('health_check_interval', 3600)
+        pool = BrowserPool("", profile_root=str(tmp_path / "profil"), warm_url="about:blank", **kwargs)
+        pools.append(pool)
+        return pool.start()
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+def _wait_for_state(pool, index, state, timeout=5):
+    deadline = time.monotonic() + timeout
+    while pool.browsers[index].state != state:
+        assert time.monotonic() < deadline, f"Chrome #{index + 1} tidak mencapai status {state}"
+        time.sleep(0.01)
+
+def test_lease_timeout_returns_503(make_pool):
+    pool = make_pool(size=1, min_warm=1)
+    assert pool.lease(wait=0) is not None
+    daemon = BrowserDaemon(pool, port=0).start()
+    try:
+        port = daemon.httpd.server_address[1]
+        with pytest.raises(HTTPError) as error:
+            urlopen(Request(f"http://127.0.0.1:{port}/lease?wait=0.2", method="POST"), timeout=5)
+        assert error.value.code == 503
+        assert DaemonClient(port=port).lease(wait=0.2) is None
+    finally:
+        daemon.stop()
+    assert pool.stats['busy'] == 2
+
+def test_lease_of_exited_process_is_reclaimed(make_pool):
+    pool = make_pool(size=1, min_warm=1)
+    client = subprocess.Popen([sys.executable, "-c", "pass"])
+    client.wait()
+    assert pool.lease(wait=0, pid=client.pid) is not None
+    assert pool.lease(wait=0) is None
+
+    pool.maintain()
+    _wait_for_state(pool, 0, "idle")
+    assert pool.stats['reclaimed'] == 1
+    assert pool.lease(wait=1) is not None
+
+def test_lease_of_running_process_is_kept(make_pool):
+    pool = make_pool(size=1, min_warm=1)
+    with subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]) as client:
+        try:
+            pool.lease(wait=0, pid=client.pid)
+            pool.maintain()
+            assert pool.browsers[0].state == "leased"
+            assert pool.stats['reclaimed'] == 0
+        finally:
+            client.kill()
+
+def test_idle_stop_keeps_min_warm(make_pool):
+    pool = make_pool(size=3, min_warm=1, idle_timeout=0.05)
+    # Hangatkan ketiga Chrome: pinjam semuanya lalu kembalikan
+    leases = [pool.lease(wait=5) for _ in range(3)]
+    assert all(leases)
+    for lease in leases:
+        pool.release(lease['lease_id'])
+    for index in range(3):
+        _wait_for_state(pool, index, "idle")
+
+    time.sleep(0.1)
+    pool.maintain()
+    states = [browser.state for browser in pool.browsers]
+    assert states.count("idle") == 1
+    assert states.count("stopped") == 2
+    assert pool.stats['idle_stops'] == 2
+
+    # Putaran berikutnya tidak menutup Chrome hangat terakhir
+    time.sleep(0.1)
+    pool.maintain()
+    assert [browser.state for browser in pool.browsers].count("idle") == 1
@@ -0,0 +1,70 @@
+from kai_scraper.connections import ConnectionIndex
+
+def _row(train_number, departure_time, arrival_time, price, availability):
+    return {
+        'train_name': 'JAYAKARTA', 'train_number': train_number, 'train_class': 'Ekonomi (CE)',
+        'departure_station': 'SURABAYA PASAR TURI', 'departure_time': departure_time, 'departure_date': '3 Juni 2025',
+        'duration': '', 'arrival_station': 'GAMBIR', 'arrival_date': '3 Juni 2025', 'arrival_time': arrival_time,
+        'price': price, 'availability': availability,
+    }
+
+def _index():
+    index = ConnectionIndex()
+    # Kereta 1 tiba paling cepat dan paling murah tetapi kursinya habis
+    index.add_rows([
+        _row('1', '06:00', '13:00', 150000, 'Habis'),
+        _row('2', '07:00', '14:00', 200000, 'Tersisa 5 kursi'),
+    ])
+    return index
+
+def test_both_searches_skip_sold_out_by_default():
+    index = _index()
+    fastest = index.earliest_arrival('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00')
+    cheapest = index.cheapest('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00')
+    assert fastest['legs'][0]['train_number'] == '2'
+    assert cheapest['legs'][0]['train_number'] == '2'
+
+def test_sold_out_included_on_request():
+    index = _index()
+    fastest = index.earliest_arrival('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00', available_only=False)
+    cheapest = index.cheapest('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00', available_only=False)
+    assert fastest['legs'][0]['train_number'] == '1'
+    assert cheapest['legs'][0]['train_number'] == '1'
+
+def _random_rows(rng, count):
+    stations = ['SURABAYA PASAR TURI', 'SEMARANG TAWANG', 'CIREBON', 'GAMBIR']
+    rows = []
+    for _ in range(count):
+        start = rng.randrange(len(stations) - 1)
+        end = rng.randrange(start + 1, len(stations))
+        hour, minute = rng.randrange(12), rng.choice([0, 30])
+        row = _row(str(rng.randrange(4)), f'{hour:02d}:{minute:02d}', f'{hour + rng.randrange(1, 10):02d}:{minute:02d}',
+                   rng.choice([150000, 200000, 'Tidak tersedia']), rng.choice(['Habis', 'Tersisa 3 kursi']))
+        row.update(departure_station=stations[start], arrival_station=stations[end],
+                   train_class=rng.choice(['Ekonomi (CE)', 'Eksekutif (A)']))
+        rows.append(row)
+    return rows
+
+def test_incremental_adds_match_full_rebuild():
+    import random
+
+    import pandas as pd
+
+    from kai_scraper.schedule_loader import schedules_from_rows
+
+    # Banyak kunci yang berulang (penggantian) dan kunci urutan yang sama (urutan stabil)
+    rows = _random_rows(random.Random(7), 300)
+    rebuilt = ConnectionIndex.from_schedules(schedules_from_rows(rows))
+    incremental = ConnectionIndex()
+    for start in range(0, len(rows), 23):
+        incremental.add_rows(rows[start:start + 23])
+
+    pd.testing.assert_frame_equal(incremental._connections, rebuilt._connections)
+    for attribute in ('_departure', '_arrival', '_price', '_available'):
+        assert getattr(incremental, attribute) == getattr(rebuilt, attribute)
+    assert [incremental.stations[i] for i in incremental._from] == [rebuilt.stations[i] for i in rebuilt._from]
+    for station in rebuilt.stations:
+        assert (incremental.departures(station, '2025-06-03 00:00', available_only=True)
+                == rebuilt.departures(station, '2025-06-03 00:00', available_only=True))
+    assert (incremental.cheapest('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00')
+            == rebuilt.cheapest('SURABAYA PASAR TURI', 'GAMBIR', '2025-06-03 00:00'))
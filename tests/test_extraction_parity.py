@@ -0,0 +1,127 @@
+'''
+Kesetaraan jalur BeautifulSoup (parse_schedule_html_content) dan jalur
+ekstraksi di browser (parse_schedule_records) pada fixture yang di-commit.
+
+results_page.records.json SINTETIS: ditulis dengan meniru aturan
+_EXTRACT_SCHEDULES_JS secara manual karena Chrome tidak tersedia saat fixture
+dibuat. Untuk memastikan skrip JS yang sebenarnya menghasilkan records yang sama,
+test_extraction_js_reproduces_records_fixture menjalankan _EXTRACT_SCHEDULES_JS
+di Node terhadap DOM minimal yang dibangun dari results_page.html (dilewati
+jika `node` tidak ada). Buat ulang fixture dari browser sungguhan dengan
+`python -m kai_scraper.extraction_check --write-fixture tests/fixtures/results_page.html`
+jika skrip ekstraksi di browser diubah.
+'''
+import gzip
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+from bs4 import BeautifulSoup, Comment, NavigableString
+from bs4.element import PreformattedString
+
+from kai_scraper.browser import _EXTRACT_SCHEDULES_JS
+
+from kai_scraper.extraction_check import compare_rows
+from kai_scraper.parsing import parse_captured_payload, parse_schedule_html_content, parse_schedule_records
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# DOM minimal untuk Node: hanya API yang dipakai _EXTRACT_SCHEDULES_JS
+# (tagName, getAttribute, children, childNodes, nodeType, textContent,
+# getElementsByTagName, Node.TEXT_NODE). Pohonnya dikirim lewat stdin.
+_NODE_DOM_SHIM = """
+function build(n) {
+    if (n.text !== undefined) { return {nodeType: 3, textContent: n.text}; }
+    if (n.comment !== undefined) { return {nodeType: 8, textContent: n.comment}; }
+    var el = {nodeType: 1, tagName: n.tag.toUpperCase(), childNodes: n.children.map(build)};
+    el.children = el.childNodes.filter(function(c) { return c.nodeType === 1; });
+    el.getAttribute = function(name) { return name in n.attrs ? n.attrs[name] : null; };
+    el.getElementsByTagName = function(tag) {
+        var out = [];
+        (function walk(e) {
+            e.children.forEach(function(c) {
+                if (tag === '*' || c.tagName.toLowerCase() === tag) { out.push(c); }
+                walk(c);
+            });
+        })(el);
+        return out;
+    };
+    Object.defineProperty(el, 'textContent', {get: function() {
+        return el.childNodes.filter(function(c) { return c.nodeType !== 8; })
+            .map(function(c) { return c.textContent; }).join('');
+    }});
+    return el;
+}
+var tree = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+global.Node = {TEXT_NODE: 3};
+global.document = build(tree);
+var result = (function() { %s })();
+process.stdout.write(JSON.stringify(result));
+"""
+
+def _dom_tree(node):
+    '''Ubah pohon BeautifulSoup menjadi dict JSON untuk _NODE_DOM_SHIM.'''
+    children = []
+    for child in node.children:
+        if isinstance(child, Comment):
+            children.append({'comment': str(child)})
+        elif isinstance(child, PreformattedString):
+            continue  # doctype, CDATA, dsb. tidak ikut textContent
+        elif isinstance(child, NavigableString):
+            children.append({'text': str(child)})
+        else:
+            children.append(_dom_tree(child))
+    return {'tag': node.name, 'attrs': dict(node.attrs), 'children': children}
+
+def _run_extraction_js(html, tmp_path):
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node tidak tersedia untuk menjalankan _EXTRACT_SCHEDULES_JS")
+    soup = BeautifulSoup(html, 'html.parser', multi_valued_attributes=None)
+    script = tmp_path / "extract.js"
+    script.write_text(_NODE_DOM_SHIM % _EXTRACT_SCHEDULES_JS, encoding='utf-8')
+    result = subprocess.run([node, str(script)], input=json.dumps(_dom_tree(soup)),
+                            capture_output=True, text=True, encoding='utf-8', timeout=30)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+@pytest.fixture
+def fixture_page():
+    with open(os.path.join(FIXTURE_DIR, "results_page.html"), encoding='utf-8') as f:
+        html = f.read()
+    with open(os.path.join(FIXTURE_DIR, "results_page.records.json"), encoding='utf-8') as f:
+        records = json.load(f)
+    return html, records
+
+def test_html_and_browser_records_give_identical_rows(fixture_page, query_context):
+    html, records = fixture_page
+    python_rows = parse_schedule_html_content(html, "http://tiruan/", query_context)
+    browser_rows = parse_schedule_records(records, "http://tiruan/", query_context)
+
+    assert len(python_rows) == len(records) == 6
+    assert compare_rows(python_rows, browser_rows) == []
+    assert python_rows == browser_rows
+
+def test_fixture_covers_missing_fields(fixture_page, query_context):
+    html, _ = fixture_page
+    last = parse_schedule_html_content(html, "http://tiruan/", query_context)[-1]
+    assert last['train_number'] == ""
+    assert last['price'] == "Tidak tersedia"
+    assert last['arrival_station'] == last['arrival_time'] == "Tidak tersedia"
+    assert last['availability'] == "Habis"
+
+def test_gzip_payload_matches_plain_html(fixture_page, query_context):
+    html, _ = fixture_page
+    plain = parse_captured_payload(html, "http://tiruan/", query_context)
+    compressed = parse_captured_payload(gzip.compress(html.encode('utf-8')), "http://tiruan/", query_context)
+    assert plain == compressed
+
+def test_extraction_js_reproduces_records_fixture(fixture_page, query_context, tmp_path):
+    html, records = fixture_page
+    js_records = _run_extraction_js(html, tmp_path)
+
+    assert js_records == records
+    python_rows = parse_schedule_html_content(html, "http://tiruan/", query_context)
+    assert parse_schedule_records(js_records, "http://tiruan/", query_context) == python_rows
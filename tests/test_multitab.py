@@ -0,0 +1,96 @@
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import kai_scraper.multitab as multitab
+from kai_scraper.multitab import MultiTabScraper
+
+class FakeDriver:
+    '''Cukup untuk MultiTabScraper: jendela, perpindahan tab, dan crash seluruh browser.'''
+
+    def __init__(self):
+        self.windows = ['w0']
+        self.current_window_handle = 'w0'
+        self.dead = False
+        self.switch_to = self
+
+    def _check(self):
+        if self.dead:
+            raise WebDriverException("chrome tidak merespons")
+
+    @property
+    def window_handles(self):
+        self._check()
+        return list(self.windows)
+
+    def window(self, handle):
+        self._check()
+        self.current_window_handle = handle
+
+    def new_window(self, kind):
+        self._check()
+        self.windows.append(f"w{len(self.windows)}")
+        self.current_window_handle = self.windows[-1]
+
+class FakeDriverSource:
+    def __init__(self):
+        self.driver = FakeDriver()
+
+    def create(self, page_load_strategy=None):
+        return self.driver
+
+    def dispose(self, driver, reason=None):
+        pass
+
+    def rss_mb(self, driver):
+        return None
+
+def fake_search_steps(driver, origin, destination, tanggal, capture_mode="page", booking_url=None):
+    '''Perilaku query ditentukan nama tujuan.'''
+    if destination == "LAMBAT":
+        yield 30
+    elif destination == "RETRY":
+        yield 0.01
+        raise TimeoutException("halaman lambat")
+    elif destination == "CRASH":
+        yield 0.2
+        driver.dead = True
+        raise WebDriverException("chrome crash")
+    else:
+        yield 0.01
+    return "<html></html>", "http://tiruan/"
+
+def _item(destination, index):
+    return {'query_origin_name': "SURABAYA PASAR TURI", 'query_destination_name': destination,
+            'query_date_input_format': "03-Juni-2025", 'index': index}
+
+def test_browser_crash_marks_in_flight_and_retrying_items_failed(monkeypatch):
+    monkeypatch.setattr(multitab, "search_steps", fake_search_steps)
+    # Tab 1: CEPAT lalu RETRY (menunggu retry ~10 detik), tab 2: LAMBAT, tab 3: CRASH; sisanya masih di antrian
+    work_items = [_item(destination, i) for i, destination in
+                  enumerate(["CEPAT", "LAMBAT", "CRASH", "RETRY", "CEPAT", "CEPAT"])]
+    succeeded = []
+    scraper = MultiTabScraper("", tabs=3, driver_source=FakeDriverSource())
+    scraper.start()
+    failed = scraper.run(work_items, on_result=lambda html, url, work_item: succeeded.append(work_item['index']))
+
+    failed_indexes = sorted(work_item['index'] for work_item in failed)
+    assert sorted(succeeded + failed_indexes) == list(range(len(work_items)))
+    assert {1, 2, 3} <= set(failed_indexes)
+    assert scraper.stats['failed'] == len(failed)
+
+def test_busy_time_excludes_waiting_behind_other_tabs(monkeypatch):
+    def parallel_steps(driver, origin, destination, tanggal, capture_mode="page", booking_url=None):
+        yield 0.3
+        return "<html></html>", "http://tiruan/"
+
+    monkeypatch.setattr(multitab, "search_steps", parallel_steps)
+    latencies, busy_times = [], []
+    scraper = MultiTabScraper("", tabs=2, driver_source=FakeDriverSource())
+    scraper.start()
+    scraper.run([_item("CEPAT", 0), _item("CEPAT", 1)], on_result=lambda *args: None,
+                on_attempt=lambda work_item, success, seconds: latencies.append(seconds),
+                on_busy_time=lambda work_item, success, seconds: busy_times.append(seconds))
+
+    # Dua query menunggu bersamaan: masing-masing ~0.3 detik latensi, tetapi ~0.15 detik waktu browser
+    assert min(latencies) >= 0.3
+    assert sum(busy_times) <= max(latencies) + 0.05
+    assert all(busy < latency * 0.75 for busy, latency in zip(busy_times, latencies))
@@ -0,0 +1,56 @@
+import os
+import signal
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+from kai_scraper.parse_pool import ParseStage
+from kai_scraper.parsing import parse_schedule_html_content
+
+class _BrokenExecutor:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker mati")
+
+    def shutdown(self, wait=True):
+        pass
+
+def _feed_and_close(stage, pages, query_context, timeout=30):
+    '''submit() semua halaman lalu close(), di thread terpisah agar tes gagal (bukan menggantung) jika macet.'''
+    result = {}
+
+    def run():
+        for page in pages:
+            stage.submit(page, "http://tiruan/", query_context)
+        result['rows'] = stage.close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "ParseStage macet setelah process pool rusak"
+    return result['rows']
+
+def test_broken_pool_falls_back_to_in_process_parsing(results_page, query_context):
+    stage = ParseStage(max_workers=1, max_queue_size=2)
+    stage.executor.shutdown(wait=True)
+    stage.executor = _BrokenExecutor()
+    # Lebih banyak halaman daripada kapasitas antrian
+    pages = [results_page(seed) for seed in range(10)]
+    rows = _feed_and_close(stage, pages, query_context)
+
+    expected = []
+    for page in pages:
+        expected.extend(parse_schedule_html_content(page, "http://tiruan/", query_context))
+    assert rows == expected
+    assert stage.pool_broken
+    assert stage.stats()['pages_parsed'] == len(pages)
+
+def test_killed_worker_does_not_hang_the_stage(results_page, query_context):
+    stage = ParseStage(max_workers=1, max_queue_size=2)
+    stage.submit(results_page(0), "http://tiruan/", query_context)
+    while stage.stats()['pages_parsed'] == 0:
+        threading.Event().wait(0.05)
+    for pid in list(stage.executor._processes):
+        os.kill(pid, signal.SIGKILL)
+    _feed_and_close(stage, [results_page(seed) for seed in range(1, 8)], query_context)
+
+    stats = stage.stats()
+    assert stats['pages_parsed'] + stats['pages_failed'] == stats['pages_submitted'] == 8
@@ -0,0 +1,90 @@
+import random
+
+import pandas as pd
+
+from kai_scraper.planner import RouteStats, plan_work_items, route_key
+
+def _item(origin, destination):
+    return {'query_origin_name': origin, 'query_destination_name': destination}
+
+def _stats():
+    stats = RouteStats()
+    # A -> B: 20 baris/query, A -> C: 5 baris/query, latensi sama
+    for destination, rows in (("B", 20), ("C", 5)):
+        for _ in range(10):
+            stats.record_attempt(_item("A", destination), True, 10.0)
+        stats.routes[route_key(_item("A", destination))]['rows'] = rows * 10
+    return stats
+
+def test_known_routes_ordered_by_expected_rows_per_second():
+    stats = _stats()
+    planned = plan_work_items([_item("A", "C"), _item("A", "B")], stats, exploration_share=0.0, rng=random.Random(1))
+    assert [item['query_destination_name'] for item in planned] == ["B", "C"]
+
+def test_without_exploration_unseen_routes_come_last():
+    stats = _stats()
+    work_items = [_item("A", "X"), _item("A", "C"), _item("A", "Y"), _item("A", "B")]
+    planned = plan_work_items(work_items, stats, exploration_share=0.0, rng=random.Random(1))
+    assert [item['query_destination_name'] for item in planned[:2]] == ["B", "C"]
+    assert {item['query_destination_name'] for item in planned[2:]} == {"X", "Y"}
+
+def test_exploration_share_interleaves_unseen_routes():
+    stats = RouteStats()
+    known = [_item("K", str(i)) for i in range(500)]
+    unseen = [_item("U", str(i)) for i in range(500)]
+    for work_item in known:
+        stats.record_attempt(work_item, True, 10.0)
+    planned = plan_work_items(known + unseen, stats, exploration_share=0.2, rng=random.Random(7))
+    head = planned[:400]
+    explored = sum(1 for item in head if item['query_origin_name'] == "U")
+    # Sekitar 20% dari 400 posisi pertama
+    assert 50 <= explored <= 110
+    assert len(planned) == 1000
+
+def test_seed_from_schedules_is_idempotent():
+    schedules = pd.DataFrame({
+        'hidden_query_origin_name': ["A", "A", "A"],
+        'hidden_query_destination_name': ["B", "B", "B"],
+        'hidden_query_date_calendar': pd.to_datetime(["2025-06-03", "2025-06-03", "2025-06-04"]),
+    })
+    stats = RouteStats()
+    assert stats.seed_from_schedules(schedules) == 2
+    assert stats.seed_from_schedules(schedules) == 0
+    assert stats.routes["A -> B"] == {'attempts': 2, 'successes': 2, 'rows': 3, 'latency_seconds': 0.0,
+                                       'latency_samples': 0}
+
+def test_seeded_keys_survive_save_and_load(tmp_path):
+    schedules = pd.DataFrame({
+        'hidden_query_origin_name': ["A"], 'hidden_query_destination_name': ["B"],
+        'hidden_query_date_calendar': pd.to_datetime(["2025-06-03"]),
+    })
+    path = str(tmp_path / "route_stats.json")
+    stats = RouteStats()
+    stats.seed_from_schedules(schedules)
+    stats.save(path)
+    assert RouteStats.load(path).seed_from_schedules(schedules) == 0
+
+def test_seeded_successes_do_not_dilute_measured_latency():
+    stats = RouteStats()
+    # A -> B: 10 query dari CSV lama (tanpa latensi) + 2 query terukur 30 detik
+    stats.seed_from_schedules(pd.DataFrame({
+        'hidden_query_origin_name': ["A"] * 10,
+        'hidden_query_destination_name': ["B"] * 10,
+        'hidden_query_date_calendar': pd.date_range("2025-06-01", periods=10),
+    }))
+    for _ in range(2):
+        stats.record_attempt(_item("A", "B"), True, 30.0)
+    # A -> C: baris per query sama, tetapi hanya 10 detik per query
+    for _ in range(2):
+        stats.record_attempt(_item("A", "C"), True, 10.0)
+    stats.routes["A -> C"]['rows'] = 2
+
+    assert stats._mean_latency(stats.routes["A -> B"]) == 30.0
+    planned = plan_work_items([_item("A", "B"), _item("A", "C")], stats, exploration_share=0.0, rng=random.Random(1))
+    assert [item['query_destination_name'] for item in planned] == ["C", "B"]
+
+def test_load_infers_latency_samples_for_old_files(tmp_path):
+    path = tmp_path / "route_stats.json"
+    path.write_text('{"routes": {"A -> B": {"attempts": 2, "successes": 2, "rows": 4, "latency_seconds": 20.0}}}')
+    stats = RouteStats.load(str(path))
+    assert stats._mean_latency(stats.routes["A -> B"]) == 10.0
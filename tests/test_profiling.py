@@ -0,0 +1,22 @@
+import tracemalloc
+
+from kai_scraper.profiling import Profiler
+
+def test_query_mode_traces_only_sampled_queries(tmp_path, query_context):
+    profiler = Profiler(mode="query", output_dir=str(tmp_path), every_n_queries=2)
+    tracing_during_query = []
+
+    def handler(context):
+        tracing_during_query.append(tracemalloc.is_tracing())
+        return [bytearray(1024)]
+
+    query = profiler.wrap_query(handler)
+    for _ in range(4):
+        query(query_context)
+        assert not tracemalloc.is_tracing()
+    profiler.close()
+
+    assert tracing_during_query == [True, False, True, False]
+    alloc_reports = sorted(tmp_path.glob("*.alloc.txt"))
+    assert len(alloc_reports) == 2
+    assert "query sampel pertama" in alloc_reports[-1].read_text(encoding='utf-8')
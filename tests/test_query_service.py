@@ -0,0 +1,84 @@
+import copy
+import time
+
+import pytest
+
+import kai_scraper.driver_manager as driver_manager
+from kai_scraper.config import DEFAULT_CONFIG
+from kai_scraper.mock_server import MockBookingConfig
+from kai_scraper.query_service import BackgroundScraper, ScheduleStore
+
+from conftest import MockPageDriver
+
+# SBI -> GMR berisi kereta, SBI -> BD kosong (KAI tidak menampilkan kereta)
+WITH_TRAINS = ('SBI', 'GMR', '2025-06-03')
+WITHOUT_TRAINS = ('SBI', 'BD', '2025-06-03')
+
+@pytest.fixture
+def fake_browser(monkeypatch, no_step_delays):
+    '''
+    setup_driver tiruan yang menjalankan search_steps asli di atas halaman
+    server tiruan; mencatat Chrome yang dibuat.
+    '''
+    created = []
+
+    def fake_setup_driver(*args, **kwargs):
+        created.append(MockPageDriver(lambda destination: MockBookingConfig(
+            padding_kb=0, empty_rate=1.0 if destination == "BANDUNG" else 0.0)))
+        return created[-1]
+
+    monkeypatch.setattr(driver_manager, "setup_driver", fake_setup_driver)
+    return created
+
+@pytest.fixture
+def service_config():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['sample']['origin_stations'] = [["SURABAYA PASAR TURI", "SBI"]]
+    config['sample']['destination_stations'] = [["GAMBIR", "GMR"], ["BANDUNG", "BD"]]
+    config['parse_pool']['workers'] = 1
+    # MockPageDriver tidak menjalankan JavaScript (fragment_gzip)
+    config['capture_mode'] = "page"
+    config['retry']['breaker_cooldown'] = 0
+    return config
+
+def _scrape(scraper, keys, timeout=30):
+    done_before = scraper.stats['scraped'] + scraper.stats['failed']
+    for key in keys:
+        assert scraper.enqueue(key)
+    deadline = time.monotonic() + timeout
+    while scraper.stats['scraped'] + scraper.stats['failed'] < done_before + len(keys):
+        assert time.monotonic() < deadline, "scrape latar belakang tidak selesai"
+        time.sleep(0.02)
+
+def test_empty_result_is_stored_and_browser_is_reused(fake_browser, service_config):
+    store = ScheduleStore()
+    scraper = BackgroundScraper(store, service_config, batch_wait=0)
+    try:
+        _scrape(scraper, [WITH_TRAINS, WITHOUT_TRAINS])
+        records, _ = store.lookup(*WITH_TRAINS)
+        assert records
+        assert store.lookup(*WITHOUT_TRAINS)[0] == []
+        assert scraper.stats['empty'] == 1
+
+        parse_stage = scraper.parse_stage
+        _scrape(scraper, [('SBI', 'GMR', '2025-06-04')])
+        assert store.lookup('SBI', 'GMR', '2025-06-04')[0]
+        assert scraper.parse_stage is parse_stage
+    finally:
+        scraper.close()
+    assert len(fake_browser) == 1
+    # Rute tanpa kereta selesai dalam satu percobaan, tidak menunggu timeout lalu retry
+    assert len(fake_browser[0].searches) == 3
+    assert scraper.stats['failed'] == 0
+
+def test_browser_setup_failure_is_counted_as_failed(monkeypatch, service_config):
+    monkeypatch.setattr(driver_manager, "setup_driver", lambda *args, **kwargs: None)
+    store = ScheduleStore()
+    scraper = BackgroundScraper(store, service_config, batch_wait=0)
+    try:
+        _scrape(scraper, [WITH_TRAINS, WITHOUT_TRAINS])
+    finally:
+        scraper.close()
+    assert scraper.stats['failed'] == 2
+    assert scraper.stats['scraped'] == 0
+    assert store.lookup(*WITHOUT_TRAINS) is None
@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from kai_scraper.reparse import archive_page, run_reparse
+
+@pytest.fixture
+def archive_dir(tmp_path, results_page, query_context):
+    directory = tmp_path / "arsip"
+    for seed in range(3):
+        archive_page(str(directory), results_page(seed=seed), "http://tiruan/search", query_context)
+    return str(directory)
+
+def _row_count(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute('SELECT COUNT(*) FROM "schedules"').fetchone()[0]
+    finally:
+        connection.close()
+
+def test_reparse_twice_into_sqlite_replaces_table(tmp_path, archive_dir):
+    output_path = str(tmp_path / "hasil.sqlite")
+    first = run_reparse([archive_dir], output_path, workers=1)
+    assert first['rows'] > 0
+    assert _row_count(output_path) == first['rows']
+
+    run_reparse([archive_dir], output_path, workers=1)
+    assert _row_count(output_path) == first['rows']
+
+def test_reparse_append_keeps_existing_rows(tmp_path, archive_dir):
+    output_path = str(tmp_path / "hasil.sqlite")
+    first = run_reparse([archive_dir], output_path, workers=1)
+    run_reparse([archive_dir], output_path, workers=1, append=True)
+    assert _row_count(output_path) == 2 * first['rows']
+
+def test_append_rejected_for_csv(tmp_path, archive_dir):
+    with pytest.raises(ValueError):
+        run_reparse([archive_dir], str(tmp_path / "hasil.csv"), workers=1, append=True)
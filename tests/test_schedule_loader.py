@@ -0,0 +1,16 @@
+import pandas as pd
+
+from kai_scraper.parsing import parse_schedule_html_content
+from kai_scraper.schedule_loader import RAW_STRING_COLUMNS, schedules_from_rows
+
+def test_schedules_from_no_rows_has_typed_schema(results_page, query_context):
+    empty = schedules_from_rows([])
+    assert len(empty) == 0
+    assert list(empty.columns[:len(RAW_STRING_COLUMNS)]) == RAW_STRING_COLUMNS
+
+    rows = parse_schedule_html_content(results_page(), "http://tiruan/", query_context)
+    typed = schedules_from_rows(rows)
+    for column in ['price', 'duration_minutes', 'seats_left', 'is_available', 'train_name']:
+        assert empty[column].dtype == typed[column].dtype, column
+    for column in ['departure_datetime', 'arrival_datetime']:
+        assert pd.api.types.is_datetime64_dtype(empty[column])